@@ -0,0 +1,79 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+from puerto_rico_bots import BOTS
+from puerto_rico_sim import simulate, make_policy
+
+
+def collect_positions(n_positions, mayor_mode="slot", seed=0):
+    """Observations and masks of decision positions from random games, stacked."""
+    env = PuertoRicoEnv2P(mayor_mode=mayor_mode)
+    rng = np.random.default_rng(seed)
+    obs_rows, masks = [], []
+    game = 0
+    while len(masks) < n_positions:
+        obs, _ = env.reset(seed=seed + game)
+        terminated = False
+        while not terminated and len(masks) < n_positions:
+            mask = env.get_action_mask()
+            if mask.sum() > 1:
+                obs_rows.append(obs)
+                masks.append(mask)
+            obs, _, terminated, _, _ = env.step(int(rng.choice(np.flatnonzero(mask))))
+        game += 1
+    batch = {key: np.stack([row[key] for row in obs_rows]) for key in obs_rows[0]}
+    return batch, np.stack(masks)
+
+
+def bench_decisions(bot, obs, masks, batch_size, min_time=0.5):
+    """Decisions/sec for batches of `batch_size` rows."""
+    rng = np.random.default_rng(0)
+    n = len(masks)
+    starts = range(0, n - batch_size + 1, batch_size)
+    batches = [({key: value[s:s + batch_size] for key, value in obs.items()}, masks[s:s + batch_size])
+               for s in starts]
+    decisions = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        for batch_obs, batch_masks in batches:
+            bot(batch_obs, batch_masks, rng)
+            decisions += batch_size
+    return decisions / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized heuristic bots")
+    parser.add_argument("--positions", type=int, default=4096)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 1024])
+    parser.add_argument("--games", type=int, default=50, help="Games vs random per bot (0 to skip)")
+    args = parser.parse_args()
+
+    obs, masks = collect_positions(args.positions)
+    print(f"Decisions/sec on {len(masks)} positions from random games")
+    print(f"{'Bot':<16}" + "".join(f"{f'batch {b}':>14}" for b in args.batch_sizes))
+    for name, bot in BOTS.items():
+        rates = [bench_decisions(bot, obs, masks, b) for b in args.batch_sizes]
+        print(f"{name:<16}" + "".join(f"{rate:>14.0f}" for rate in rates))
+
+    if args.games:
+        print(f"\nVs random, {args.games} games per seat (simulate, one env)")
+        print(f"{'Bot':<16}{'win rate':>10}{'mean VP':>10}{'games/s':>10}")
+        for name in BOTS:
+            bot, opponent = make_policy(f"bot:{name}"), make_policy("random")
+            start = time.perf_counter()
+            first = simulate((bot, opponent), args.games, seed=0)
+            second = simulate((opponent, bot), args.games, seed=0)
+            elapsed = time.perf_counter() - start
+            wins = (first["winner"] == 0).sum() + (second["winner"] == 1).sum()
+            vp = (first["scores"][:, 0].sum() + second["scores"][:, 1].sum()) / (2 * args.games)
+            print(f"{name:<16}{wins / (2 * args.games):>10.2f}{vp:>10.1f}{2 * args.games / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
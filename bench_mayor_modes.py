@@ -0,0 +1,93 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+import puerto_rico_constants as c
+
+CONFIGS = [
+    ("slot", dict(mayor_mode="slot")),
+    ("allocation", dict(mayor_mode="allocation")),
+    ("slot + auto_advance", dict(mayor_mode="slot", auto_advance=True)),
+    ("allocation + auto_advance", dict(mayor_mode="allocation", auto_advance=True)),
+]
+
+
+def bench_episodes(env_kwargs, n_games, seed=0):
+    """Random legal play: steps per game, Mayor steps per game, steps/sec."""
+    env = PuertoRicoEnv2P(**env_kwargs)
+    rng = np.random.default_rng(seed)
+    lengths = []
+    mayor_steps = 0
+    start = time.perf_counter()
+    for game in range(n_games):
+        env.reset(seed=seed + game)
+        steps = 0
+        terminated = False
+        while not terminated:
+            if env.game_state.phase == c.PHASE_MAYOR:
+                mayor_steps += 1
+            legal = np.flatnonzero(env.get_action_mask())
+            _, _, terminated, _, _ = env.step(int(rng.choice(legal)))
+            steps += 1
+        lengths.append(steps)
+    elapsed = time.perf_counter() - start
+    return np.mean(lengths), mayor_steps / n_games, sum(lengths) / elapsed, n_games / elapsed
+
+
+def bench_training(env_kwargs, total_timesteps):
+    """MaskablePPO throughput (env steps/sec and games/sec) with the training wrapper."""
+    from sb3_contrib import MaskablePPO
+    from stable_baselines3.common.callbacks import BaseCallback
+    from stable_baselines3.common.vec_env import DummyVecEnv
+    from puerto_rico_wrappers import PuertoRicoTrainingWrapper
+
+    class EpisodeCounter(BaseCallback):
+        # model.ep_info_buffer keeps only the last 100 episodes
+        def __init__(self):
+            super().__init__()
+            self.episodes = 0
+
+        def _on_step(self):
+            self.episodes += int(np.sum(self.locals["dones"]))
+            return True
+
+    def make_env():
+        return PuertoRicoTrainingWrapper(PuertoRicoEnv2P(**env_kwargs))
+
+    vec_env = DummyVecEnv([make_env])
+    model = MaskablePPO("MultiInputPolicy", vec_env, n_steps=1024, batch_size=64, verbose=0)
+    counter = EpisodeCounter()
+    start = time.perf_counter()
+    model.learn(total_timesteps=total_timesteps, callback=counter)
+    elapsed = time.perf_counter() - start
+    return model.num_timesteps / elapsed, counter.episodes / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark slot vs allocation Mayor modes")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--train-steps", type=int, default=0,
+                        help="Also measure MaskablePPO throughput (requires sb3-contrib)")
+    args = parser.parse_args()
+
+    print(f"Random legal play, {args.games} games per mode")
+    print(f"{'Mode':<28}{'steps/game':>12}{'mayor/game':>12}{'steps/s':>10}{'games/s':>10}")
+    for name, kwargs in CONFIGS:
+        length, mayor, sps, gps = bench_episodes(kwargs, args.games)
+        print(f"{name:<28}{length:>12.1f}{mayor:>12.1f}{sps:>10.0f}{gps:>10.2f}")
+
+    if args.train_steps:
+        print(f"\nMaskablePPO, {args.train_steps} timesteps per mode")
+        print(f"{'Mode':<28}{'steps/s':>10}{'games/s':>10}")
+        for name, kwargs in CONFIGS:
+            sps, gps = bench_training(kwargs, args.train_steps)
+            print(f"{name:<28}{sps:>10.0f}{gps:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P, convert_obs_dtype
+
+# Realistic storage sizes: PPO rollouts (n_steps x n_envs) and a replay/dataset store
+BUFFER_SIZES = [
+    ("PPO n_steps=2048 x 1 env", 2048 * 1),
+    ("PPO n_steps=2048 x 8 envs", 2048 * 8),
+    ("PPO n_steps=2048 x 64 envs", 2048 * 64),
+    ("Replay / dataset 1M obs", 1_000_000),
+]
+DTYPES = [np.int32, np.int16, np.int8]
+
+
+def collect_observations(n_obs, seed=0):
+    """Play random legal games and collect `n_obs` int32 observations."""
+    env = PuertoRicoEnv2P()
+    rng = np.random.default_rng(seed)
+    collected = []
+    game = 0
+    while len(collected) < n_obs:
+        obs, _ = env.reset(seed=seed + game)
+        collected.append(obs)
+        terminated = False
+        while not terminated and len(collected) < n_obs:
+            legal = np.flatnonzero(env.get_action_mask())
+            obs, _, terminated, _, _ = env.step(int(rng.choice(legal)))
+            collected.append(obs)
+        game += 1
+    return {key: np.stack([o[key] for o in collected]) for key in collected[0]}
+
+
+def bench_obs_memory(n_obs=20_000):
+    print(f"Collecting {n_obs} observations from random games...")
+    batch = collect_observations(n_obs)
+
+    per_obs_bytes = {}
+    for dtype in DTYPES:
+        start = time.perf_counter()
+        converted = convert_obs_dtype(batch, dtype)  # Raises if lossy
+        elapsed = time.perf_counter() - start
+        for key in batch:
+            assert np.array_equal(converted[key].astype(np.int32), batch[key])
+        nbytes = sum(arr.nbytes for arr in converted.values())
+        per_obs_bytes[dtype] = nbytes / n_obs
+        print(f"{np.dtype(dtype).name:>6}: {per_obs_bytes[dtype]:.0f} B/obs "
+              f"(lossless, converted in {elapsed * 1e3:.1f} ms)")
+
+    print("\nObservation storage per buffer:")
+    header = f"{'Buffer':<30}" + "".join(f"{np.dtype(d).name:>12}" for d in DTYPES) + f"{'saved':>12}"
+    print(header)
+    for name, size in BUFFER_SIZES:
+        row = f"{name:<30}"
+        for dtype in DTYPES:
+            row += f"{per_obs_bytes[dtype] * size / 2**20:>9.1f} MB"
+        saved = (per_obs_bytes[np.int32] - per_obs_bytes[np.int8]) * size / 2**20
+        row += f"{saved:>9.1f} MB"
+        print(row)
+
+    print("\nNote: SB3's RolloutBuffer stores observations as float32 regardless of the space dtype;")
+    print("the saving applies to VecEnv observation buffers, replay buffers and offline datasets.")
+
+
+if __name__ == "__main__":
+    bench_obs_memory()
@@ -0,0 +1,77 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from sb3_contrib.common.maskable.utils import get_action_masks
+from stable_baselines3.common.vec_env import SubprocVecEnv
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+from puerto_rico_wrappers import PuertoRicoTrainingWrapper
+from puerto_rico_vec_env import VecActionMaskWrapper
+from puerto_rico_vector import sample_masked_actions
+
+
+def make_env():
+    return PuertoRicoTrainingWrapper(PuertoRicoEnv2P())
+
+
+def make_masked_env():
+    return PuertoRicoTrainingWrapper(PuertoRicoEnv2P(info_action_mask=True))
+
+
+class CountingRemote:
+    """Pipe proxy counting the messages sent to a worker."""
+    def __init__(self, remote):
+        self.remote = remote
+        self.sent = 0
+
+    def send(self, message):
+        self.sent += 1
+        self.remote.send(message)
+
+    def __getattr__(self, name):
+        return getattr(self.remote, name)
+
+
+def bench(n_envs, n_steps, masked, seed=0):
+    """(env steps/sec, worker messages per vector step) for MaskablePPO's rollout loop."""
+    subproc = SubprocVecEnv([make_masked_env if masked else make_env] * n_envs)
+    env = VecActionMaskWrapper(subproc) if masked else subproc
+    try:
+        env.seed(seed)
+        env.reset()
+        subproc.remotes = [CountingRemote(remote) for remote in subproc.remotes]
+        rng = np.random.default_rng(seed)
+        start = time.perf_counter()
+        for _ in range(n_steps):
+            # As in MaskablePPO.collect_rollouts: masks, then step
+            masks = get_action_masks(env)
+            env.step(sample_masked_actions(masks, rng))
+        elapsed = time.perf_counter() - start
+        messages = sum(remote.sent for remote in subproc.remotes)
+        return n_envs * n_steps / elapsed, messages / n_steps
+    finally:
+        env.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mask round-trips of SubprocVecEnv")
+    parser.add_argument("--num-envs", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--steps", type=int, default=2000, help="Vector steps per measurement")
+    args = parser.parse_args()
+
+    print(f"Env steps/sec and worker messages per vector step, {os.cpu_count()} CPUs")
+    print(f"{'num_envs':<10}{'Subproc':>12}{'msgs':>6}{'+VecActionMask':>16}{'msgs':>6}{'speedup':>10}")
+    for num_envs in args.num_envs:
+        base_rate, base_messages = bench(num_envs, args.steps, masked=False)
+        rate, messages = bench(num_envs, args.steps, masked=True)
+        print(f"{num_envs:<10}{base_rate:>12.0f}{base_messages:>6.0f}{rate:>16.0f}{messages:>6.0f}"
+              f"{rate / base_rate:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
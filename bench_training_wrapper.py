@@ -0,0 +1,71 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+from puerto_rico_wrappers import PuertoRicoSelfPlayWrapper, ActionMaskWrapper, PuertoRicoTrainingWrapper
+
+
+def make_sb3_stack():
+    """The former train_ppo.make_env() stack (requires sb3-contrib)."""
+    from sb3_contrib.common.wrappers import ActionMasker
+    from stable_baselines3.common.monitor import Monitor
+    env = PuertoRicoSelfPlayWrapper(PuertoRicoEnv2P())
+    return Monitor(ActionMasker(env, lambda env: env.action_masks()))
+
+
+STACKS = [
+    ("env (no wrapper)", PuertoRicoEnv2P),
+    ("SelfPlay+ActionMaskWrapper", lambda: ActionMaskWrapper(PuertoRicoSelfPlayWrapper(PuertoRicoEnv2P()))),
+    ("SelfPlay+ActionMasker+Monitor", make_sb3_stack),
+    ("PuertoRicoTrainingWrapper", lambda: PuertoRicoTrainingWrapper(PuertoRicoEnv2P())),
+]
+
+
+def bench_stack(make, n_steps, repeats, seed=0):
+    """Best µs per (action_masks + step), the calls a MaskablePPO rollout makes per env step."""
+    env = make()
+    # gymnasium 1.x wrappers (e.g. Monitor) do not forward attributes
+    masks_of = env.get_wrapper_attr("action_masks")
+    best = float("inf")
+    for _ in range(repeats):
+        rng = np.random.default_rng(seed)
+        env.reset(seed=seed)
+        game = 0
+        start = time.perf_counter()
+        for _ in range(n_steps):
+            mask = masks_of()
+            legal = np.flatnonzero(mask)
+            _, _, terminated, truncated, _ = env.step(int(legal[rng.integers(len(legal))]))
+            if terminated or truncated:
+                game += 1
+                env.reset(seed=seed + game)
+        best = min(best, (time.perf_counter() - start) / n_steps * 1e6)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-step overhead of the training wrappers")
+    parser.add_argument("--steps", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"µs per env step (action_masks + step, random legal play), best of {args.repeats}")
+    print(f"{'Stack':<32}{'µs/step':>10}{'overhead':>10}")
+    base = None
+    for name, make in STACKS:
+        try:
+            us = bench_stack(make, args.steps, args.repeats)
+        except ImportError:
+            print(f"{name:<32}{'skipped (sb3-contrib not installed)':>20}")
+            continue
+        base = us if base is None else base
+        print(f"{name:<32}{us:>10.1f}{us - base:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import gymnasium as gym
+from puerto_rico_env import ENV_ID  # Importing the env module registers ENV_ID
+from puerto_rico_vector import sample_masked_actions
+
+VARIANTS = [
+    ("sync", dict(vectorization="sync")),
+    ("async", dict(vectorization="async", shared_memory=False)),
+    ("async+shm", dict(vectorization="async", shared_memory=True)),
+]
+
+
+def bench_vector_env(num_envs, variant_kwargs, n_steps, env_kwargs, seed=0):
+    """Env steps/sec (num_envs * vector steps / time) with random legal actions."""
+    envs = gym.make_vec(ENV_ID, num_envs=num_envs, **variant_kwargs, **env_kwargs)
+    try:
+        rng = np.random.default_rng(seed)
+        envs.reset(seed=seed)
+        # Warm up the workers before timing
+        for _ in range(10):
+            envs.step(sample_masked_actions(envs.action_masks(), rng))
+        start = time.perf_counter()
+        for _ in range(n_steps):
+            envs.step(sample_masked_actions(envs.action_masks(), rng))
+        return num_envs * n_steps / (time.perf_counter() - start)
+    finally:
+        envs.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async (shared memory) vector envs")
+    parser.add_argument("--num-envs", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--steps", type=int, default=2000, help="Vector steps per measurement")
+    parser.add_argument("--obs-mode", default="raw", choices=["raw", "encoded"])
+    parser.add_argument("--mayor-mode", default="slot", choices=["slot", "allocation"])
+    args = parser.parse_args()
+    env_kwargs = dict(obs_mode=args.obs_mode, mayor_mode=args.mayor_mode)
+
+    print(f"Env steps/sec, {args.steps} vector steps, {os.cpu_count()} CPUs, obs_mode={args.obs_mode}")
+    print(f"{'num_envs':<10}" + "".join(f"{name:>12}" for name, _ in VARIANTS) + f"{'speedup':>10}")
+    for num_envs in args.num_envs:
+        rates = [bench_vector_env(num_envs, kwargs, args.steps, env_kwargs) for _, kwargs in VARIANTS]
+        print(f"{num_envs:<10}" + "".join(f"{rate:>12.0f}" for rate in rates) + f"{rates[-1] / rates[0]:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
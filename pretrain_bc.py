@@ -0,0 +1,144 @@
+"""
+Behavior-cloning / value pretraining from offline datasets (puerto_rico_dataset).
+
+Fits the same MaskablePPO MultiInputPolicy used by train_ppo.py:
+    - actor: masked cross-entropy on the recorded actions
+    - critic: regression on the game outcome from the acting player's view
+      (+1 win, -1 loss, 0 tie; puerto_rico_wrappers.outcome_reward)
+The model is built with train_ppo.make_model(), so the saved checkpoint has the
+training hyperparameters (PPO_KWARGS). Minibatches are read from the
+memory-mapped shards by a background thread and queued ahead of the optimizer.
+The result is saved with model.save() and warm-starts RL via
+`python train_ppo.py ppo_puerto_pretrained.zip` (which loads its parameters only).
+
+    python pretrain_bc.py --data data/random --steps 20000
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+
+import numpy as np
+import torch as th
+import torch.nn.functional as F
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_dataset import OfflineDataset
+from train_ppo import make_env, make_model
+from puerto_rico_wrappers import outcome_reward
+
+
+class BatchPrefetcher:
+    """
+    Samples minibatches on a daemon thread and keeps up to `depth` ready.
+    An exception raised by dataset.sample() is re-raised by get().
+    """
+    def __init__(self, dataset, batch_size, seed=0, depth=8):
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self.queue = queue.Queue(maxsize=depth)
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                batch = self.dataset.sample(self.batch_size, self.rng)
+            except Exception as e:
+                # Hand the error to the consumer instead of leaving get() blocked
+                self._put(e)
+                return
+            self._put(batch)
+
+    def _put(self, item):
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def get(self):
+        item = self.queue.get()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def close(self):
+        self.stop_event.set()
+        self.thread.join()
+
+
+def outcome_targets(batch):
+    """Terminal reward of the acting player (+1 win, -1 loss, 0 tie), as the wrappers assign it."""
+    return outcome_reward(batch["winner"], batch["player"]).astype(np.float32)
+
+
+def pretrain(args):
+    dataset = OfflineDataset(args.data)
+    env = DummyVecEnv([make_env])
+    model = make_model(env, args.init, verbose=0)
+    policy = model.policy
+    if dataset.shards[0]["mask"].shape[1] != policy.action_space.n:
+        raise ValueError(f"Dataset masks have width {dataset.shards[0]['mask'].shape[1]}, "
+                         f"policy has {policy.action_space.n} actions (mayor_mode mismatch?)")
+    for group in policy.optimizer.param_groups:
+        group["lr"] = args.lr
+
+    print(f"Dataset: {len(dataset)} positions in {len(dataset.shards)} shards")
+    prefetcher = BatchPrefetcher(dataset, args.batch_size, seed=args.seed, depth=args.prefetch)
+    policy.set_training_mode(True)
+    try:
+        for step in range(1, args.steps + 1):
+            batch = prefetcher.get()
+            obs, _ = policy.obs_to_tensor(batch["obs"])
+            actions = th.as_tensor(batch["action"], dtype=th.long, device=policy.device)
+            masks = batch["mask"].astype(bool)
+            targets = th.as_tensor(outcome_targets(batch), device=policy.device)
+
+            values, log_prob, entropy = policy.evaluate_actions(obs, actions, action_masks=masks)
+            policy_loss = -log_prob.mean()
+            value_loss = F.mse_loss(values.flatten(), targets)
+            loss = policy_loss + args.vf_coef * value_loss
+
+            policy.optimizer.zero_grad()
+            loss.backward()
+            th.nn.utils.clip_grad_norm_(policy.parameters(), model.max_grad_norm)
+            policy.optimizer.step()
+
+            if step % args.log_every == 0:
+                with th.no_grad():
+                    accuracy = (policy.get_distribution(obs, action_masks=masks).mode() == actions).float().mean()
+                print(f"step {step}: policy_loss={policy_loss.item():.4f} value_loss={value_loss.item():.4f} "
+                      f"entropy={entropy.mean().item():.3f} accuracy={accuracy.item():.3f}")
+    except KeyboardInterrupt:
+        print("Pretraining interrupted.")
+    finally:
+        prefetcher.close()
+        policy.set_training_mode(False)
+        model.save(args.out)
+        print(f"Model saved to {args.out}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pretrain the MaskablePPO policy from offline game datasets")
+    parser.add_argument("--data", required=True, help="Dataset directory written by puerto_rico_dataset")
+    parser.add_argument("--init", default=None, help="Optional MaskablePPO checkpoint to continue from")
+    parser.add_argument("--out", default="ppo_puerto_pretrained")
+    parser.add_argument("--steps", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--lr", type=float, default=3e-4)
+    parser.add_argument("--vf-coef", type=float, default=0.5)
+    parser.add_argument("--prefetch", type=int, default=8, help="Minibatches queued ahead")
+    parser.add_argument("--log-every", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    pretrain(parse_args())
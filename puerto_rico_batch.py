@@ -0,0 +1,304 @@
+# puerto_rico_batch.py
+"""
+Vectorized kernels over many game states at once.
+
+stack_states() turns a list of GameState objects into a dict of arrays with a
+leading batch axis (N); the kernels below evaluate rules on the whole batch
+with NumPy instead of looping over envs. Results match the scalar methods of
+PuertoRicoEnv2P exactly (see the parity tests).
+
+Per-player fields have shape (N, NUM_PLAYERS, ...); empty tiles, buildings,
+goods and market slots are -1 as in the observation.
+"""
+from operator import itemgetter
+import numpy as np
+import puerto_rico_constants as c
+
+# Lookup tables indexed by building ID + 1 (row 0 = empty slot)
+def _building_table(values):
+    return np.array([0] + [values(b_id) for b_id in range(c.NUM_BUILDINGS)], dtype=np.int16)
+
+BUILDING_VP = _building_table(lambda b_id: c.BUILDING_INFO[b_id][1])
+# Guild Hall: 1 VP per small, 2 VP per large production building
+GUILD_HALL_VP = _building_table(lambda b_id: (
+    1 if b_id in (c.BUILDING_SMALL_FRUIT, c.BUILDING_SMALL_SUGAR) else
+    2 if b_id in (c.BUILDING_LARGE_FRUIT, c.BUILDING_LARGE_SUGAR, c.BUILDING_TOBACCO, c.BUILDING_COFFEE) else 0))
+# City Hall: 1 VP per violet (non-production) building
+IS_VIOLET = _building_table(lambda b_id: b_id not in c.PRODUCTION_BUILDINGS).astype(bool)
+
+
+# Flat row layout used by stack_states: (name, width); per-player fields are
+# repeated for each player after the global fields
+GLOBAL_FIELDS = [
+    ("phase", 1), ("current_player", 1), ("governor", 1), ("privilege", 1), ("hacienda_used", 1),
+    ("supply_colonists", 1), ("supply_vp", 1), ("supply_quarries", 1), ("colonist_ship", 1),
+    ("roles_available", c.NUM_ROLES), ("roles_doubloons", c.NUM_ROLES), ("supply_goods", c.NUM_GOODS),
+    ("market", 3), ("trading_house", 4),
+    ("ship_good", len(c.SHIP_CAPACITIES)), ("ship_count", len(c.SHIP_CAPACITIES)),
+    ("ship_capacity", len(c.SHIP_CAPACITIES)), ("building_supply", c.NUM_BUILDINGS),
+]
+PLAYER_FIELDS = [
+    ("doubloons", 1), ("vp_chips", 1), ("san_juan", 1), ("wharf_used", 1),
+    ("goods", c.NUM_GOODS), ("last_produced", c.NUM_GOODS),
+    ("island_tile", 12), ("island_workers", 12), ("city_building", 12), ("city_workers", 12),
+]
+BOOL_FIELDS = {"privilege", "hacienda_used", "roles_available", "wharf_used"}
+GLOBAL_WIDTH = sum(width for _, width in GLOBAL_FIELDS)
+PLAYER_WIDTH = sum(width for _, width in PLAYER_FIELDS)
+
+
+_good, _count, _capacity = itemgetter('good'), itemgetter('count'), itemgetter('capacity')
+_tile, _building, _workers = itemgetter('tile'), itemgetter('building'), itemgetter('workers')
+_BUILDING_IDS = range(c.NUM_BUILDINGS)
+
+
+def _state_row(gs):
+    row = [gs.phase, gs.current_player_idx, gs.governor_idx, gs.current_role_privilege, gs.hacienda_used,
+           gs.supply_colonists, gs.supply_vp, gs.supply_quarries, gs.colonist_ship]
+    row += gs.roles_available
+    row += gs.roles_doubloons
+    row += gs.supply_goods
+    row += gs.market_plantations
+    row += [-1] * (3 - len(gs.market_plantations))
+    row += gs.trading_house
+    row += map(_good, gs.ships)
+    row += map(_count, gs.ships)
+    row += map(_capacity, gs.ships)
+    row += map(gs.building_supply.__getitem__, _BUILDING_IDS)
+    for p in gs.players:
+        row += (p.doubloons, p.vp_chips, p.san_juan_workers, p.wharf_used)
+        row += p.goods
+        row += p.last_produced_goods
+        row += map(_tile, p.island)
+        row += map(_workers, p.island)
+        row += map(_building, p.city)
+        row += map(_workers, p.city)
+    return row
+
+
+def stack_states(states):
+    """
+    Stack GameState objects into a dict of (N, ...) arrays (int16, bool flags).
+    All fields are views into one (N, width) array built in a single pass.
+    """
+    flat = np.array([_state_row(gs) for gs in states], dtype=np.int16).reshape(len(states), -1)
+    batch = {}
+    offset = 0
+    for name, width in GLOBAL_FIELDS:
+        batch[name] = flat[:, offset] if width == 1 else flat[:, offset:offset + width]
+        offset += width
+    players = flat[:, offset:].reshape(len(states), c.NUM_PLAYERS, PLAYER_WIDTH)
+    offset = 0
+    for name, width in PLAYER_FIELDS:
+        batch[name] = players[..., offset] if width == 1 else players[..., offset:offset + width]
+        offset += width
+    for name in BOOL_FIELDS:
+        batch[name] = batch[name].astype(bool)
+    return batch
+
+
+def occupied_buildings(batch, b_id):
+    """(N, NUM_PLAYERS) bool: player has building `b_id` with at least one worker."""
+    return ((batch["city_building"] == b_id) & (batch["city_workers"] > 0)).any(axis=-1)
+
+
+def calculate_scores_batch(batch):
+    """
+    Batched PuertoRicoEnv2P._calculate_score.
+    Returns (scores, tie_breakers), each (N, NUM_PLAYERS) int32.
+    """
+    city = batch["city_building"].astype(np.intp) + 1
+    vp_chips = batch["vp_chips"].astype(np.int32)
+
+    # VP chips + building VP (occupied or not)
+    scores = vp_chips + BUILDING_VP[city].sum(axis=-1, dtype=np.int32)
+
+    # Large building bonuses, only when occupied
+    guild_hall = GUILD_HALL_VP[city].sum(axis=-1, dtype=np.int32)
+    filled_island = (batch["island_tile"] != -1).sum(axis=-1, dtype=np.int32)
+    residence = np.maximum(filled_island - 5, 4)  # <=9: 4, 10: 5, 11: 6, 12: 7
+    total_workers = (batch["island_workers"].sum(axis=-1, dtype=np.int32)
+                     + batch["city_workers"].sum(axis=-1, dtype=np.int32)
+                     + batch["san_juan"])
+    fortress = total_workers // 3
+    customs_house = vp_chips // 4
+    city_hall = IS_VIOLET[city].sum(axis=-1, dtype=np.int32)
+
+    scores += occupied_buildings(batch, c.BUILDING_GUILD_HALL) * guild_hall
+    scores += occupied_buildings(batch, c.BUILDING_RESIDENCE) * residence
+    scores += occupied_buildings(batch, c.BUILDING_FORTRESS) * fortress
+    scores += occupied_buildings(batch, c.BUILDING_CUSTOMS_HOUSE) * customs_house
+    scores += occupied_buildings(batch, c.BUILDING_CITY_HALL) * city_hall
+
+    # Tie breaker: doubloons + goods
+    tie_breakers = batch["doubloons"].astype(np.int32) + batch["goods"].sum(axis=-1, dtype=np.int32)
+    return scores, tie_breakers
+
+
+BUILDING_COST = np.array([c.BUILDING_INFO[b_id][0] for b_id in range(c.NUM_BUILDINGS)], dtype=np.int16)
+BUILDING_QUARRY_LIMIT = np.array([c.BUILDING_INFO[b_id][3] for b_id in range(c.NUM_BUILDINGS)], dtype=np.int16)
+BUILDING_CAPACITY = _building_table(lambda b_id: c.BUILDING_INFO[b_id][2])  # Row 0 (empty) = 0
+
+
+def action_masks_batch(batch, n_actions=c.NUM_ACTIONS):
+    """
+    Batched PuertoRicoEnv2P.get_action_mask for slot-mode Mayor (see
+    get_action_masks for envs in allocation mode). Games are grouped by phase
+    and each phase's legality is evaluated on the whole group.
+    Returns an (N, n_actions) int8 mask.
+    """
+    n = len(batch["phase"])
+    mask = np.zeros((n, n_actions), dtype=np.int8)
+    rows_all = np.arange(n)
+    cp = batch["current_player"].astype(np.intp)
+
+    def mine(name, rows):
+        """Current player's slice of a per-player field for `rows`."""
+        return batch[name][rows, cp[rows]]
+
+    def occupied(rows, b_id):
+        return ((mine("city_building", rows) == b_id) & (mine("city_workers", rows) > 0)).any(axis=-1)
+
+    def pass_if_empty(rows):
+        empty = ~mask[rows].any(axis=-1)
+        mask[rows[empty], c.ACTION_PASS] = 1
+
+    phase = batch["phase"]
+    for phase_id in np.unique(phase):
+        rows = rows_all[phase == phase_id]
+
+        if phase_id == c.PHASE_ROLE_SELECTION:
+            mask[rows, c.ACTION_CHOOSE_ROLE_SETTLER:c.ACTION_CHOOSE_ROLE_SETTLER + c.NUM_ROLES] = batch["roles_available"][rows]
+
+        elif phase_id == c.PHASE_SETTLER:
+            mask[rows, c.ACTION_SETTLER_TAKE_PLANTATION_0:c.ACTION_SETTLER_TAKE_PLANTATION_0 + 3] = batch["market"][rows] != -1
+            quarry = ((batch["privilege"][rows] | occupied(rows, c.BUILDING_CONSTRUCTION_HUT))
+                      & (batch["supply_quarries"][rows] > 0))
+            mask[rows, c.ACTION_SETTLER_TAKE_QUARRY] = quarry
+            mask[rows, c.ACTION_USE_HACIENDA] = occupied(rows, c.BUILDING_HACIENDA) & ~batch["hacienda_used"][rows]
+            mask[rows, c.ACTION_PASS] = 1
+
+        elif phase_id == c.PHASE_MAYOR:
+            # Slot vacancy, only while colonists wait in San Juan
+            placing = mine("san_juan", rows) > 0
+            tiles, tile_workers = mine("island_tile", rows), mine("island_workers", rows)
+            buildings, building_workers = mine("city_building", rows), mine("city_workers", rows)
+            island_free = (tiles != -1) & (tile_workers == 0)
+            city_free = (buildings != -1) & (building_workers < BUILDING_CAPACITY[buildings.astype(np.intp) + 1])
+            mask[rows, c.ACTION_MAYOR_PLACE_PLANTATION_0:c.ACTION_MAYOR_PLACE_PLANTATION_0 + 12] = island_free & placing[:, None]
+            mask[rows, c.ACTION_MAYOR_PLACE_BUILDING_0:c.ACTION_MAYOR_PLACE_BUILDING_0 + 12] = city_free & placing[:, None]
+            pass_if_empty(rows)
+
+        elif phase_id == c.PHASE_BUILDER:
+            buildings = mine("city_building", rows)
+            has_room = (buildings != -1).sum(axis=-1) < 12
+            built = (buildings[:, :, None] == np.arange(c.NUM_BUILDINGS)).any(axis=1)
+            quarries = ((mine("island_tile", rows) == c.PLANTATION_QUARRY) & (mine("island_workers", rows) > 0)).sum(axis=-1)
+            cost = (BUILDING_COST - batch["privilege"][rows, None]
+                    - np.minimum(quarries[:, None], BUILDING_QUARRY_LIMIT))
+            affordable = mine("doubloons", rows)[:, None] >= np.maximum(cost, 0)
+            buildable = has_room[:, None] & ~built & (batch["building_supply"][rows] > 0) & affordable
+            mask[rows, c.ACTION_BUILD_START:c.ACTION_BUILD_START + c.NUM_BUILDINGS] = buildable
+            mask[rows, c.ACTION_PASS] = 1
+
+        elif phase_id == c.PHASE_CRAFTSMAN:
+            bonus = (mine("last_produced", rows) > 0) & (batch["supply_goods"][rows] > 0)
+            mask[rows, c.ACTION_CRAFTSMAN_BONUS_CORN:c.ACTION_CRAFTSMAN_BONUS_CORN + c.NUM_GOODS] = bonus
+            pass_if_empty(rows)
+
+        elif phase_id == c.PHASE_TRADER:
+            # Trading house membership (ignored with an occupied Office), house not full
+            house = batch["trading_house"][rows]
+            in_house = (house[:, :, None] == np.arange(c.NUM_GOODS)).any(axis=1)
+            has_space = (house == -1).any(axis=-1)
+            sellable = ((mine("goods", rows) > 0) & (occupied(rows, c.BUILDING_OFFICE)[:, None] | ~in_house)
+                        & has_space[:, None])
+            mask[rows, c.ACTION_SELL_CORN:c.ACTION_SELL_CORN + c.NUM_GOODS] = sellable
+            pass_if_empty(rows)
+
+        elif phase_id == c.PHASE_CAPTAIN:
+            # Ship compatibility: a ship already carrying the good with room, or an
+            # empty ship while no other ship carries it
+            ship_good, ship_count = batch["ship_good"][rows], batch["ship_count"][rows]
+            ship_capacity = batch["ship_capacity"][rows]
+            goods_axis = np.arange(c.NUM_GOODS)[:, None]
+            carrying = ship_good[:, None, :] == goods_axis  # (rows, goods, ships)
+            carried = (carrying & (ship_count[:, None, :] > 0)).any(axis=-1)
+            has_room = (carrying & (ship_count < ship_capacity)[:, None, :]).any(axis=-1)
+            empty_ship = (ship_count == 0).any(axis=-1)
+            has_goods = mine("goods", rows) > 0
+            mask[rows, c.ACTION_SHIP_CORN:c.ACTION_SHIP_CORN + c.NUM_GOODS] = (
+                has_goods & ((empty_ship[:, None] & ~carried) | has_room))
+            has_wharf = occupied(rows, c.BUILDING_WHARF) & ~mine("wharf_used", rows)
+            mask[rows, c.ACTION_SHIP_TO_WHARF_CORN:c.ACTION_SHIP_TO_WHARF_CORN + c.NUM_GOODS] = has_goods & has_wharf[:, None]
+            pass_if_empty(rows)
+
+        elif phase_id == c.PHASE_ROTTING:
+            mask[rows, c.ACTION_KEEP_CORN:c.ACTION_KEEP_CORN + c.NUM_GOODS] = mine("goods", rows) > 0
+
+        elif phase_id == c.PHASE_PROSPECTOR:
+            mask[rows, c.ACTION_PASS] = 1
+
+    return mask
+
+
+def get_action_masks(envs, batch=None):
+    """
+    Action masks of several envs as one (N, action_space.n) int8 array.
+    Rows of allocation-mode envs in the Mayor phase come from the env itself
+    (allocations are enumerated per tableau); all others use the batched kernel.
+    Pass `batch` (stack_states of the envs' states) to reuse an existing stack;
+    stacking costs more than the kernel itself.
+    """
+    n_actions = envs[0].action_space.n
+    if batch is None:
+        batch = stack_states([env.game_state for env in envs])
+    masks = action_masks_batch(batch, n_actions)
+    for i, env in enumerate(envs):
+        if env.mayor_mode == "allocation" and env.game_state.phase == c.PHASE_MAYOR:
+            masks[i] = env.get_action_mask()
+    return masks
+
+
+# Good produced by each building (row 0 / non-production = -1)
+PRODUCTION_GOOD = _building_table(lambda b_id: c.PRODUCTION_BUILDINGS.get(b_id, -1))
+PRODUCTION_GOOD[0] = -1
+FACTORY_BONUS = np.array(c.FACTORY_BONUS, dtype=np.int16)
+
+
+def production_from_counts(occupied, capacity, has_factory, supply_goods):
+    """
+    Production phase from per-player counts; works for one game or a batch.
+        occupied     (..., P, NUM_GOODS)  occupied plantations per good
+        capacity     (..., P, NUM_GOODS)  workers in production buildings per good (corn needs none)
+        has_factory  (..., P)             occupied Factory
+        supply_goods (..., NUM_GOODS)
+    Returns (produced (..., P, NUM_GOODS), supply left (..., NUM_GOODS), factory doubloons (..., P)).
+    """
+    potential = np.minimum(occupied, capacity)
+    potential[..., c.CORN] = occupied[..., c.CORN]
+    produced = np.empty_like(potential)
+    supply = np.array(supply_goods, copy=True)
+    # Players take from the supply in index order, which matters when it runs short
+    for p_idx in range(c.NUM_PLAYERS):
+        actual = np.minimum(potential[..., p_idx, :], supply)
+        produced[..., p_idx, :] = actual
+        supply = supply - actual
+    bonus = FACTORY_BONUS[(produced > 0).sum(axis=-1)] * has_factory
+    return produced, supply, bonus
+
+
+def production_batch(batch):
+    """
+    Batched PuertoRicoEnv2P._execute_production on stacked states.
+    Returns (produced, supply left, factory doubloons) as production_from_counts;
+    goods and doubloons after production are `goods + produced` and `doubloons + bonus`.
+    """
+    goods_axis = np.arange(c.NUM_GOODS)
+    # Plantation IDs 0-4 are the good they grow; quarries (5) never match
+    worked_tiles = np.where(batch["island_workers"] > 0, batch["island_tile"], -1)
+    occupied = (worked_tiles[..., None] == goods_axis).sum(axis=-2)
+    building_good = PRODUCTION_GOOD[batch["city_building"].astype(np.intp) + 1]
+    capacity = ((building_good[..., None] == goods_axis) * batch["city_workers"][..., None]).sum(axis=-2)
+    has_factory = occupied_buildings(batch, c.BUILDING_FACTORY)
+    return production_from_counts(occupied, capacity, has_factory, batch["supply_goods"])
@@ -0,0 +1,216 @@
+# puerto_rico_bots.py
+"""
+Vectorized heuristic bots: cheap non-learned baselines and rollout policies.
+
+A bot maps a batch of observations (dict of (N, ...) arrays, raw or canonical
+as returned by PuertoRicoEnv2P, vector envs or the self-play wrapper) and
+action masks (N, A) to actions (N,), with NumPy only:
+
+    actions = BOTS["builder_first"](obs, masks, rng)
+
+Every bot scores all actions of the batch at once and plays the best legal
+one; ties are broken uniformly at random with `rng`, so a seeded rng makes
+the bot deterministic. Masks may come from either mayor_mode; allocation
+actions are scored as ties. The acting player is read from global[33]
+(always 0 in the canonical view, where the actor is also player row 0).
+
+For puerto_rico_sim.simulate use the "bot:NAME" policy spec.
+"""
+import numpy as np
+import puerto_rico_constants as c
+from puerto_rico_batch import BUILDING_VP, BUILDING_COST, BUILDING_QUARRY_LIMIT, BUILDING_CAPACITY, PRODUCTION_GOOD
+
+# Raw observation layout (see PuertoRicoEnv2P.__init__)
+_ROLE_DOUBLOONS = slice(15, 22)
+_SHIP_GOOD = [26, 29]
+_SHIP_COUNT = [27, 30]
+_SHIP_CAPACITY = [28, 31]
+_CURRENT_PLAYER = 33
+_DOUBLOONS = 0
+_GOODS = slice(2, 7)
+_ISLAND_TILE = slice(7, 31, 2)
+_ISLAND_WORKERS = slice(8, 31, 2)
+_CITY_BUILDING = slice(31, 55, 2)
+
+_BUILD = slice(c.ACTION_BUILD_START, c.ACTION_BUILD_START + c.NUM_BUILDINGS)
+_SELL = slice(c.ACTION_SELL_CORN, c.ACTION_SELL_CORN + c.NUM_GOODS)
+_SHIP = slice(c.ACTION_SHIP_CORN, c.ACTION_SHIP_CORN + c.NUM_GOODS)
+_WHARF = slice(c.ACTION_SHIP_TO_WHARF_CORN, c.ACTION_SHIP_TO_WHARF_CORN + c.NUM_GOODS)
+_CRAFTSMAN_BONUS = slice(c.ACTION_CRAFTSMAN_BONUS_CORN, c.ACTION_CRAFTSMAN_BONUS_CORN + c.NUM_GOODS)
+_KEEP = slice(c.ACTION_KEEP_CORN, c.ACTION_KEEP_CORN + c.NUM_GOODS)
+_MAYOR_PLANTATION = slice(c.ACTION_MAYOR_PLACE_PLANTATION_0, c.ACTION_MAYOR_PLACE_PLANTATION_11 + 1)
+_MAYOR_BUILDING = slice(c.ACTION_MAYOR_PLACE_BUILDING_0, c.ACTION_MAYOR_PLACE_BUILDING_11 + 1)
+
+# Per building ID (without the empty row of the batch tables)
+_VP = BUILDING_VP[1:].astype(np.float64)
+_COST = BUILDING_COST.astype(np.float64)
+_PRODUCTION_CAPACITY = np.where(PRODUCTION_GOOD[1:] >= 0, BUILDING_CAPACITY[1:], 0).astype(np.float64)
+_TRADE_PRICE = np.arange(c.NUM_GOODS, dtype=np.float64)  # Corn 0 ... Coffee 4
+_GOOD_IDS = np.arange(c.NUM_GOODS)
+_BUILDING_IDS = np.arange(c.NUM_BUILDINGS)
+
+
+def _static_scores(role_scores, action_scores):
+    """Score row over the base actions: role picks, then (action or slice, score) pairs."""
+    row = np.zeros(c.NUM_ACTIONS, dtype=np.float64)
+    row[c.ACTION_CHOOSE_ROLE_SETTLER:c.ACTION_CHOOSE_ROLE_PROSPECTOR + 1] = role_scores
+    for index, value in action_scores:
+        row[index] = value
+    return row
+
+
+class Features:
+    """Acting-player view of an observation batch, shared by the bots."""
+    def __init__(self, obs):
+        global_vec = np.asarray(obs["global"])
+        players = np.asarray(obs["players"])
+        n = len(global_vec)
+        me = global_vec[:, _CURRENT_PLAYER].astype(np.intp)
+        mine = players[np.arange(n), me]
+        self.n = n
+        self.role_doubloons = global_vec[:, _ROLE_DOUBLOONS].astype(np.float64)
+        self.doubloons = mine[:, _DOUBLOONS].astype(np.float64)
+        self.goods = mine[:, _GOODS].astype(np.float64)
+        self.city = mine[:, _CITY_BUILDING]
+        island_tiles = mine[:, _ISLAND_TILE]
+        self.manned_quarries = ((island_tiles == c.PLANTATION_QUARRY) & (mine[:, _ISLAND_WORKERS] > 0)).sum(axis=1)
+        self.ship_space = self._ship_space(global_vec)
+
+    @staticmethod
+    def _ship_space(global_vec):
+        """(N, goods) space the Captain rules offer each good (0 = cannot ship)."""
+        ship_good = global_vec[:, _SHIP_GOOD]
+        room = global_vec[:, _SHIP_CAPACITY] - global_vec[:, _SHIP_COUNT]
+        empty = ship_good == -1
+        # First empty ship (ship_targets)
+        empty_space = np.where(empty[:, 0], room[:, 0], np.where(empty[:, 1], room[:, 1], 0))
+        carried = ship_good[:, :, None] == _GOOD_IDS  # (N, ships, goods)
+        carried_space = np.where(carried, room[:, :, None], 0).max(axis=1)
+        return np.where(carried.any(axis=1), carried_space, empty_space[:, None]).astype(np.float64)
+
+    def shippable(self):
+        """(N, goods) goods the acting player would load now."""
+        return np.minimum(self.goods, self.ship_space)
+
+    def affordable_buildings(self):
+        """(N, buildings) bool: affordable with manned quarries (no privilege), not yet owned."""
+        price = _COST - np.minimum(self.manned_quarries[:, None], BUILDING_QUARRY_LIMIT)
+        owned = (self.city[:, :, None] == _BUILDING_IDS).any(axis=1)
+        return (price <= self.doubloons[:, None]) & ~owned
+
+
+def choose(scores, masks, rng):
+    """Best legal action per row; exact ties broken uniformly at random."""
+    masks = np.asarray(masks).astype(bool)
+    scored = np.full(masks.shape, -np.inf)
+    width = min(scores.shape[1], masks.shape[1])
+    scored[:, :width] = scores[:, :width]
+    # Actions beyond the scored width (Mayor allocations) tie at 0
+    scored[:, width:] = 0.0
+    scored[~masks] = -np.inf
+    best = scored == scored.max(axis=1, keepdims=True)
+    return np.argmax(np.where(best, rng.random(masks.shape), -1.0), axis=1)
+
+
+def random_bot(obs, masks, rng):
+    """Uniformly random legal action."""
+    return choose(np.zeros((len(masks), c.NUM_ACTIONS)), masks, rng)
+
+
+def greedy_vp_bot(obs, masks, rng):
+    """
+    Largest immediate VP: ship the most goods, build the highest-VP building.
+    Roles are valued by the best such gain they open (Captain +1 privilege),
+    other roles by the doubloons lying on them.
+    """
+    f = Features(obs)
+    scores = np.zeros((f.n, c.NUM_ACTIONS))
+    shippable = f.shippable()
+    scores[:, _SHIP] = shippable
+    scores[:, _WHARF] = f.goods
+    scores[:, _BUILD] = _VP
+    best_build = np.where(f.affordable_buildings(), _VP, 0.0).max(axis=1)
+    roles = 0.1 * f.role_doubloons
+    roles[:, c.ACTION_CHOOSE_ROLE_CAPTAIN] += np.where(shippable.max(axis=1) > 0, shippable.max(axis=1) + 1, 0)
+    roles[:, c.ACTION_CHOOSE_ROLE_BUILDER] += best_build
+    scores[:, c.ACTION_CHOOSE_ROLE_SETTLER:c.ACTION_CHOOSE_ROLE_PROSPECTOR + 1] = roles
+    scores[:, c.ACTION_PASS] = -1
+    return choose(scores, masks, rng)
+
+
+_BUILDER_STATIC = _static_scores(
+    # Settler, Mayor, Builder, Craftsman, Trader, Captain, Prospector
+    [3, 6, 0, 2, 0, 1, 4],
+    [(c.ACTION_SETTLER_TAKE_QUARRY, 5), (_MAYOR_PLANTATION, 2), (_MAYOR_BUILDING, 1),
+     (c.ACTION_USE_HACIENDA, -1), (c.ACTION_PASS, -1)])
+
+
+def builder_first_bot(obs, masks, rng):
+    """
+    Buildings first: Builder (when something is affordable), Mayor and Trader
+    (with goods to sell) roles, quarries, and the most expensive building
+    available. Colonists go to plantations first, to keep the income flowing.
+    """
+    f = Features(obs)
+    scores = np.tile(_BUILDER_STATIC, (f.n, 1))
+    scores[:, c.ACTION_CHOOSE_ROLE_SETTLER:c.ACTION_CHOOSE_ROLE_PROSPECTOR + 1] += f.role_doubloons
+    scores[:, c.ACTION_CHOOSE_ROLE_BUILDER] += np.where(f.affordable_buildings().any(axis=1), 10, 0)
+    scores[:, c.ACTION_CHOOSE_ROLE_TRADER] += np.where(f.goods.sum(axis=1) > 0, 5, 0)
+    scores[:, _BUILD] += _COST
+    scores[:, _SELL] += _TRADE_PRICE
+    scores[:, _CRAFTSMAN_BONUS] += _TRADE_PRICE
+    scores[:, _KEEP] += _TRADE_PRICE
+    scores[:, _SHIP] += f.shippable()
+    scores[:, _WHARF] += f.goods
+    return choose(scores, masks, rng)
+
+
+_SHIPPING_STATIC = _static_scores(
+    # Settler, Mayor, Builder, Craftsman, Trader, Captain, Prospector
+    [5, 4, 3, 8, 2, 6, 1],
+    [(c.ACTION_SETTLER_TAKE_QUARRY, -2), (_MAYOR_PLANTATION, 2), (_MAYOR_BUILDING, 1), (c.ACTION_PASS, -1)])
+_SHIPPING_BUILD = _PRODUCTION_CAPACITY + 0.1 * _COST
+_SHIPPING_BUILD[c.BUILDING_HARBOR] += 6
+_SHIPPING_BUILD[c.BUILDING_WHARF] += 6
+_SHIPPING_BUILD[c.BUILDING_LARGE_WAREHOUSE] += 2
+
+
+def shipping_bot(obs, masks, rng):
+    """
+    Production and shipping: Craftsman and Captain roles (Captain scaled by
+    what it would load), plantations over quarries, production buildings plus
+    Harbor/Wharf, largest shipments, and keeps/crafts the most plentiful good.
+    """
+    f = Features(obs)
+    scores = np.tile(_SHIPPING_STATIC, (f.n, 1))
+    shippable = f.shippable()
+    scores[:, c.ACTION_CHOOSE_ROLE_SETTLER:c.ACTION_CHOOSE_ROLE_PROSPECTOR + 1] += f.role_doubloons
+    scores[:, c.ACTION_CHOOSE_ROLE_CAPTAIN] += shippable.max(axis=1)
+    scores[:, _BUILD] += _SHIPPING_BUILD
+    scores[:, _SHIP] += shippable
+    scores[:, _WHARF] += f.goods
+    scores[:, _CRAFTSMAN_BONUS] += f.goods
+    scores[:, _KEEP] += f.goods
+    scores[:, _SELL] += 0.5 * _TRADE_PRICE
+    return choose(scores, masks, rng)
+
+
+BOTS = {
+    "random": random_bot,
+    "greedy_vp": greedy_vp_bot,
+    "builder_first": builder_first_bot,
+    "shipping": shipping_bot,
+}
+
+
+class BotPolicy:
+    """A bot as a puerto_rico_sim policy (one observation at a time); picklable."""
+    def __init__(self, name):
+        if name not in BOTS:
+            raise ValueError(f"Unknown bot '{name}' (choose from {sorted(BOTS)})")
+        self.name = name
+
+    def __call__(self, env, legal_actions, rng):
+        obs = env._get_obs()
+        batch = {key: value[None] for key, value in obs.items()}
+        return int(BOTS[self.name](batch, env.get_action_mask()[None], rng)[0])
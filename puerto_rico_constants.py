@@ -117,6 +117,16 @@ BUILDING_COUNTS = {i: 2 for i in range(6)}
 for i in range(6, NUM_BUILDINGS):
     BUILDING_COUNTS[i] = 1 
 
+# Production buildings -> Good produced
+PRODUCTION_BUILDINGS = {
+    BUILDING_SMALL_FRUIT: FRUIT, BUILDING_LARGE_FRUIT: FRUIT,
+    BUILDING_SMALL_SUGAR: SUGAR, BUILDING_LARGE_SUGAR: SUGAR,
+    BUILDING_TOBACCO: TOBACCO,
+    BUILDING_COFFEE: COFFEE,
+}
+# Factory doubloons by number of kinds produced (0-5)
+FACTORY_BONUS = (0, 0, 1, 2, 3, 5)
+
 # Ships
 SHIP_CAPACITIES = [4, 6]
 
@@ -125,6 +135,11 @@ MAX_DOUBLOONS_OBS = 20  # Soft cap for obs normalization if needed
 MAX_VP_OBS = 100
 MAX_GOODS_OBS = 12      # Can have more but rare
 
+# Observation value range shared by the 'global' and 'players' boxes.
+# All fields fit in int8, so compact obs dtypes are lossless.
+OBS_LOW = -1            # Empty slot / no good
+OBS_HIGH = MAX_VP_OBS
+
 # Action Mapping
 ACTION_CHOOSE_ROLE_SETTLER = 0
 ACTION_CHOOSE_ROLE_MAYOR = 1
@@ -189,6 +204,12 @@ ACTION_PASS = 84
 
 NUM_ACTIONS = 85
 
+# Mayor allocation mode (mayor_mode="allocation"):
+# Action = ACTION_MAYOR_ALLOCATION_START + k places all colonists at once using
+# the k-th canonical allocation of the current player's tableau -> 85-212
+ACTION_MAYOR_ALLOCATION_START = NUM_ACTIONS
+MAX_MAYOR_ALLOCATIONS = 128
+
 # Phases
 PHASE_ROLE_SELECTION = 0
 PHASE_SETTLER = 1
@@ -199,4 +220,9 @@ PHASE_TRADER = 5
 PHASE_CAPTAIN = 6
 PHASE_PROSPECTOR = 7
 PHASE_ROTTING = 8
-PHASE_GAME_END = 99
\ No newline at end of file
+PHASE_GAME_END = 99
+# Game end triggers (Rulebook: VP chips run out, colonist ship cannot be refilled, 12 buildings)
+END_TRIGGER_VP = 0
+END_TRIGGER_COLONISTS = 1
+END_TRIGGER_BUILDINGS = 2
+NUM_END_TRIGGERS = 3
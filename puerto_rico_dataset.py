@@ -0,0 +1,177 @@
+# puerto_rico_dataset.py
+"""
+Offline (obs, mask, action, outcome) datasets for supervised pretraining and
+value fitting.
+
+A dataset is a directory of shards; each shard is a directory of .npy columns
+with one row per position:
+
+    obs_global (N, 35) int8      obs_players (N, 2, 56) int8   obs_market (N, 3) int8
+    mask (N, A) int8             action (N,) int16             player (N,) int8
+    winner (N,) int8 (-1 tie)    margin (N,) int16 (acting player's final score - opponent's)
+
+Observations are stored in the canonical view (acting player first), as seen
+by the self-play policy. Shards are written independently, so simulator
+workers write them in parallel; OfflineDataset opens every column with
+np.memmap (via np.load(mmap_mode="r")) and samples minibatches without
+loading the dataset into RAM.
+
+    python -m puerto_rico_dataset --games 10000 --workers 8 --out data/random
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import puerto_rico_constants as c
+from puerto_rico_encoding import canonicalize_obs
+from puerto_rico_env import PuertoRicoEnv2P
+from puerto_rico_records import GameRecord, GameReplay, env_kwargs_from_flags, read_records
+from puerto_rico_sim import simulate, make_policy
+
+OBS_COLUMNS = {"obs_global": "global", "obs_players": "players", "obs_market": "market_plantations"}
+COLUMNS = list(OBS_COLUMNS) + ["mask", "action", "player", "winner", "margin"]
+
+
+class _RecordList:
+    """In-memory stand-in for GameRecordWriter (simulate(recorder=...))."""
+    checkpoint_every = 0
+
+    def __init__(self):
+        self.records = []
+
+    def write_game(self, seed, flags, actions, scores, tie_breakers, winner, checkpoints=None):
+        self.records.append(GameRecord(seed, flags, bytes(actions),
+                                       tuple(scores[p_idx] for p_idx in range(c.NUM_PLAYERS)),
+                                       tuple(tie_breakers[p_idx] for p_idx in range(c.NUM_PLAYERS)), winner))
+
+
+def write_shard(shard_dir, records, decisions_only=True):
+    """
+    Replay `records` and write their positions as one shard. With
+    `decisions_only`, positions with a single legal action are skipped.
+    Returns the number of rows written.
+    """
+    columns = {name: [] for name in COLUMNS}
+    mask_width = None
+    for record in records:
+        env = PuertoRicoEnv2P(obs_dtype=np.int8, **env_kwargs_from_flags(record.flags))
+        if mask_width is not None and env.action_space.n != mask_width:
+            raise ValueError("All records of a shard must use the same mayor_mode")
+        mask_width = int(env.action_space.n)
+        for position in GameReplay(record, env=env).positions(stop=len(record.actions)):
+            mask = position["mask"]
+            if decisions_only and mask.sum() == 1:
+                continue
+            p_idx = position["player"]
+            obs = canonicalize_obs(position["obs"], p_idx)
+            for column, key in OBS_COLUMNS.items():
+                columns[column].append(obs[key])
+            columns["mask"].append(mask)
+            columns["action"].append(position["action"])
+            columns["player"].append(p_idx)
+            columns["winner"].append(record.winner)
+            columns["margin"].append(record.scores[p_idx] - record.scores[1 - p_idx])
+
+    dtypes = {"action": np.int16, "player": np.int8, "winner": np.int8, "margin": np.int16}
+    os.makedirs(shard_dir, exist_ok=True)
+    n_rows = len(columns["action"])
+    for name, rows in columns.items():
+        np.save(os.path.join(shard_dir, f"{name}.npy"), np.asarray(rows, dtype=dtypes.get(name, np.int8)))
+    with open(os.path.join(shard_dir, "meta.json"), "w") as f:
+        json.dump({"rows": n_rows, "games": len(records), "mask_width": mask_width,
+                   "decisions_only": decisions_only}, f)
+    return n_rows
+
+
+class OfflineDataset:
+    """Memory-mapped view over all shards in a dataset directory."""
+    def __init__(self, path):
+        self.shard_dirs = sorted(os.path.dirname(p) for p in glob.glob(os.path.join(path, "*", "meta.json")))
+        self.shards = []
+        for shard_dir in self.shard_dirs:
+            shard = {name: np.load(os.path.join(shard_dir, f"{name}.npy"), mmap_mode="r") for name in COLUMNS}
+            if len(shard["action"]):
+                self.shards.append(shard)
+        if not self.shards:
+            raise ValueError(f"No non-empty shards in {path}")
+        if len({shard["mask"].shape[1] for shard in self.shards}) != 1:
+            raise ValueError("Shards have different mask widths (mixed mayor_mode)")
+        sizes = [len(shard["action"]) for shard in self.shards]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def get(self, indices):
+        """Rows at global `indices` as a dict of in-memory arrays (obs keys as in the env)."""
+        indices = np.asarray(indices)
+        shard_ids = np.searchsorted(self.offsets, indices, side="right") - 1
+        first = self.shards[0]
+        out = {name: np.empty((len(indices),) + first[name].shape[1:], dtype=first[name].dtype) for name in COLUMNS}
+        for shard_id in np.unique(shard_ids):
+            selected = np.nonzero(shard_ids == shard_id)[0]
+            local = indices[selected] - self.offsets[shard_id]
+            for name in COLUMNS:
+                out[name][selected] = self.shards[shard_id][name][local]
+        out["obs"] = {key: out.pop(column) for column, key in OBS_COLUMNS.items()}
+        return out
+
+    def sample(self, batch_size, rng):
+        """Uniform random minibatch (with replacement)."""
+        return self.get(rng.integers(len(self), size=batch_size))
+
+
+def _simulate_shard(task):
+    shard_dir, seed, n_games, policy_specs, env_kwargs, decisions_only = task
+    recorder = _RecordList()
+    simulate(tuple(make_policy(spec) for spec in policy_specs), n_games, seed=seed,
+             env_kwargs=env_kwargs, recorder=recorder)
+    return write_shard(shard_dir, recorder.records, decisions_only)
+
+
+def _records_shard(task):
+    shard_dir, record_path, decisions_only = task
+    return write_shard(shard_dir, list(read_records(record_path)), decisions_only)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export played games as a memory-mapped dataset")
+    parser.add_argument("--out", required=True, help="Dataset directory")
+    parser.add_argument("--records", nargs="*", default=None,
+                        help="Convert existing .prgr files (one shard each) instead of simulating")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--games-per-shard", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--policies", nargs="+", default=["random"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mayor-mode", choices=["slot", "allocation"], default="slot")
+    parser.add_argument("--all-positions", action="store_true", help="Keep forced moves as well")
+    args = parser.parse_args(argv)
+    decisions_only = not args.all_positions
+
+    if args.records:
+        tasks = [(os.path.join(args.out, f"shard-{i:05d}"), path, decisions_only)
+                 for i, path in enumerate(args.records)]
+        worker_fn = _records_shard
+    else:
+        policies = tuple(args.policies * 2 if len(args.policies) == 1 else args.policies)
+        tasks = [(os.path.join(args.out, f"shard-{i:05d}"), args.seed + start,
+                  min(args.games_per_shard, args.games - start), policies,
+                  {"mayor_mode": args.mayor_mode}, decisions_only)
+                 for i, start in enumerate(range(0, args.games, args.games_per_shard))]
+        worker_fn = _simulate_shard
+
+    with Pool(args.workers) as pool:
+        rows = sum(pool.imap_unordered(worker_fn, tasks))
+    print(f"Wrote {rows} rows in {len(tasks)} shards to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# puerto_rico_encoding.py
+"""
+Observation transforms: one-hot / multi-hot planes computed by table lookup,
+and the canonical (current player first) view used for self-play.
+
+Raw observations carry tile, building and good IDs as integers (-1 = empty).
+Each ID array is shifted by +1 and used to index a lookup table whose first
+row is all zeros, so empty slots encode to zero vectors. Everything works on
+single observations and on batches with arbitrary leading dimensions.
+"""
+import numpy as np
+from gymnasium import spaces
+import puerto_rico_constants as c
+
+# Row 0 = empty (-1), row k+1 = one-hot of ID k
+_TILE_TABLE = np.vstack([np.zeros((1, c.NUM_PLANTATION_TYPES), dtype=np.int8),
+                         np.eye(c.NUM_PLANTATION_TYPES, dtype=np.int8)])
+_BUILDING_TABLE = np.vstack([np.zeros((1, c.NUM_BUILDINGS), dtype=np.int8),
+                             np.eye(c.NUM_BUILDINGS, dtype=np.int8)])
+_GOOD_TABLE = np.vstack([np.zeros((1, c.NUM_GOODS), dtype=np.int8),
+                         np.eye(c.NUM_GOODS, dtype=np.int8)])
+
+# Raw vector layout (see PuertoRicoEnv2P.__init__)
+_ISLAND_TILE_IDX = slice(7, 31, 2)
+_CITY_BUILDING_IDX = slice(31, 55, 2)
+_TRADING_HOUSE_IDX = slice(22, 26)
+_SHIP_GOOD_IDX = [26, 29]
+
+# Keys with a leading player axis (swapped by canonicalization)
+PLAYER_KEYS = ("players", "island", "city", "buildings_owned")
+
+
+def encoded_observation_spaces(dtype=np.int8):
+    """Spaces of the planes returned by `encode_observation`."""
+    return {
+        # Per island slot: one-hot plantation type
+        "island": spaces.Box(low=0, high=1, shape=(c.NUM_PLAYERS, 12, c.NUM_PLANTATION_TYPES), dtype=dtype),
+        # Per city slot: one-hot building
+        "city": spaces.Box(low=0, high=1, shape=(c.NUM_PLAYERS, 12, c.NUM_BUILDINGS), dtype=dtype),
+        # Multi-hot of buildings owned (each building at most once per player)
+        "buildings_owned": spaces.Box(low=0, high=1, shape=(c.NUM_PLAYERS, c.NUM_BUILDINGS), dtype=dtype),
+        # Per ship: one-hot loaded good
+        "ship_goods": spaces.Box(low=0, high=1, shape=(len(c.SHIP_CAPACITIES), c.NUM_GOODS), dtype=dtype),
+        # Count of each good in the trading house
+        "trading_house": spaces.Box(low=0, high=4, shape=(c.NUM_GOODS,), dtype=dtype),
+        # Per market slot: one-hot plantation type
+        "market": spaces.Box(low=0, high=1, shape=(3, c.NUM_PLANTATION_TYPES), dtype=dtype),
+    }
+
+
+def encode_observation(obs, dtype=np.int8):
+    """
+    Build one-hot/multi-hot planes from a raw observation dict.
+    `obs` may be a single observation or a batch (leading dims are preserved).
+    """
+    players = obs["players"]
+    global_vec = obs["global"]
+
+    city = _BUILDING_TABLE[players[..., _CITY_BUILDING_IDX] + 1]
+    encoded = {
+        "island": _TILE_TABLE[players[..., _ISLAND_TILE_IDX] + 1],
+        "city": city,
+        "buildings_owned": city.sum(axis=-2, dtype=np.int8),
+        "ship_goods": _GOOD_TABLE[global_vec[..., _SHIP_GOOD_IDX] + 1],
+        "trading_house": _GOOD_TABLE[global_vec[..., _TRADING_HOUSE_IDX] + 1].sum(axis=-2, dtype=np.int8),
+        "market": _TILE_TABLE[obs["market_plantations"] + 1],
+    }
+    if dtype != np.int8:
+        encoded = {key: arr.astype(dtype) for key, arr in encoded.items()}
+    return encoded
+
+
+def canonicalize_obs(obs, player_idx):
+    """
+    Transform observation so `player_idx` (Current Player) is always at index 0 of `players_vec`.
+    Used by the self-play wrapper and by code that needs the policy's view outside it.
+    """
+    if player_idx == 0:
+        return obs
+        
+    # If Player 1 is current, Swap P0 and P1 in 'players'
+    # obs structure: 'global', 'players', 'market_plantations'
+    
+    new_obs = obs.copy()
+    
+    # Swap rows 0 and 1 of every per-player array (raw and encoded planes)
+    # P0 -> P1 slot, P1 -> P0 slot
+    for key in PLAYER_KEYS:
+        if key in new_obs:
+            new_obs[key] = np.flip(new_obs[key], axis=0).copy()
+    
+    # Update Global Vector Details if they depend on absolute index
+    # global[32] = Governor Index
+    # global[33] = Current Player Index
+    # global[34] = Colonist Ship
+    
+    g_vec = new_obs['global'].copy()
+    
+    # Governor Index: If it was 0, and I am 1. Relative?
+    # Let's make it Relative Governor: 1 if Me, 0 if Opponent.
+    gov_idx = g_vec[32]
+    relative_gov = 1 if gov_idx == player_idx else 0
+    g_vec[32] = relative_gov
+    
+    # Current Player Index: Always 0 in canonical view
+    g_vec[33] = 0 
+    
+    new_obs['global'] = g_vec
+    
+    return new_obs
@@ -1,8 +1,51 @@
 import gymnasium as gym
 import numpy as np
-import random
+import itertools
+import struct
+from functools import lru_cache
 from gymnasium import spaces
 import puerto_rico_constants as c
+from puerto_rico_encoding import encode_observation, encoded_observation_spaces
+
+# Fixed layout of GameState.to_bytes() (little-endian, 223 bytes)
+_PACKED_STATE = struct.Struct("<" + "".join([
+    "BB",                           # flags (_PACKED_*), roles_available bits
+    "Q",                            # seed
+    "16s16sBI",                     # PCG64 state, inc, has_uint32, uinteger
+    "5BbbB",                        # supply goods, colonists, vp, quarries
+    "3b",                           # market plantations (-1 = empty)
+    "7B",                           # role doubloons
+    "4b",                           # trading house
+    "bBBbBB",                       # ships: good, count, capacity
+    "BBB",                          # governor, current player, colonist ship
+    f"{c.NUM_BUILDINGS}B",          # building supply
+    "BBBbB",                        # phase, round, roles taken, current role, captain passes
+    "B4b",                          # action queue (length, players)
+    "B2b",                          # rotting queue (length, players)
+    "B4bB",                         # rotting protected types (length, goods), rotting step
+    "BB17s6s",                      # deck/discard lengths, their tiles and per-type counts (nibbles)
+] + [
+    "hB5B12s12sB5BB",               # per player: doubloons, vp chips, goods, island, city,
+] * c.NUM_PLAYERS))                 #   san juan, last produced goods, wharf used
+
+_PACKED_HAS_SEED = 1
+_PACKED_HAS_RNG = 2
+_PACKED_END_TRIGGERED = 4
+_PACKED_PRIVILEGE = 8
+_PACKED_HACIENDA_USED = 16
+
+
+def _pack_nibbles(values, n_bytes):
+    values = list(values) + [0] * (2 * n_bytes - len(values))
+    return bytes([low | (high << 4) for low, high in zip(values[0::2], values[1::2])])
+
+
+_NIBBLE_PAIRS = [(byte & 0xF, byte >> 4) for byte in range(256)]
+
+
+def _unpack_nibbles(data, n):
+    return [value for byte in data for value in _NIBBLE_PAIRS[byte]][:n]
+
 
 class GameState:
     def __init__(self):
@@ -16,6 +59,9 @@ class GameState:
         self.plantation_deck = []
         self.market_plantations = [] # Face up
         self.discarded_plantations = []
+        # deck_mode="counts": remaining/discarded tiles per plantation type instead of lists
+        self.deck_counts = [0] * c.NUM_PLANTATION_TYPES
+        self.discard_counts = [0] * c.NUM_PLANTATION_TYPES
         
         # Roles
         self.roles_available = [True] * c.NUM_ROLES
@@ -30,6 +76,9 @@ class GameState:
             {'good': -1, 'count': 0, 'capacity': 4},
             {'good': -1, 'count': 0, 'capacity': 6}
         ]
+        # Shipping table: per good [target ship index or -1, space left].
+        # Refreshed whenever a ship is loaded or cleared (see ship_targets()).
+        self.ship_targets = ship_targets(self.ships)
         
         self.governor_idx = 0
         self.current_player_idx = 0
@@ -40,6 +89,7 @@ class GameState:
         
         # Turn/Phase Control
         self.phase = c.PHASE_ROLE_SELECTION
+        self.round = 0 # Rounds completed
         self.roles_taken_count = 0 # 0 to 6 in a round
         self.current_role = -1
         self.current_role_privilege = False # Does current actor have privilege?
@@ -55,6 +105,149 @@ class GameState:
         self.rotting_queue = [] # Players who need to discard
         self.rotting_protected_types = [] # List of good types protected so far for current rotting player
         self.rotting_step = 0 # 0: Small WH, 1: Large WH, 2: Windrose
+        
+        self.game_end_triggered = False
+        
+        # Per-game RNG for all shuffles/draws, so a game depends only on its
+        # seed even when many games are stepped interleaved in one process
+        self.seed = None
+        self.rng = None
+
+    @property
+    def rng(self):
+        # States unpacked by from_bytes() keep the packed PCG64 state until the
+        # first draw, so decoding a state does not pay for building a Generator
+        if self._packed_rng is not None:
+            state, inc, has_uint32, uinteger = self._packed_rng
+            self._rng = np.random.Generator(np.random.PCG64(0))
+            self._rng.bit_generator.state = {
+                "bit_generator": "PCG64",
+                "state": {"state": int.from_bytes(state, "little"), "inc": int.from_bytes(inc, "little")},
+                "has_uint32": has_uint32, "uinteger": uinteger}
+            self._packed_rng = None
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        self._rng = value
+        self._packed_rng = None
+
+    def to_bytes(self):
+        """
+        Pack the full state (including the RNG position) into a fixed-size
+        byte string; see _PACKED_STATE. Derived fields (ship_targets) are
+        recomputed by from_bytes().
+        """
+        flags = 0
+        if self.seed is not None:
+            flags |= _PACKED_HAS_SEED
+        if self.game_end_triggered:
+            flags |= _PACKED_END_TRIGGERED
+        if self.current_role_privilege:
+            flags |= _PACKED_PRIVILEGE
+        if self.hacienda_used:
+            flags |= _PACKED_HACIENDA_USED
+        rng_state = self._packed_rng or (b"\0" * 16, b"\0" * 16, 0, 0)
+        if self._packed_rng is not None:
+            flags |= _PACKED_HAS_RNG
+        elif self._rng is not None:
+            flags |= _PACKED_HAS_RNG
+            state = self._rng.bit_generator.state
+            if state["bit_generator"] != "PCG64":
+                raise ValueError(f"Cannot pack a {state['bit_generator']} RNG")
+            rng_state = (state["state"]["state"].to_bytes(16, "little"), state["state"]["inc"].to_bytes(16, "little"),
+                         state["has_uint32"], state["uinteger"])
+        if len(self.players) != c.NUM_PLAYERS:
+            raise ValueError("Only states of a started game can be packed")
+        if len(self.action_queue) > 4 or len(self.rotting_queue) > 2 or len(self.rotting_protected_types) > 4:
+            raise ValueError("Queue too long to pack")
+        
+        values = [flags, sum(1 << i for i, available in enumerate(self.roles_available) if available),
+                  self.seed or 0, *rng_state,
+                  *self.supply_goods, self.supply_colonists, self.supply_vp, self.supply_quarries,
+                  *(self.market_plantations + [-1] * (3 - len(self.market_plantations))),
+                  *self.roles_doubloons, *self.trading_house]
+        for ship in self.ships:
+            values += [ship['good'], ship['count'], ship['capacity']]
+        values += [self.governor_idx, self.current_player_idx, self.colonist_ship]
+        values += [self.building_supply[b_id] for b_id in range(c.NUM_BUILDINGS)]
+        values += [self.phase, self.round, self.roles_taken_count, self.current_role, self.captain_consecutive_passes,
+                   len(self.action_queue), *(self.action_queue + [0] * (4 - len(self.action_queue))),
+                   len(self.rotting_queue), *(self.rotting_queue + [0] * (2 - len(self.rotting_queue))),
+                   len(self.rotting_protected_types),
+                   *(self.rotting_protected_types + [0] * (4 - len(self.rotting_protected_types))),
+                   self.rotting_step,
+                   len(self.plantation_deck), len(self.discarded_plantations),
+                   _pack_nibbles(self.plantation_deck + self.discarded_plantations, 17),
+                   _pack_nibbles(self.deck_counts + self.discard_counts, 6)]
+        for p in self.players:
+            values += [p.doubloons, p.vp_chips, *p.goods,
+                       bytes([(slot['tile'] + 1) | (slot['workers'] << 3) for slot in p.island]),
+                       bytes([(slot['building'] + 1) | (slot['workers'] << 5) for slot in p.city]),
+                       p.san_juan_workers, *p.last_produced_goods, p.wharf_used]
+        return _PACKED_STATE.pack(*values)
+
+    @classmethod
+    def from_bytes(cls, data):
+        gs = cls.__new__(cls)
+        gs._unpack(data)
+        return gs
+
+    def _unpack(self, data):
+        v = _PACKED_STATE.unpack(data)
+        flags, roles_bits, seed = v[0:3]
+        self.seed = seed if flags & _PACKED_HAS_SEED else None
+        self._rng = None
+        self._packed_rng = v[3:7] if flags & _PACKED_HAS_RNG else None
+        self.game_end_triggered = bool(flags & _PACKED_END_TRIGGERED)
+        self.current_role_privilege = bool(flags & _PACKED_PRIVILEGE)
+        self.hacienda_used = bool(flags & _PACKED_HACIENDA_USED)
+        self.roles_available = [bool(roles_bits >> i & 1) for i in range(c.NUM_ROLES)]
+        
+        self.supply_goods = list(v[7:12])
+        self.supply_colonists, self.supply_vp, self.supply_quarries = v[12:15]
+        self.market_plantations = [tile for tile in v[15:18] if tile != -1]
+        self.roles_doubloons = list(v[18:25])
+        self.trading_house = list(v[25:29])
+        self.ships = [{'good': v[29], 'count': v[30], 'capacity': v[31]},
+                      {'good': v[32], 'count': v[33], 'capacity': v[34]}]
+        self.ship_targets = ship_targets(self.ships)
+        self.governor_idx, self.current_player_idx, self.colonist_ship = v[35:38]
+        i = 38 + c.NUM_BUILDINGS
+        self.building_supply = dict(enumerate(v[38:i]))
+        self.phase, self.round, self.roles_taken_count, self.current_role, self.captain_consecutive_passes = v[i:i + 5]
+        self.action_queue = list(v[i + 6:i + 6 + v[i + 5]])
+        self.rotting_queue = list(v[i + 11:i + 11 + v[i + 10]])
+        self.rotting_protected_types = list(v[i + 14:i + 14 + v[i + 13]])
+        self.rotting_step = v[i + 18]
+        n_deck, n_discard, tiles, counts = v[i + 19:i + 23]
+        tiles = _unpack_nibbles(tiles, n_deck + n_discard)
+        self.plantation_deck = tiles[:n_deck]
+        self.discarded_plantations = tiles[n_deck:]
+        counts = _unpack_nibbles(counts, 2 * c.NUM_PLANTATION_TYPES)
+        self.deck_counts = counts[:c.NUM_PLANTATION_TYPES]
+        self.discard_counts = counts[c.NUM_PLANTATION_TYPES:]
+        
+        i += 23
+        self.players = []
+        for _ in range(c.NUM_PLAYERS):
+            p = PlayerState.__new__(PlayerState)
+            p.doubloons, p.vp_chips = v[i:i + 2]
+            p.goods = list(v[i + 2:i + 7])
+            p.island = [{'tile': (byte & 0x7) - 1, 'workers': byte >> 3} for byte in v[i + 7]]
+            p.city = [{'building': (byte & 0x1F) - 1, 'workers': byte >> 5} for byte in v[i + 8]]
+            p.san_juan_workers = v[i + 9]
+            p.last_produced_goods = list(v[i + 10:i + 15])
+            p.wharf_used = bool(v[i + 15])
+            self.players.append(p)
+            i += 16
+
+    def __getstate__(self):
+        # Pickling (process pools, replay checkpoints, deepcopy) uses the packed layout
+        return self.to_bytes()
+
+    def __setstate__(self, data):
+        self._unpack(data)
 
 
 class PlayerState:
@@ -78,9 +271,58 @@ class PlayerState:
 class PuertoRicoEnv2P(gym.Env):
     metadata = {'render_modes': ['human']}
 
-    def __init__(self):
+    def __init__(self, obs_dtype=np.int32, obs_mode="raw", auto_advance=False, mayor_mode="slot",
+                 validation="fast", validation_interval=100, deck_mode="list", info_action_mask=False):
         super().__init__()
         
+        # Also return the action mask of the returned state as info["action_mask"] from
+        # reset()/step(), so vector envs deliver it with the step results (puerto_rico_vector)
+        self.info_action_mask = info_action_mask
+        
+        # Plantation deck model:
+        # "list"   - shuffled list of tiles (drawn from the end, Hacienda from the front)
+        # "counts" - remaining tiles per type, each draw sampled lazily from the game RNG.
+        #            Same draw distribution, compact state, and no hidden order to
+        #            determinize for search.
+        if deck_mode not in ("list", "counts"):
+            raise ValueError(f"Unknown deck_mode '{deck_mode}'")
+        self.deck_mode = deck_mode
+        
+        # Action validation policy:
+        # "fast"    - no check (trusted masked policies, training)
+        # "strict"  - raise ValueError on every illegal action (tests, fuzzing)
+        # "sampled" - check every `validation_interval`-th step
+        if validation not in ("fast", "strict", "sampled"):
+            raise ValueError(f"Unknown validation '{validation}'")
+        if validation_interval < 1:
+            raise ValueError("validation_interval must be >= 1")
+        self.validation = validation
+        self.validation_interval = validation_interval
+        self._step_count = 0
+        
+        # Mayor interface: "slot" (one colonist per step, ACTION_MAYOR_PLACE_*) or
+        # "allocation" (whole allocation in one step, ACTION_MAYOR_ALLOCATION_START + k)
+        if mayor_mode not in ("slot", "allocation"):
+            raise ValueError(f"Unknown mayor_mode '{mayor_mode}'")
+        self.mayor_mode = mayor_mode
+        
+        # Auto-advance: resolve states with a single legal action inside step()/reset(),
+        # so the policy only sees real decisions. Counts are reported in `info`.
+        self.auto_advance = auto_advance
+        
+        # Observation dtype: np.int32 (default) or a compact np.int16 / np.int8.
+        # Every field lies in [OBS_LOW, OBS_HIGH], so any dtype covering that
+        # range is lossless. Compact dtypes shrink VecEnv/replay/dataset buffers.
+        info = np.iinfo(obs_dtype)
+        if info.min > c.OBS_LOW or info.max < c.OBS_HIGH:
+            raise ValueError(f"obs_dtype {np.dtype(obs_dtype).name} cannot hold observation range [{c.OBS_LOW}, {c.OBS_HIGH}]")
+        self.obs_dtype = np.dtype(obs_dtype)
+        
+        # Observation mode: "raw" (integer IDs) or "encoded" (raw + one-hot planes)
+        if obs_mode not in ("raw", "encoded"):
+            raise ValueError(f"Unknown obs_mode '{obs_mode}'")
+        self.obs_mode = obs_mode
+        
         # Define Observation Space
         # Global State Vector:
         # 0: Colonist Supply
@@ -111,97 +353,110 @@ class PuertoRicoEnv2P(gym.Env):
         # Market (3 face up plantations)
         # 3 Ints
         
-        self.observation_space = spaces.Dict({
-            "global": spaces.Box(low=-1, high=100, shape=(self.global_space_dim,), dtype=np.int32),
-            "players": spaces.Box(low=-1, high=100, shape=(c.NUM_PLAYERS, self.player_space_dim), dtype=np.int32),
-            "market_plantations": spaces.Box(low=0, high=c.NUM_PLANTATION_TYPES, shape=(3,), dtype=np.int32)
-        })
+        obs_spaces = {
+            "global": spaces.Box(low=c.OBS_LOW, high=c.OBS_HIGH, shape=(self.global_space_dim,), dtype=self.obs_dtype),
+            "players": spaces.Box(low=c.OBS_LOW, high=c.OBS_HIGH, shape=(c.NUM_PLAYERS, self.player_space_dim), dtype=self.obs_dtype),
+            "market_plantations": spaces.Box(low=c.OBS_LOW, high=c.NUM_PLANTATION_TYPES, shape=(3,), dtype=self.obs_dtype)
+        }
+        if self.obs_mode == "encoded":
+            # One-hot planes for tiles, buildings, ship goods, trading house and market
+            obs_spaces.update(encoded_observation_spaces(self.obs_dtype))
+        self.observation_space = spaces.Dict(obs_spaces)
         
         self.game_state = None
-        self.action_space = spaces.Discrete(c.NUM_ACTIONS)
+        
+        # Optional statistics hooks (puerto_rico_stats.GameStatsAggregator)
+        self.stats = None
+        
+        # GameState objects reused by expand() for the per-action copies
+        self._expand_pool = []
+        
+        if self.mayor_mode == "allocation":
+            self.action_space = spaces.Discrete(c.NUM_ACTIONS + c.MAX_MAYOR_ALLOCATIONS)
+        else:
+            self.action_space = spaces.Discrete(c.NUM_ACTIONS)
 
     def get_action_mask(self):
-        mask = np.zeros(c.NUM_ACTIONS, dtype=np.int8)
+        mask = np.zeros(self.action_space.n, dtype=np.int8)
+        legal = self.legal_actions()
+        if legal:
+            mask[list(legal)] = 1
+        return mask
+
+    def action_masks(self):
+        """MaskablePPO hook (also reached through VecEnv.env_method("action_masks"))."""
+        return self.get_action_mask()
+
+    def legal_actions(self):
+        """
+        Legal actions of the current player as a sorted tuple of action IDs.
+        Generated directly by the phase logic, so the cost scales with the number
+        of legal moves; get_action_mask() is built from it.
+        """
         gs = self.game_state
         if gs is None:
-            return mask
+            return ()
             
         # If queue is active, current player is determined by queue
         current_p_idx = gs.current_player_idx
         current_p = gs.players[current_p_idx]
+        legal = []
         
         if gs.phase == c.PHASE_ROLE_SELECTION:
-            # Mask available roles
+            # Available roles
             for r_id in range(c.NUM_ROLES):
                 if gs.roles_available[r_id]:
-                    mask[c.ACTION_CHOOSE_ROLE_SETTLER + r_id] = 1
+                    legal.append(c.ACTION_CHOOSE_ROLE_SETTLER + r_id)
         
         elif gs.phase == c.PHASE_SETTLER:
-            # Hacienda Check
-            has_hacienda = False
-            for slot in current_p.city:
-                if slot['building'] == c.BUILDING_HACIENDA and slot['workers'] > 0:
-                    has_hacienda = True
-                    break
-            
-            # If has Hacienda and NOT used yet, allow USE
-            if has_hacienda and not gs.hacienda_used:
-                mask[c.ACTION_USE_HACIENDA] = 1
-            
             # Market plantations (Indexes 0, 1, 2)
             for i in range(len(gs.market_plantations)):
-                mask[c.ACTION_SETTLER_TAKE_PLANTATION_0 + i] = 1
+                legal.append(c.ACTION_SETTLER_TAKE_PLANTATION_0 + i)
             
-            # Construction Hut Check
+            has_hacienda = False
             has_hut = False
             for slot in current_p.city:
-                if slot['building'] == c.BUILDING_CONSTRUCTION_HUT and slot['workers'] > 0:
-                    has_hut = True
-                    break
-
+                if slot['workers'] > 0:
+                    if slot['building'] == c.BUILDING_HACIENDA:
+                        has_hacienda = True
+                    elif slot['building'] == c.BUILDING_CONSTRUCTION_HUT:
+                        has_hut = True
+            
             # Quarry: Only if privilege is active OR Construction Hut
             if (gs.current_role_privilege or has_hut) and gs.supply_quarries > 0:
-                mask[c.ACTION_SETTLER_TAKE_QUARRY] = 1
+                legal.append(c.ACTION_SETTLER_TAKE_QUARRY)
+            
+            # If has Hacienda and NOT used yet, allow USE
+            if has_hacienda and not gs.hacienda_used:
+                legal.append(c.ACTION_USE_HACIENDA)
+            
+            legal.append(c.ACTION_PASS)
             
-            mask[c.ACTION_PASS] = 1
+        elif gs.phase == c.PHASE_MAYOR and self.mayor_mode == "allocation":
+            # One action per canonical allocation (always at least one)
+            n_allocations = len(self._mayor_allocations(current_p))
+            legal.extend(range(c.ACTION_MAYOR_ALLOCATION_START, c.ACTION_MAYOR_ALLOCATION_START + n_allocations))
                 
-        # Custom Logic for Mayor Placement Masking
         elif gs.phase == c.PHASE_MAYOR:
-            can_place = False
-            # If current player has stored colonists in San Juan, they can place them
+            # If current player has stored colonists in San Juan, they must place them
             if current_p.san_juan_workers > 0:
-                # 1. Place on Island
+                # 1. Place on Island: slot has tile and is empty
                 for i, slot in enumerate(current_p.island):
-                    # Valid if slot has tile and is empty
                     if slot['tile'] != -1 and slot['workers'] == 0:
-                        mask[c.ACTION_MAYOR_PLACE_PLANTATION_0 + i] = 1
-                        can_place = True
+                        legal.append(c.ACTION_MAYOR_PLACE_PLANTATION_0 + i)
                         
-                # 2. Place on City
+                # 2. Place on City: building has free capacity
                 for i, slot in enumerate(current_p.city):
-                    if slot['building'] != -1:
-                        b_id = slot['building']
-                        capacity = c.BUILDING_INFO[b_id][2]
-                        if slot['workers'] < capacity:
-                             mask[c.ACTION_MAYOR_PLACE_BUILDING_0 + i] = 1
-                             can_place = True
+                    if slot['building'] != -1 and slot['workers'] < c.BUILDING_INFO[slot['building']][2]:
+                        legal.append(c.ACTION_MAYOR_PLACE_BUILDING_0 + i)
                              
-            # 3. Pass Logic
-            if not can_place:
-                mask[c.ACTION_PASS] = 1
-            else:
-                 mask[c.ACTION_PASS] = 0
+            # 3. Pass only when nothing can be placed
+            if not legal:
+                legal.append(c.ACTION_PASS)
 
         elif gs.phase == c.PHASE_TRADER:
-            # Check Trading House Full?
-            house_full = True
-            for i in range(4):
-                if gs.trading_house[i] == -1:
-                    house_full = False
-                    break
-            
-            can_sell = False
-            if not house_full:
+            # Trading House full -> nothing can be sold
+            if -1 in gs.trading_house:
                  # Check active Office
                  has_office = False
                  for slot in current_p.city:
@@ -209,29 +464,16 @@ class PuertoRicoEnv2P(gym.Env):
                          has_office = True
                          break
                          
-                 # Check each good held
-                 for g_id in range(c.NUM_GOODS): # 0 to 4
-                     if current_p.goods[g_id] > 0:
-                         # Valid if not already in house (unless Office - hook later)
-                         in_house = False
-                         for h_g in gs.trading_house:
-                             if h_g == g_id:
-                                 in_house = True
-                                 break
-                         
-                         if not in_house or has_office:
-                             mask[c.ACTION_SELL_CORN + g_id] = 1
-                             can_sell = True
+                 # Each good held, valid if not already in house (unless Office)
+                 for g_id in range(c.NUM_GOODS):
+                     if current_p.goods[g_id] > 0 and (has_office or g_id not in gs.trading_house):
+                         legal.append(c.ACTION_SELL_CORN + g_id)
             
-            if not can_sell:
-                mask[c.ACTION_PASS] = 1
-            else:
-                mask[c.ACTION_PASS] = 0 # Must sell
+            if not legal:
+                legal.append(c.ACTION_PASS) # Otherwise must sell
         
         elif gs.phase == c.PHASE_CAPTAIN:
             # Mandatory Shipping
-            can_ship = False
-            
             # Check Wharf
             has_wharf = False
             if not current_p.wharf_used:
@@ -240,102 +482,73 @@ class PuertoRicoEnv2P(gym.Env):
                         has_wharf = True
                         break
 
+            wharf_actions = []
             for g_id in range(c.NUM_GOODS):
                 if current_p.goods[g_id] > 0:
-                    valid_ship = False
-                    # Check Normal Ships
-                    for s_idx, ship in enumerate(gs.ships):
-                        if ship['count'] == 0:
-                             # Check if other ships have this good
-                             other_has = False
-                             for other_s in gs.ships:
-                                 if other_s['good'] == g_id and other_s['count'] > 0:
-                                     other_has = True
-                                     break
-                             if not other_has:
-                                 valid_ship = True
-                        elif ship['good'] == g_id and ship['count'] < ship['capacity']:
-                            valid_ship = True
-                    
-                    if valid_ship:
-                             mask[c.ACTION_SHIP_CORN + g_id] = 1
-                             can_ship = True
-                    
+                    # Ship compatibility from the shipping table
+                    if gs.ship_targets[g_id][0] != -1:
+                        legal.append(c.ACTION_SHIP_CORN + g_id)
                     if has_wharf:
-                        mask[c.ACTION_SHIP_TO_WHARF_CORN + g_id] = 1
-                        can_ship = True
+                        wharf_actions.append(c.ACTION_SHIP_TO_WHARF_CORN + g_id)
+            legal.extend(wharf_actions)
             
-            if not can_ship:
-                mask[c.ACTION_PASS] = 1
-            else:
-                mask[c.ACTION_PASS] = 0 # Must ship
+            if not legal:
+                legal.append(c.ACTION_PASS) # Otherwise must ship
 
         elif gs.phase == c.PHASE_BUILDER:
-            # Check money vs building costs
-            # Check slots availability (12 slots)
-            
-            # Can Pass? Yes.
-            mask[c.ACTION_PASS] = 1
-            
             # Check if city full
-            slots_filled = sum(1 for s in current_p.city if s['building'] != -1)
+            slots_filled = 0
+            built = set()
+            for slot in current_p.city:
+                if slot['building'] != -1:
+                    slots_filled += 1
+                    built.add(slot['building'])
+            
             if slots_filled < 12:
-                # Iterate all buildings
+                quarries = 0
+                for slot in current_p.island:
+                    if slot['tile'] == c.PLANTATION_QUARRY and slot['workers'] > 0:
+                        quarries += 1
+                
                 for b_id in range(c.NUM_BUILDINGS):
-                    # Check 1: Already built?
-                    already_built = False
-                    for slot in current_p.city:
-                        if slot['building'] == b_id:
-                            already_built = True
-                            break
-                    if already_built:
-                        continue
-                        
-                    # Check 2: Supply Available?
-                    if gs.building_supply[b_id] <= 0:
+                    # Not already built and supply available
+                    if b_id in built or gs.building_supply[b_id] <= 0:
                         continue
                         
-                    # Check 3: Affordability
+                    # Affordability: Builder privilege and Quarry discount (limited per building)
                     cost = c.BUILDING_INFO[b_id][0]
-                    # Calc Discount
                     if gs.current_role_privilege:
                          cost -= 1
-                         
-                    quarries = 0
-                    for slot in current_p.island:
-                        if slot['tile'] == c.PLANTATION_QUARRY and slot['workers'] > 0:
-                            quarries += 1
-                    
-                    limit = c.BUILDING_INFO[b_id][3]
-                    actual_discount = min(quarries, limit)
-                    cost -= actual_discount
+                    cost -= min(quarries, c.BUILDING_INFO[b_id][3])
                     cost = max(0, cost)
                     
                     if current_p.doubloons >= cost:
-                        mask[c.ACTION_BUILD_START + b_id] = 1
+                        legal.append(c.ACTION_BUILD_START + b_id)
+            
+            # Can Pass? Yes.
+            legal.append(c.ACTION_PASS)
 
         elif gs.phase == c.PHASE_CRAFTSMAN:
-             # Only Selector gets action (Bonus)
-             # Mask based on produced good types
+             # Only Selector gets action (Bonus) based on produced good types
              for g_id in range(c.NUM_GOODS):
                  if current_p.last_produced_goods[g_id] > 0 and gs.supply_goods[g_id] > 0:
-                     if g_id == c.CORN: mask[c.ACTION_CRAFTSMAN_BONUS_CORN] = 1
-                     elif g_id == c.FRUIT: mask[c.ACTION_CRAFTSMAN_BONUS_FRUIT] = 1
-                     elif g_id == c.SUGAR: mask[c.ACTION_CRAFTSMAN_BONUS_SUGAR] = 1
-                     elif g_id == c.TOBACCO: mask[c.ACTION_CRAFTSMAN_BONUS_TOBACCO] = 1
-                     elif g_id == c.COFFEE: mask[c.ACTION_CRAFTSMAN_BONUS_COFFEE] = 1
+                     legal.append(c.ACTION_CRAFTSMAN_BONUS_CORN + g_id)
+             
+             # Every produced good may already be exhausted from supply
+             if not legal:
+                 legal.append(c.ACTION_PASS)
         
         elif gs.phase == c.PHASE_ROTTING:
             # Allow keeping goods
             for g_id in range(c.NUM_GOODS):
                 if current_p.goods[g_id] > 0:
-                    mask[c.ACTION_KEEP_CORN + g_id] = 1
+                    legal.append(c.ACTION_KEEP_CORN + g_id)
                      
         # Placeholder for other phases
-        elif gs.phase in [c.PHASE_TRADER, c.PHASE_CAPTAIN, c.PHASE_PROSPECTOR]:
-             mask[c.ACTION_PASS] = 1
+        elif gs.phase == c.PHASE_PROSPECTOR:
+             legal.append(c.ACTION_PASS)
              
-        return mask
+        return tuple(legal)
 
     def step(self, action):
         gs = self.game_state
@@ -345,17 +558,42 @@ class PuertoRicoEnv2P(gym.Env):
         info = {}
         
         # 1. Validate Action
-        mask = self.get_action_mask()
-        if mask[action] == 0:
-             # Invalid action: return simple penalty or error? 
-             # For Gym, usually undefined behavior or no-op. I'll return penalty and no state change?
-             # Or just raise error for debug.
-             # Let's invalid action -> large negative reward and terminate? Or just ignore.
-             # I will raise Error for now to catch logic bugs in test.
-             pass
-             # raise ValueError(f"Invalid action {action} for phase {gs.phase} and player {gs.current_player_idx}")
+        if self.validation == "strict" or (
+                self.validation == "sampled" and self._step_count % self.validation_interval == 0):
+            self._validate_action(action)
+        self._step_count += 1
 
         # 2. Logic Dispatch
+        self._apply_action(action)
+        
+        # 3. Resolve forced moves (single legal action) without returning to the policy
+        if self.auto_advance:
+            skipped = self._auto_advance()
+            info["auto_advanced"] = sum(skipped)
+            info["auto_advanced_by_player"] = skipped
+            
+        if gs.phase == c.PHASE_GAME_END:
+            terminated = True
+        if self.info_action_mask:
+            info["action_mask"] = self.get_action_mask()
+            
+        # 4. Update Observation
+        obs = self._get_obs()
+        pass 
+        # obs["action_mask"] = self.get_action_mask() # Removed. Handled by ActionMasker.
+        
+        return obs, reward, terminated, truncated, info
+
+    def _validate_action(self, action):
+        gs = self.game_state
+        legal = self.legal_actions()
+        if action not in legal:
+            raise ValueError(
+                f"Invalid action {action} for phase {gs.phase} (role {gs.current_role}) "
+                f"and player {gs.current_player_idx}; legal actions: {legal}")
+
+    def _apply_action(self, action):
+        gs = self.game_state
         if gs.phase == c.PHASE_ROLE_SELECTION:
             self._step_role_selection(action)
         elif gs.phase == c.PHASE_SETTLER:
@@ -370,21 +608,84 @@ class PuertoRicoEnv2P(gym.Env):
             self._step_trader(action)
         elif gs.phase == c.PHASE_CAPTAIN:
             self._step_captain(action)
-            
-        # Default placeholder logic
         elif gs.phase == c.PHASE_GAME_END:
-            terminated = True
+            pass # Terminal, nothing to apply
         elif gs.phase == c.PHASE_ROTTING:
             self._step_rotting(action)
         else:
             self._advance_queue()
-            
-        # 3. Update Observation
-        obs = self._get_obs()
-        pass 
-        # obs["action_mask"] = self.get_action_mask() # Removed. Handled by ActionMasker.
-        
-        return obs, reward, terminated, truncated, info
+
+    def expand(self, actions=None, with_obs=True):
+        """
+        One-ply what-if: apply each legal action (or each of `actions`) to a
+        copy of the current state, which is left untouched. Copies are
+        restored from one packed snapshot into pooled GameState objects.
+        They carry the RNG position, so draws match what the game would draw.
+        Forced moves are resolved as in step() when auto_advance is on.
+        
+        Returns a dict of arrays stacked over the K actions:
+            actions (K,), obs {key: (K, ...)} (omitted without `with_obs`),
+            masks (K, A) int8, score_delta (K, NUM_PLAYERS) change of
+            _calculate_score, terminated (K,) bool, next_player (K,)
+        """
+        gs = self.game_state
+        if actions is None:
+            actions = self.legal_actions()
+        n = len(actions)
+        data = gs.to_bytes()
+        base, _ = self._calculate_score()
+        while len(self._expand_pool) < n:
+            self._expand_pool.append(GameState.__new__(GameState))
+        
+        result = {
+            "actions": np.asarray(actions, dtype=np.int64),
+            "masks": np.zeros((n, self.action_space.n), dtype=np.int8),
+            "score_delta": np.zeros((n, c.NUM_PLAYERS), dtype=np.int32),
+            "terminated": np.zeros(n, dtype=bool),
+            "next_player": np.zeros(n, dtype=np.int8),
+        }
+        if with_obs:
+            result["obs"] = {key: np.empty((n,) + space.shape, dtype=space.dtype)
+                             for key, space in self.observation_space.spaces.items()}
+        
+        # What-if moves must not reach the statistics hooks
+        stats, self.stats = self.stats, None
+        try:
+            for i, action in enumerate(actions):
+                child = self._expand_pool[i]
+                child._unpack(data)
+                self.game_state = child
+                self._apply_action(action)
+                if self.auto_advance:
+                    self._auto_advance()
+                if with_obs:
+                    for key, value in self._get_obs().items():
+                        result["obs"][key][i] = value
+                result["masks"][i] = self.get_action_mask()
+                scores, _ = self._calculate_score()
+                for p_idx in range(c.NUM_PLAYERS):
+                    result["score_delta"][i, p_idx] = scores[p_idx] - base[p_idx]
+                result["terminated"][i] = child.phase == c.PHASE_GAME_END
+                result["next_player"][i] = child.current_player_idx
+        finally:
+            self.game_state = gs
+            self.stats = stats
+        return result
+
+    def _auto_advance(self):
+        """
+        Apply actions while the current player has exactly one legal action.
+        Returns the number of forced actions applied per player.
+        """
+        gs = self.game_state
+        skipped = [0] * c.NUM_PLAYERS
+        while gs.phase != c.PHASE_GAME_END:
+            legal = self.legal_actions()
+            if len(legal) != 1:
+                break
+            skipped[gs.current_player_idx] += 1
+            self._apply_action(legal[0])
+        return skipped
 
     def _step_role_selection(self, action):
         gs = self.game_state
@@ -399,6 +700,9 @@ class PuertoRicoEnv2P(gym.Env):
         gs.players[gs.current_player_idx].doubloons += doubloons
         gs.roles_doubloons[role_id] = 0
         
+        if self.stats is not None:
+            self.stats.on_role_pick(gs.round, role_id)
+        
         # Setup Phase Actions
         if role_id == c.SETTLER:
             gs.phase = c.PHASE_SETTLER
@@ -494,81 +798,37 @@ class PuertoRicoEnv2P(gym.Env):
 
     def _execute_production(self):
         gs = self.game_state
-        for p_idx, p in enumerate(gs.players):
-             # Calculate Production
-             # 1. Corn: Count Occupied Corn Plantations
-             corn_count = 0
-             for slot in p.island:
-                 if slot['tile'] == c.PLANTATION_CORN and slot['workers'] > 0:
-                     corn_count += 1
-             
-             # 2. Others: Min(Occupied Plantations, Occupied Factory Slots)
-             # Plantations
-             counts = {c.FRUIT: 0, c.SUGAR: 0, c.TOBACCO: 0, c.COFFEE: 0}
-             mappings = {
-                 c.PLANTATION_FRUIT: c.FRUIT,
-                 c.PLANTATION_SUGAR: c.SUGAR, 
-                 c.PLANTATION_TOBACCO: c.TOBACCO, 
-                 c.PLANTATION_COFFEE: c.COFFEE
-             }
+        # Scalar path for one game; puerto_rico_batch.production_batch applies
+        # the same rules to stacked states (parity test in test_batch.py)
+        for p in gs.players:
+             # Occupied plantations (plantation IDs 0-4 are the good they grow)
+             occupied = [0] * c.NUM_GOODS
              for slot in p.island:
-                 if slot['tile'] in mappings and slot['workers'] > 0:
-                     counts[mappings[slot['tile']]] += 1
-             
-             # Factories
-             capacities = {c.FRUIT: 0, c.SUGAR: 0, c.TOBACCO: 0, c.COFFEE: 0}
-             # Buildings that produce
-             # Small/Large Fruit (ID 0, 2) -> Fruit
-             # Small/Large Sugar (ID 1, 3) -> Sugar
-             # Tobacco (ID 4) -> Tobacco
-             # Coffee (ID 5) -> Coffee
-             
-             b_map = {
-                 c.BUILDING_SMALL_FRUIT: c.FRUIT, c.BUILDING_LARGE_FRUIT: c.FRUIT,
-                 c.BUILDING_SMALL_SUGAR: c.SUGAR, c.BUILDING_LARGE_SUGAR: c.SUGAR,
-                 c.BUILDING_TOBACCO: c.TOBACCO,
-                 c.BUILDING_COFFEE: c.COFFEE
-             }
+                 if slot['workers'] > 0 and 0 <= slot['tile'] < c.NUM_GOODS:
+                     occupied[slot['tile']] += 1
              
+             # Production building workers per good, and occupied Factory (Line 261)
+             capacity = [0] * c.NUM_GOODS
+             has_factory = False
              for slot in p.city:
-                 if slot['building'] in b_map:
-                     good_type = b_map[slot['building']]
-                     capacities[good_type] += slot['workers']
-                     
-             # Final Production (limited by Supply)
-             produced = [0] * c.NUM_GOODS
-             
-             # Corn (No factory needed)
-             actual_corn = min(corn_count, gs.supply_goods[c.CORN])
-             produced[c.CORN] = actual_corn
-             gs.supply_goods[c.CORN] -= actual_corn
-             p.goods[c.CORN] += actual_corn
+                 good_id = c.PRODUCTION_BUILDINGS.get(slot['building'])
+                 if good_id is not None:
+                     capacity[good_id] += slot['workers']
+                 elif slot['building'] == c.BUILDING_FACTORY and slot['workers'] > 0:
+                     has_factory = True
              
-             for g_id in [c.FRUIT, c.SUGAR, c.TOBACCO, c.COFFEE]:
-                 potential = min(counts[g_id], capacities[g_id])
+             # Corn needs no building; players take from the supply in index order
+             produced = [0] * c.NUM_GOODS
+             for g_id in range(c.NUM_GOODS):
+                 potential = occupied[g_id] if g_id == c.CORN else min(occupied[g_id], capacity[g_id])
                  actual = min(potential, gs.supply_goods[g_id])
                  produced[g_id] = actual
                  gs.supply_goods[g_id] -= actual
                  p.goods[g_id] += actual
-                 
-             p.last_produced_goods = produced 
+             p.last_produced_goods = produced
              
-             # Factory Bonus (Line 261: Factory Building)
-             kinds_produced = sum(1 for x in produced if x > 0)
-             if kinds_produced >= 2:
-                 # Check if player has Occupied Factory
-                 has_factory = False
-                 for slot in p.city:
-                     if slot['building'] == c.BUILDING_FACTORY and slot['workers'] > 0:
-                         has_factory = True
-                         break
-                 if has_factory:
-                     bonus = 0
-                     if kinds_produced == 2: bonus = 1
-                     elif kinds_produced == 3: bonus = 2
-                     elif kinds_produced == 4: bonus = 3
-                     elif kinds_produced == 5: bonus = 5
-                     p.doubloons += bonus
+             if has_factory:
+                 p.doubloons += c.FACTORY_BONUS[c.NUM_GOODS - produced.count(0)]
 
     def _prepare_mayor_placement(self, p_idx):
         # Move all colonists from Board to San Juan (Pool)
@@ -590,15 +850,7 @@ class PuertoRicoEnv2P(gym.Env):
         # 1. Handle Hacienda Action
         if action == c.ACTION_USE_HACIENDA:
             # Draw random tile from deck
-            extra_tile = -1
-            if gs.plantation_deck:
-                extra_tile = gs.plantation_deck.pop(0)
-            elif gs.discarded_plantations:
-                 random.shuffle(gs.discarded_plantations)
-                 gs.plantation_deck.extend(gs.discarded_plantations)
-                 gs.discarded_plantations = []
-                 if gs.plantation_deck:
-                     extra_tile = gs.plantation_deck.pop(0)
+            extra_tile = self._draw_plantation(from_front=True)
             
             if extra_tile != -1:
                 # Place on island
@@ -625,7 +877,7 @@ class PuertoRicoEnv2P(gym.Env):
                         break
                 
                 if not placed:
-                    gs.discarded_plantations.append(extra_tile)
+                    self._discard_plantations([extra_tile])
             
             gs.hacienda_used = True
             # Do NOT advance queue. Player must still take market action.
@@ -702,10 +954,22 @@ class PuertoRicoEnv2P(gym.Env):
                         gs.colonist_ship -= 1
              else:
                  # Discard if no space
-                 gs.discarded_plantations.append(tile_to_take)
+                 self._discard_plantations([tile_to_take])
+
+        self._advance_queue()
+
+    def _step_mayor(self, action):
         gs = self.game_state
         current_p = gs.players[gs.current_player_idx]
         
+        if action >= c.ACTION_MAYOR_ALLOCATION_START:
+            # Whole allocation at once, then finish like a Pass
+            allocations = self._mayor_allocations(current_p)
+            k = action - c.ACTION_MAYOR_ALLOCATION_START
+            if k < len(allocations):
+                self._apply_mayor_allocation(current_p, allocations[k])
+            action = c.ACTION_PASS
+        
         if action == c.ACTION_PASS:
             # Done placing
             self._advance_queue()
@@ -751,6 +1015,52 @@ class PuertoRicoEnv2P(gym.Env):
         # Player must continue until they decide to Pass.
         pass
 
+    def _mayor_allocations(self, p):
+        # Tableau signature -> cached canonical allocations
+        island_counts = [0] * c.NUM_PLANTATION_TYPES
+        for slot in p.island:
+            if slot['tile'] != -1:
+                island_counts[slot['tile']] += 1
+        
+        production_capacity = [0] * c.NUM_GOODS
+        violet = []
+        for slot in p.city:
+            b_id = slot['building']
+            if b_id == -1:
+                continue
+            if b_id in c.PRODUCTION_BUILDINGS:
+                production_capacity[c.PRODUCTION_BUILDINGS[b_id]] += c.BUILDING_INFO[b_id][2]
+            else:
+                violet.append(b_id)
+        
+        # Colonists beyond total capacity stay in San Juan, so they do not change the signature
+        to_place = min(p.san_juan_workers, sum(island_counts) + sum(production_capacity) + len(violet))
+        return _canonical_mayor_allocations(to_place, tuple(island_counts),
+                                            tuple(production_capacity), tuple(sorted(violet)))
+
+    def _apply_mayor_allocation(self, p, allocation):
+        # allocation = (occupied plantations per type, workers per production good, occupied violet buildings)
+        occupied, workers, violet = allocation
+        remaining = list(occupied)
+        for slot in p.island:
+            t = slot['tile']
+            if t != -1 and remaining[t] > 0:
+                slot['workers'] = 1
+                remaining[t] -= 1
+        
+        remaining = list(workers)
+        for slot in p.city:
+            b_id = slot['building']
+            if b_id in c.PRODUCTION_BUILDINGS:
+                g_id = c.PRODUCTION_BUILDINGS[b_id]
+                placed = min(remaining[g_id], c.BUILDING_INFO[b_id][2])
+                slot['workers'] = placed
+                remaining[g_id] -= placed
+            elif b_id in violet:
+                slot['workers'] = 1
+        
+        p.san_juan_workers -= sum(occupied) + sum(workers) + len(violet)
+
     def _advance_queue(self):
         gs = self.game_state
         # Remove current actor
@@ -771,17 +1081,12 @@ class PuertoRicoEnv2P(gym.Env):
         
         if gs.phase == c.PHASE_SETTLER:
             # Refill plantatons
-            gs.discarded_plantations.extend(gs.market_plantations)
+            self._discard_plantations(gs.market_plantations)
             gs.market_plantations = []
             for _ in range(3):
-                if gs.plantation_deck:
-                    gs.market_plantations.append(gs.plantation_deck.pop())
-                elif gs.discarded_plantations:
-                    random.shuffle(gs.discarded_plantations)
-                    gs.plantation_deck.extend(gs.discarded_plantations)
-                    gs.discarded_plantations = []
-                    if gs.plantation_deck:
-                        gs.market_plantations.append(gs.plantation_deck.pop())
+                tile = self._draw_plantation()
+                if tile != -1:
+                    gs.market_plantations.append(tile)
 
         elif gs.phase == c.PHASE_MAYOR:
             # Refill Colonist Ship
@@ -803,6 +1108,8 @@ class PuertoRicoEnv2P(gym.Env):
                 # "When... cannot be refilled entirely... game ends at END OF ROUND"
                 # Need to mark game end flag
                 gs.game_end_triggered = True
+                if self.stats is not None:
+                    self.stats.on_end_trigger(c.END_TRIGGER_COLONISTS)
             else:
                 gs.colonist_ship = fill_amount
                 gs.supply_colonists -= fill_amount
@@ -821,6 +1128,9 @@ class PuertoRicoEnv2P(gym.Env):
         # Check Game End
         if getattr(gs, 'game_end_triggered', False):
             gs.phase = c.PHASE_GAME_END
+            if self.stats is not None:
+                scores, _ = self._calculate_score()
+                self.stats.on_game_end(gs.round + 1, scores, [p.vp_chips for p in gs.players])
             return
             
         # 1. 1 Doubloon on unchosen roles
@@ -835,6 +1145,7 @@ class PuertoRicoEnv2P(gym.Env):
         gs.governor_idx = (gs.governor_idx + 1) % c.NUM_PLAYERS
         
         # 4. Reset counters
+        gs.round += 1
         gs.roles_taken_count = 0
         gs.phase = c.PHASE_ROLE_SELECTION
         gs.current_player_idx = gs.governor_idx
@@ -843,9 +1154,29 @@ class PuertoRicoEnv2P(gym.Env):
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
-        random.seed(seed)
+        self._new_game(seed)
+        
+        info = {}
+        if self.auto_advance:
+            skipped = self._auto_advance()
+            info["auto_advanced"] = sum(skipped)
+            info["auto_advanced_by_player"] = skipped
+        if self.info_action_mask:
+            info["action_mask"] = self.get_action_mask()
+                
+        return self._get_obs(), info
+
+    def _new_game(self, seed):
+        # Game setup only (no observation); shared by reset() and headless simulation
+        if seed is None:
+            # Unseeded reset: draw the game seed from the env RNG (seeded by an earlier reset)
+            seed = int(self.np_random.integers(2**63))
         
         self.game_state = GameState()
+        self.game_state.seed = seed
+        self.game_state.rng = np.random.default_rng(seed)
+        if self.stats is not None:
+            self.stats.on_game_start()
         
         # Setup Plantation Deck
         # Rulebook: 
@@ -857,7 +1188,7 @@ class PuertoRicoEnv2P(gym.Env):
         for p_id, count in counts.items():
             deck.extend([p_id] * count)
         
-        random.shuffle(deck)
+        self.game_state.rng.shuffle(deck)
         
         # Players setup
         p1 = PlayerState()
@@ -894,11 +1225,15 @@ class PuertoRicoEnv2P(gym.Env):
         deck_counts[start_p2_tile] -= 1
         
         # Re-build deck
-        self.game_state.plantation_deck = []
-        for p_id, count in deck_counts.items():
-            self.game_state.plantation_deck.extend([p_id] * count)
-        
-        random.shuffle(self.game_state.plantation_deck)
+        if self.deck_mode == "counts":
+            for p_id, count in deck_counts.items():
+                self.game_state.deck_counts[p_id] = count
+        else:
+            self.game_state.plantation_deck = []
+            for p_id, count in deck_counts.items():
+                self.game_state.plantation_deck.extend([p_id] * count)
+            
+            self.game_state.rng.shuffle(self.game_state.plantation_deck)
         
         # Give to players
         p1.island[0] = {'tile': start_p1_tile, 'workers': 0}
@@ -906,10 +1241,47 @@ class PuertoRicoEnv2P(gym.Env):
         
         # Reveal 3 market plantations (Rulebook Line 20: "타일 3개를 공개함")
         for _ in range(3):
-            if self.game_state.plantation_deck:
-                self.game_state.market_plantations.append(self.game_state.plantation_deck.pop())
-                
-        return self._get_obs(), {}
+            tile = self._draw_plantation()
+            if tile != -1:
+                self.game_state.market_plantations.append(tile)
+
+    def _draw_plantation(self, from_front=False):
+        """
+        Draw one plantation tile (-1 if none left anywhere). An empty deck is
+        refilled by shuffling the discards back in.
+        """
+        gs = self.game_state
+        if self.deck_mode == "counts":
+            total = sum(gs.deck_counts)
+            if total == 0:
+                gs.deck_counts = [d + x for d, x in zip(gs.deck_counts, gs.discard_counts)]
+                gs.discard_counts = [0] * c.NUM_PLANTATION_TYPES
+                total = sum(gs.deck_counts)
+                if total == 0:
+                    return -1
+            # Uniform over the remaining tiles, like the top of a shuffled deck
+            r = int(gs.rng.integers(total))
+            for p_id, count in enumerate(gs.deck_counts):
+                if r < count:
+                    gs.deck_counts[p_id] -= 1
+                    return p_id
+                r -= count
+        
+        if not gs.plantation_deck and gs.discarded_plantations:
+            gs.rng.shuffle(gs.discarded_plantations)
+            gs.plantation_deck.extend(gs.discarded_plantations)
+            gs.discarded_plantations = []
+        if not gs.plantation_deck:
+            return -1
+        return gs.plantation_deck.pop(0) if from_front else gs.plantation_deck.pop()
+
+    def _discard_plantations(self, tiles):
+        gs = self.game_state
+        if self.deck_mode == "counts":
+            for tile in tiles:
+                gs.discard_counts[tile] += 1
+        else:
+            gs.discarded_plantations.extend(tiles)
 
     def _step_builder(self, action):
         gs = self.game_state
@@ -952,6 +1324,8 @@ class PuertoRicoEnv2P(gym.Env):
                 # Remove from supply
                 if gs.building_supply[b_id] > 0:
                     gs.building_supply[b_id] -= 1
+                if self.stats is not None:
+                    self.stats.on_build(gs.round, b_id)
                 
                 # University Ability: Get 1 colonist
                 if target_slot_idx != -1:
@@ -975,6 +1349,8 @@ class PuertoRicoEnv2P(gym.Env):
                 filled = sum(1 for s in current_p.city if s['building'] != -1)
                 if filled >= 12:
                     gs.game_end_triggered = True
+                    if self.stats is not None:
+                        self.stats.on_end_trigger(c.END_TRIGGER_BUILDINGS)
         
         self._advance_queue()
 
@@ -1077,29 +1453,9 @@ class PuertoRicoEnv2P(gym.Env):
              }
              good_id = good_map[action]
              
-             # Find best ship (or first valid)
-             best_ship_idx = -1
-             
-             for s_idx, ship in enumerate(gs.ships):
-                 if ship['good'] == good_id and ship['count'] < ship['capacity']:
-                     amount = min(current_p.goods[good_id], ship['capacity'] - ship['count'])
-                     if amount > 0:
-                         best_ship_idx = s_idx
-                         ship_amount = amount
-                         break 
-                 elif ship['good'] == -1:
-                     # Check others
-                     other_has = False
-                     for other_s in gs.ships:
-                         if other_s['good'] == good_id:
-                             other_has = True
-                             break
-                     if not other_has:
-                         amount = min(current_p.goods[good_id], ship['capacity'])
-                         if amount > 0:
-                             best_ship_idx = s_idx
-                             ship_amount = amount
-                             break
+             # Target ship and space left from the shipping table
+             best_ship_idx, space = gs.ship_targets[good_id]
+             ship_amount = min(current_p.goods[good_id], space)
              
              if best_ship_idx != -1 and ship_amount > 0:
                  ship = gs.ships[best_ship_idx]
@@ -1108,6 +1464,7 @@ class PuertoRicoEnv2P(gym.Env):
                  if ship['good'] == -1:
                      ship['good'] = good_id
                  ship['count'] += ship_amount
+                 gs.ship_targets = ship_targets(gs.ships)
                  did_ship = True
                  
         elif c.ACTION_SHIP_TO_WHARF_CORN <= action <= c.ACTION_SHIP_TO_WHARF_COFFEE:
@@ -1154,9 +1511,15 @@ class PuertoRicoEnv2P(gym.Env):
                  gs.supply_vp -= 1
                  if gs.supply_vp <= 0:
                      gs.game_end_triggered = True
+                 points += 1
                  
                  did_ship = True
                  gs.captain_consecutive_passes = 0
+             
+             if self.stats is not None:
+                 self.stats.on_ship(gs.current_player_idx, points)
+                 if gs.supply_vp <= 0:
+                     self.stats.on_end_trigger(c.END_TRIGGER_VP)
         
         if did_ship:
              pass
@@ -1177,6 +1540,7 @@ class PuertoRicoEnv2P(gym.Env):
             if ship['count'] == ship['capacity']:
                 ship['good'] = -1
                 ship['count'] = 0
+        gs.ship_targets = ship_targets(gs.ships)
         
         # Reset Wharf usage for all players
         for p in gs.players:
@@ -1387,7 +1751,7 @@ class PuertoRicoEnv2P(gym.Env):
         gs = self.game_state
         
         # Global Vector
-        global_vec = np.zeros(self.global_space_dim, dtype=np.int32)
+        global_vec = np.zeros(self.global_space_dim, dtype=self.obs_dtype)
         global_vec[0] = gs.supply_colonists
         global_vec[1] = gs.supply_vp
         global_vec[2] = gs.supply_quarries
@@ -1412,7 +1776,7 @@ class PuertoRicoEnv2P(gym.Env):
         global_vec[34] = gs.colonist_ship
         
         # Players Vector
-        players_vec = np.zeros((c.NUM_PLAYERS, self.player_space_dim), dtype=np.int32)
+        players_vec = np.zeros((c.NUM_PLAYERS, self.player_space_dim), dtype=self.obs_dtype)
         
         for p_idx, p in enumerate(gs.players):
             players_vec[p_idx, 0] = p.doubloons
@@ -1434,7 +1798,7 @@ class PuertoRicoEnv2P(gym.Env):
             players_vec[p_idx, 55] = p.san_juan_workers
             
         # Market Vector
-        market_vec = np.zeros(3, dtype=np.int32)
+        market_vec = np.zeros(3, dtype=self.obs_dtype)
         # Pad with -1 if fewer than 3
         for i in range(3):
             if i < len(gs.market_plantations):
@@ -1442,8 +1806,135 @@ class PuertoRicoEnv2P(gym.Env):
             else:
                 market_vec[i] = -1
                 
-        return {
+        obs = {
             "global": global_vec,
             "players": players_vec,
             "market_plantations": market_vec
         }
+        if self.obs_mode == "encoded":
+            obs.update(encode_observation(obs, self.obs_dtype))
+        return obs
+
+
+def ship_targets(ships):
+    """
+    Shipping table for the Captain phase: per good, [ship index, space left],
+    or [-1, 0] if no ship can take it. A good goes to the ship already carrying
+    it if that ship has room; otherwise, if no ship carries it, to the first
+    empty ship.
+    """
+    table = []
+    for g_id in range(c.NUM_GOODS):
+        target = [-1, 0]
+        carried = False
+        for s_idx, ship in enumerate(ships):
+            if ship['good'] == g_id:
+                carried = True
+                if ship['count'] < ship['capacity']:
+                    target = [s_idx, ship['capacity'] - ship['count']]
+                break
+        if not carried:
+            for s_idx, ship in enumerate(ships):
+                if ship['count'] == 0:
+                    target = [s_idx, ship['capacity']]
+                    break
+        table.append(target)
+    return table
+
+
+def determine_winner(scores, tie_breakers):
+    """Winner index from `_calculate_score()` output, or -1 for a true tie."""
+    if scores[0] != scores[1]:
+        return 0 if scores[0] > scores[1] else 1
+    if tie_breakers[0] != tie_breakers[1]:
+        return 0 if tie_breakers[0] > tie_breakers[1] else 1
+    return -1
+
+
+def convert_obs_dtype(obs, dtype):
+    """
+    Losslessly convert an observation dict (single or batched) to `dtype`.
+    Raises ValueError if any value does not fit, so stored data is never truncated.
+    """
+    converted = {}
+    for key, arr in obs.items():
+        arr = np.asarray(arr)
+        new_arr = arr.astype(dtype)
+        if not np.array_equal(new_arr, arr):
+            raise ValueError(f"Observation '{key}' does not fit in {np.dtype(dtype).name}")
+        converted[key] = new_arr
+    return converted
+
+
+@lru_cache(maxsize=4096)
+def _canonical_mayor_allocations(to_place, island_counts, production_capacity, violet):
+    """
+    Enumerate deduplicated colonist allocations for one tableau signature.
+    
+    Slots are grouped (plantations by type, production capacity by good, violet
+    buildings individually), and `to_place` colonists (as many as fit, as in
+    slot mode) are placed. Allocations with the same game effect (production per good,
+    occupied quarries, occupied violet buildings, building workers) are merged,
+    and allocations wasting a colonist while a violet building stays empty are
+    dropped. The result is ordered by production value and truncated to
+    c.MAX_MAYOR_ALLOCATIONS.
+    """
+    # DP over goods, merging partial allocations with the same effect.
+    # Key: (placed, corn, produced per good, building workers, wasted)
+    partial = {(corn, corn, (), 0, False): ((corn,), (0,))
+               for corn in range(min(island_counts[c.CORN], to_place) + 1)}
+    for g_id in range(c.FRUIT, c.NUM_GOODS):
+        # (colonists, plantations, workers, produced, wasted) sorted by colonists used
+        options = sorted((o + w, o, w, min(o, w), o != w)
+                         for o in range(island_counts[g_id] + 1)
+                         for w in range(production_capacity[g_id] + 1))
+        extended = {}
+        for (placed, corn, produced, building_workers, wasted), (occupied, workers) in partial.items():
+            for used, o, w, made, waste in options:
+                if placed + used > to_place:
+                    break
+                key = (placed + used, corn, produced + (made,), building_workers + w, wasted or waste)
+                if key not in extended:
+                    extended[key] = (occupied + (o,), workers + (w,))
+        partial = extended
+    
+    # Each entry expands to one allocation per subset of occupied violet buildings
+    entries = []
+    for (placed, corn, produced, building_workers, wasted), (occupied, workers) in partial.items():
+        for quarries in range(min(island_counts[c.PLANTATION_QUARRY], to_place - placed) + 1):
+            n_violet = to_place - placed - quarries
+            if n_violet > len(violet):
+                continue
+            # Dominated: a colonist is wasted while a violet building stays empty
+            if wasted and n_violet < len(violet):
+                continue
+            priority = (-(corn + sum(produced)), -n_violet, -quarries, building_workers, occupied, workers)
+            entries.append((priority, occupied + (quarries,), workers, n_violet))
+    entries.sort()
+    
+    allocations = []
+    for _, occupied, workers, n_violet in entries:
+        for occupied_violet in itertools.combinations(violet, n_violet):
+            allocations.append((occupied, workers, occupied_violet))
+            if len(allocations) == c.MAX_MAYOR_ALLOCATIONS:
+                return tuple(allocations)
+    return tuple(allocations)
+
+
+def legal_actions_batch(envs):
+    """
+    Legal actions for many envs (e.g. the `envs` of a vector env) in CSR form.
+    Returns (actions, offsets): env i's legal actions are actions[offsets[i]:offsets[i + 1]].
+    """
+    per_env = [env.unwrapped.legal_actions() for env in envs]
+    offsets = np.zeros(len(per_env) + 1, dtype=np.int64)
+    np.cumsum([len(legal) for legal in per_env], out=offsets[1:])
+    actions = np.fromiter((a for legal in per_env for a in legal), dtype=np.int64, count=offsets[-1])
+    return actions, offsets
+
+
+ENV_ID = "PuertoRico2P-v0"
+if ENV_ID not in gym.registry:
+    # gym.make(ENV_ID, **env_kwargs); gym.make_vec(ENV_ID, num_envs) uses puerto_rico_vector
+    gym.register(ENV_ID, entry_point=PuertoRicoEnv2P,
+                 vector_entry_point="puerto_rico_vector:make_vector_env")
@@ -0,0 +1,322 @@
+# puerto_rico_records.py
+"""
+Compact binary game records: seed + action sequence + final result.
+
+The engine is deterministic given the game seed (all draws come from the
+per-game RNG), so a record replays the full game. Layout of one record
+(all integers unsigned LEB128 varints):
+
+    seed, flags, n_actions, <n_actions bytes: one action each>,
+    [checkpoint_every, state_size, <n_actions // checkpoint_every states>,]
+    score[0], score[1], tie_breaker[0], tie_breaker[1], winner + 1
+
+Every applied action is stored, including forced moves, so replay never has
+to recompute legal actions. The optional checkpoints (FLAG_CHECKPOINTS) are
+GameState.to_bytes() at plies checkpoint_every, 2 * checkpoint_every, ...;
+GameReplay seeks from them instead of replaying the game from the seed.
+Files start with MAGIC and hold records back to back.
+"""
+import os
+from collections import namedtuple
+
+import puerto_rico_constants as c
+
+MAGIC = b"PRGR\x01"
+
+# Env flags stored per record
+FLAG_MAYOR_ALLOCATION = 1
+FLAG_DECK_COUNTS = 2
+# Record layout flag, not exposed in GameRecord.flags
+FLAG_CHECKPOINTS = 4
+
+GameRecord = namedtuple("GameRecord", ["seed", "flags", "actions", "scores", "tie_breakers", "winner",
+                                       "checkpoint_every", "checkpoints"], defaults=[0, ()])
+
+
+def env_flags(env):
+    """Record flags for the env options that change the action encoding or the draws."""
+    flags = FLAG_MAYOR_ALLOCATION if env.mayor_mode == "allocation" else 0
+    if env.deck_mode == "counts":
+        flags |= FLAG_DECK_COUNTS
+    return flags
+
+
+def env_kwargs_from_flags(flags):
+    return {"mayor_mode": "allocation" if flags & FLAG_MAYOR_ALLOCATION else "slot",
+            "deck_mode": "counts" if flags & FLAG_DECK_COUNTS else "list"}
+
+
+def _write_varint(buf, value):
+    if value < 0:
+        raise ValueError(f"varint fields must be non-negative, got {value}")
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def encode_record(seed, flags, actions, scores, tie_breakers, winner, checkpoint_every=0, checkpoints=()):
+    if checkpoint_every and len(checkpoints) != len(actions) // checkpoint_every:
+        raise ValueError(f"Expected {len(actions) // checkpoint_every} checkpoints, got {len(checkpoints)}")
+    buf = bytearray()
+    _write_varint(buf, seed)
+    _write_varint(buf, flags | FLAG_CHECKPOINTS if checkpoint_every else flags)
+    _write_varint(buf, len(actions))
+    buf += bytes(actions)  # Raises ValueError for actions >= 256
+    if checkpoint_every:
+        _write_varint(buf, checkpoint_every)
+        _write_varint(buf, len(checkpoints[0]) if checkpoints else 0)
+        for state in checkpoints:
+            buf += state
+    for p_idx in range(c.NUM_PLAYERS):
+        _write_varint(buf, scores[p_idx])
+    for p_idx in range(c.NUM_PLAYERS):
+        _write_varint(buf, tie_breakers[p_idx])
+    _write_varint(buf, winner + 1)
+    return buf
+
+
+def decode_records(data):
+    """Yield GameRecords from the bytes of one record file."""
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a game record file")
+    pos = len(MAGIC)
+    while pos < len(data):
+        seed, pos = _read_varint(data, pos)
+        flags, pos = _read_varint(data, pos)
+        n_actions, pos = _read_varint(data, pos)
+        actions = bytes(data[pos:pos + n_actions])
+        pos += n_actions
+        checkpoint_every, checkpoints = 0, ()
+        if flags & FLAG_CHECKPOINTS:
+            flags &= ~FLAG_CHECKPOINTS
+            checkpoint_every, pos = _read_varint(data, pos)
+            state_size, pos = _read_varint(data, pos)
+            checkpoints = tuple(bytes(data[start:start + state_size])
+                                for start in range(pos, pos + n_actions // checkpoint_every * state_size, state_size))
+            pos += len(checkpoints) * state_size
+        fields = []
+        for _ in range(2 * c.NUM_PLAYERS + 1):
+            value, pos = _read_varint(data, pos)
+            fields.append(value)
+        yield GameRecord(seed, flags, actions, tuple(fields[:c.NUM_PLAYERS]),
+                         tuple(fields[c.NUM_PLAYERS:2 * c.NUM_PLAYERS]), fields[-1] - 1,
+                         checkpoint_every, checkpoints)
+
+
+def read_records(paths):
+    """Yield GameRecords from one file path or a list of paths (e.g. all rotated parts)."""
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        yield from decode_records(data)
+
+
+def replay(record, env=None):
+    """Replay a record; returns the env positioned at the end of the game."""
+    if env is None:
+        from puerto_rico_env import PuertoRicoEnv2P
+        env = PuertoRicoEnv2P(**env_kwargs_from_flags(record.flags))
+    env._new_game(record.seed)
+    for action in record.actions:
+        env._apply_action(action)
+    return env
+
+
+def record_checkpoints(seed, flags, actions, checkpoint_every):
+    """Replay a game and return its packed states at plies checkpoint_every, 2 * checkpoint_every, ..."""
+    from puerto_rico_env import PuertoRicoEnv2P
+    env = PuertoRicoEnv2P(**env_kwargs_from_flags(flags))
+    env._new_game(seed)
+    checkpoints = []
+    for ply, action in enumerate(actions, 1):
+        env._apply_action(action)
+        if ply % checkpoint_every == 0:
+            checkpoints.append(env.game_state.to_bytes())
+    return checkpoints
+
+
+class GameReplay:
+    """
+    Random access to the positions of a recorded game.
+
+    Seeks restore the nearest packed GameState checkpoint at or before the
+    target (ply 0 is rebuilt from the seed) and apply the remaining actions.
+    Checkpoints stored in the record are used as they are, so any seek() -
+    including the first - applies fewer than `checkpoint_every` actions. For
+    records without them, checkpoints are taken as the replay first steps
+    past each multiple of `checkpoint_every`. Ply k is the position before
+    actions[k]; ply len(actions) is the final position.
+    """
+    def __init__(self, record, checkpoint_every=None, env=None):
+        if record.checkpoint_every:
+            if checkpoint_every not in (None, record.checkpoint_every):
+                raise ValueError(f"Record has checkpoints every {record.checkpoint_every} plies")
+            checkpoint_every = record.checkpoint_every
+        elif checkpoint_every is None:
+            checkpoint_every = 32
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be >= 1")
+        if env is None:
+            from puerto_rico_env import PuertoRicoEnv2P
+            env = PuertoRicoEnv2P(**env_kwargs_from_flags(record.flags))
+        self.record = record
+        self.checkpoint_every = checkpoint_every
+        self.env = env
+        # Index i = packed state at ply i * checkpoint_every (None: ply 0, built from the seed)
+        self._checkpoints = [None, *record.checkpoints]
+        self._restore(0)
+
+    def __len__(self):
+        """Number of positions (actions + 1)."""
+        return len(self.record.actions) + 1
+
+    def _restore(self, idx):
+        if idx == 0:
+            self.env._new_game(self.record.seed)
+        else:
+            from puerto_rico_env import GameState
+            self.env.game_state = GameState.from_bytes(self._checkpoints[idx])
+        self.ply = idx * self.checkpoint_every
+
+    def seek(self, ply):
+        """Position the env at `ply` and return it."""
+        if not 0 <= ply < len(self):
+            raise IndexError(f"ply {ply} out of range [0, {len(self)})")
+        idx = min(ply // self.checkpoint_every, len(self._checkpoints) - 1)
+        # Step on from the current position only if it is at least as close as the checkpoint
+        if not idx * self.checkpoint_every <= self.ply <= ply:
+            self._restore(idx)
+        while self.ply < ply:
+            self.env._apply_action(self.record.actions[self.ply])
+            self.ply += 1
+            if self.ply == len(self._checkpoints) * self.checkpoint_every:
+                self._checkpoints.append(self.env.game_state.to_bytes())
+        return self.env
+
+    def positions(self, start=0, stop=None):
+        """
+        Lazily yield each position in [start, stop) as a dict with the ply,
+        acting player, action taken there (-1 at the end), observation, action
+        mask and current scores.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        env = self.seek(start)
+        while True:
+            gs = env.game_state
+            ply = self.ply
+            scores, _ = env._calculate_score()
+            yield {
+                "ply": ply,
+                "player": gs.current_player_idx,
+                "action": self.record.actions[ply] if ply < len(self.record.actions) else -1,
+                "obs": env._get_obs(),
+                "mask": env.get_action_mask(),
+                "scores": [scores[p_idx] for p_idx in range(c.NUM_PLAYERS)],
+            }
+            if ply + 1 >= stop:
+                return
+            # Resume from our own position even if the caller seeked in between
+            self.seek(ply + 1)
+
+
+class GameRecordWriter:
+    """
+    Append-only buffered writer. Several games can be open at once, keyed by
+    any hashable (e.g. env index): start() -> record() per action -> finish().
+    Finished records go to `<prefix>-NNNNN.prgr`; a new part is started once a
+    part reaches `max_bytes` (parts may overshoot by up to one buffer), always
+    at a record boundary.
+
+    With `checkpoint_every`, each record also stores the packed GameState
+    every `checkpoint_every` actions (223 bytes each) for GameReplay. Pass the
+    state after each action to record() or the checkpoints to write_game();
+    otherwise the game is replayed once to take them.
+    """
+    def __init__(self, prefix, max_bytes=64 << 20, buffer_size=1 << 20, checkpoint_every=0):
+        if checkpoint_every < 0:
+            raise ValueError("checkpoint_every must be >= 0")
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.buffer_size = buffer_size
+        self.checkpoint_every = checkpoint_every
+        self.paths = []
+        self.n_records = 0
+        self._open_games = {}
+        self._buffer = bytearray()
+        self._file = None
+        self._file_bytes = 0
+
+    def start(self, key, seed, flags=0):
+        self._open_games[key] = (seed, flags, bytearray(), [])
+
+    def record(self, key, action, state=None):
+        """Append `action`; `state` is the GameState after it (for checkpoints)."""
+        _, _, actions, checkpoints = self._open_games[key]
+        actions.append(action)
+        if state is not None and self.checkpoint_every and len(actions) % self.checkpoint_every == 0:
+            checkpoints.append(state.to_bytes())
+
+    def finish(self, key, scores, tie_breakers, winner):
+        seed, flags, actions, checkpoints = self._open_games.pop(key)
+        if self.checkpoint_every and len(checkpoints) != len(actions) // self.checkpoint_every:
+            checkpoints = None
+        self.write_game(seed, flags, actions, scores, tie_breakers, winner, checkpoints)
+
+    def discard(self, key):
+        self._open_games.pop(key, None)
+
+    def write_game(self, seed, flags, actions, scores, tie_breakers, winner, checkpoints=None):
+        if self.checkpoint_every and checkpoints is None:
+            checkpoints = record_checkpoints(seed, flags, actions, self.checkpoint_every)
+        self._buffer += encode_record(seed, flags, actions, scores, tie_breakers, winner,
+                                      self.checkpoint_every, checkpoints or ())
+        self.n_records += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self._file is None or self._file_bytes >= self.max_bytes:
+            self._rotate()
+        self._file.write(self._buffer)
+        self._file_bytes += len(self._buffer)
+        self._buffer = bytearray()
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        path = f"{self.prefix}-{len(self.paths):05d}.prgr"
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._file_bytes = len(MAGIC)
+        self.paths.append(path)
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
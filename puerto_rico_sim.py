@@ -0,0 +1,147 @@
+# puerto_rico_sim.py
+"""
+Headless bulk game simulation.
+
+Drives the same rules as PuertoRicoEnv2P (`_new_game`, `legal_actions`,
+`_apply_action`) but never builds observations, info dicts or wrappers.
+Forced moves (a single legal action) are applied without calling the policy.
+
+A policy is a function `policy_fn(env, legal_actions, rng) -> action` that may
+read `env.game_state`; pass a tuple of policies to give each player its own.
+Keep policies at module level (or picklable objects) so `simulate` can be
+submitted to a process pool:
+
+    with ProcessPoolExecutor() as pool:
+        futures = [pool.submit(simulate, random_policy, 1000, seed=i * 1000) for i in range(8)]
+"""
+import numpy as np
+import puerto_rico_constants as c
+from puerto_rico_env import PuertoRicoEnv2P, determine_winner
+from puerto_rico_encoding import canonicalize_obs
+from puerto_rico_records import env_flags
+from puerto_rico_bots import BotPolicy
+
+
+def random_policy(env, legal_actions, rng):
+    """Uniformly random legal action."""
+    return legal_actions[rng.integers(len(legal_actions))]
+
+
+def greedy_policy(env, legal_actions, rng):
+    """
+    One-ply lookahead: the legal action with the largest immediate VP gain for
+    the acting player (random tie-break).
+    """
+    gains = env.expand(legal_actions, with_obs=False)["score_delta"][:, env.game_state.current_player_idx]
+    best_actions = [action for action, gain in zip(legal_actions, gains) if gain == gains.max()]
+    return best_actions[rng.integers(len(best_actions))]
+
+
+class CheckpointPolicy:
+    """
+    MaskablePPO checkpoint as a policy. The model is loaded lazily in each
+    process, so instances can be sent to pool workers.
+    """
+    def __init__(self, path, deterministic=True):
+        self.path = path
+        self.deterministic = deterministic
+        self._model = None
+
+    def __getstate__(self):
+        return {"path": self.path, "deterministic": self.deterministic}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __call__(self, env, legal_actions, rng):
+        if self._model is None:
+            from sb3_contrib import MaskablePPO
+            self._model = MaskablePPO.load(self.path, device="cpu")
+        # Same view as training: canonical observation and env mask
+        obs = canonicalize_obs(env._get_obs(), env.game_state.current_player_idx)
+        action, _ = self._model.predict(obs, action_masks=env.get_action_mask(),
+                                        deterministic=self.deterministic)
+        return int(action)
+
+
+POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_policy,
+}
+
+
+def make_policy(spec):
+    """Policy from a name in POLICIES, 'bot:NAME' (puerto_rico_bots) or 'checkpoint:PATH'."""
+    if spec.startswith("checkpoint:"):
+        return CheckpointPolicy(spec[len("checkpoint:"):])
+    if spec.startswith("bot:"):
+        return BotPolicy(spec[len("bot:"):])
+    if spec not in POLICIES:
+        raise ValueError(f"Unknown policy '{spec}' (choose from {sorted(POLICIES)}, bot:NAME or checkpoint:PATH)")
+    return POLICIES[spec]
+
+
+def simulate(policy_fn, n_games, seed=0, env_kwargs=None, stats=None, recorder=None):
+    """
+    Play `n_games` games; game i is set up with seed `seed + i`.
+    `policy_fn` is one policy for both players or a tuple with one per player.
+    `stats` (a GameStatsAggregator) is updated in place if given.
+    `recorder` (a GameRecordWriter) receives one binary record per game if given.
+    Returns a dict of arrays:
+        seeds (N,), scores (N, 2), tie_breakers (N, 2), winner (N,) (-1 = tie),
+        lengths (N,) actions applied, decisions (N,) policy calls
+    """
+    env = PuertoRicoEnv2P(**(env_kwargs or {}))
+    env.stats = stats
+    flags = env_flags(env)
+    rng = np.random.default_rng(seed)
+    if callable(policy_fn):
+        policy_fn = (policy_fn,) * c.NUM_PLAYERS
+
+    seeds = np.arange(seed, seed + n_games, dtype=np.int64)
+    scores = np.zeros((n_games, c.NUM_PLAYERS), dtype=np.int32)
+    tie_breakers = np.zeros((n_games, c.NUM_PLAYERS), dtype=np.int32)
+    winner = np.zeros(n_games, dtype=np.int8)
+    lengths = np.zeros(n_games, dtype=np.int32)
+    decisions = np.zeros(n_games, dtype=np.int32)
+
+    for i in range(n_games):
+        env._new_game(int(seeds[i]))
+        gs = env.game_state
+        n_actions = 0
+        n_decisions = 0
+        actions = bytearray() if recorder is not None else None
+        checkpoints = [] if recorder is not None and recorder.checkpoint_every else None
+        while gs.phase != c.PHASE_GAME_END:
+            legal = env.legal_actions()
+            if len(legal) == 1:
+                action = legal[0]
+            else:
+                action = policy_fn[gs.current_player_idx](env, legal, rng)
+                n_decisions += 1
+            env._apply_action(action)
+            n_actions += 1
+            if actions is not None:
+                actions.append(action)
+                if checkpoints is not None and n_actions % recorder.checkpoint_every == 0:
+                    checkpoints.append(gs.to_bytes())
+
+        game_scores, game_tie_breakers = env._calculate_score()
+        for p_idx in range(c.NUM_PLAYERS):
+            scores[i, p_idx] = game_scores[p_idx]
+            tie_breakers[i, p_idx] = game_tie_breakers[p_idx]
+        winner[i] = determine_winner(game_scores, game_tie_breakers)
+        lengths[i] = n_actions
+        decisions[i] = n_decisions
+        if recorder is not None:
+            recorder.write_game(int(seeds[i]), flags, actions, game_scores, game_tie_breakers, int(winner[i]),
+                                checkpoints)
+
+    return {
+        "seeds": seeds,
+        "scores": scores,
+        "tie_breakers": tie_breakers,
+        "winner": winner,
+        "lengths": lengths,
+        "decisions": decisions,
+    }
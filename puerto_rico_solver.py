@@ -0,0 +1,241 @@
+# puerto_rico_solver.py
+"""
+Endgame search: depth-limited alpha-beta over player decisions, expectimax
+over plantation draws, with a transposition table and iterative deepening
+under a time budget.
+
+Values are final score margins from the point of view of the player to move
+at the root (VP difference; a points tie counts +-0.5 by the tie-breaker),
+so value > 0 means a win. Leaves cut off by the depth limit are valued by the
+current margin (_calculate_score); a result is `proven` when every line
+reached the end of the game, and its value is then the exact expected margin.
+
+Draws are chance nodes: the search runs on a counts-deck copy of the state
+(a list-mode deck's hidden order is treated as unknown) and enumerates each
+plantation type with probability count / remaining. Forced moves do not use
+up depth.
+
+    solver = EndgameSolver(time_budget=1.0)
+    result = solver.solve(env)  # SolverResult(action, value, proven, depth, nodes, elapsed)
+"""
+import time
+from collections import namedtuple
+
+import puerto_rico_constants as c
+from puerto_rico_env import PuertoRicoEnv2P, GameState
+
+SolverResult = namedtuple("SolverResult", ["action", "value", "proven", "depth", "nodes", "elapsed"])
+
+# Transposition table bounds
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+INF = float("inf")
+
+
+class _ChanceNode(Exception):
+    """Raised by _SearchEnv when an action needs a draw that is not scripted yet."""
+    def __init__(self, counts):
+        self.counts = counts
+
+
+class _Timeout(Exception):
+    pass
+
+
+class _SearchEnv(PuertoRicoEnv2P):
+    """Counts-deck env whose plantation draws are chosen by the solver."""
+    def __init__(self, mayor_mode):
+        super().__init__(mayor_mode=mayor_mode, deck_mode="counts")
+        self.draws = ()
+        self.n_draws = 0
+
+    def _draw_plantation(self, from_front=False):
+        gs = self.game_state
+        if sum(gs.deck_counts) == 0:
+            gs.deck_counts = [d + x for d, x in zip(gs.deck_counts, gs.discard_counts)]
+            gs.discard_counts = [0] * c.NUM_PLANTATION_TYPES
+            if sum(gs.deck_counts) == 0:
+                return -1
+        if self.n_draws == len(self.draws):
+            raise _ChanceNode(list(gs.deck_counts))
+        tile = self.draws[self.n_draws]
+        self.n_draws += 1
+        gs.deck_counts[tile] -= 1
+        return tile
+
+
+def search_state(env):
+    """Copy of env's state for the solver: counts deck, no seed or RNG position."""
+    gs = GameState.from_bytes(env.game_state.to_bytes())
+    if env.deck_mode == "list":
+        for tile in gs.plantation_deck:
+            gs.deck_counts[tile] += 1
+        for tile in gs.discarded_plantations:
+            gs.discard_counts[tile] += 1
+        gs.plantation_deck = []
+        gs.discarded_plantations = []
+    # Draws are enumerated, so positions that differ only in RNG state are the same node
+    gs.seed = None
+    gs.rng = None
+    return gs
+
+
+class EndgameSolver:
+    """
+    Reusable solver; the transposition tables (one per root player, since
+    values are from the root player's view) are kept between solve() calls
+    and cleared once they hold `max_entries` positions. Also usable as a
+    policy for puerto_rico_sim.simulate.
+    """
+    def __init__(self, time_budget=1.0, max_depth=64, max_entries=1 << 20):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.max_entries = max_entries
+        # packed state -> (depth, value, bound, best action, proven)
+        self.tables = [{} for _ in range(c.NUM_PLAYERS)]
+        self.table = self.tables[0]
+        self.history = {}  # action -> cutoff score, for move ordering
+        self.nodes = 0
+        self._envs = {}
+        self._env = None
+        self._deadline = INF
+
+    def __call__(self, env, legal_actions, rng):
+        return self.solve(env).action
+
+    def solve(self, env, time_budget=None):
+        """Search env's current position; env itself is not modified."""
+        start = time.perf_counter()
+        budget = self.time_budget if time_budget is None else time_budget
+        if env.mayor_mode not in self._envs:
+            self._envs[env.mayor_mode] = _SearchEnv(env.mayor_mode)
+        self._env = self._envs[env.mayor_mode]
+        root = search_state(env)
+        self.root_player = root.current_player_idx
+        self.table = self.tables[self.root_player]
+        if len(self.table) >= self.max_entries:
+            self.table.clear()
+        self.nodes = 0
+
+        result = SolverResult(None, self._margin(root), root.phase == c.PHASE_GAME_END, 0, 0, 0.0)
+        if root.phase == c.PHASE_GAME_END:
+            return result
+        data = root.to_bytes()
+        self._env.game_state = root
+        root_legal = self._env.legal_actions()
+        self._deadline = INF  # Depth 1 always completes
+        for depth in range(1, self.max_depth + 1):
+            try:
+                value, proven = self._search(root, data, depth, -INF, INF)
+            except _Timeout:
+                break
+            action = self.table[data][3] if data in self.table else root_legal[0]
+            result = SolverResult(action, value, proven, depth, self.nodes, time.perf_counter() - start)
+            if proven:
+                break
+            self._deadline = start + budget
+            if time.perf_counter() >= self._deadline:
+                break
+        return result._replace(nodes=self.nodes, elapsed=time.perf_counter() - start)
+
+    # --- Search ---
+
+    def _margin(self, gs):
+        env = self._env
+        env.game_state = gs
+        scores, tie_breakers = env._calculate_score()
+        me, other = self.root_player, 1 - self.root_player
+        margin = scores[me] - scores[other]
+        if margin == 0 and tie_breakers[me] != tie_breakers[other]:
+            return 0.5 if tie_breakers[me] > tie_breakers[other] else -0.5
+        return float(margin)
+
+    def _outcomes(self, data, action):
+        """(probability, state, packed state) for each result of `action`, enumerating draws."""
+        env = self._env
+        outcomes = []
+        pending = [((), 1.0)]
+        while pending:
+            draws, prob = pending.pop()
+            env.game_state = GameState.from_bytes(data)
+            env.draws = draws
+            env.n_draws = 0
+            try:
+                env._apply_action(action)
+            except _ChanceNode as node:
+                total = sum(node.counts)
+                for tile, count in enumerate(node.counts):
+                    if count:
+                        pending.append((draws + (tile,), prob * count / total))
+                continue
+            outcomes.append((prob, env.game_state, env.game_state.to_bytes()))
+        return outcomes
+
+    def _search(self, gs, data, depth, alpha, beta):
+        """(value, proven) of position `gs` (packed: `data`); fail-soft alpha-beta."""
+        self.nodes += 1
+        if self.nodes & 255 == 0 and time.perf_counter() >= self._deadline:
+            raise _Timeout()
+        if gs.phase == c.PHASE_GAME_END:
+            return self._margin(gs), True
+        env = self._env
+        env.game_state = gs
+        legal = env.legal_actions()
+        if len(legal) == 1:
+            # Forced move: no decision, no depth used, nothing worth storing
+            return self._action_value(data, legal[0], depth, alpha, beta)
+        if depth <= 0:
+            return self._margin(gs), False
+
+        best_action = None
+        entry = self.table.get(data)
+        if entry is not None:
+            e_depth, e_value, e_bound, best_action, e_proven = entry
+            if e_proven or e_depth >= depth:
+                if (e_bound == EXACT or (e_bound == LOWER and e_value >= beta)
+                        or (e_bound == UPPER and e_value <= alpha)):
+                    return e_value, e_proven
+
+        maximizing = gs.current_player_idx == self.root_player
+        history = self.history
+        ordered = sorted(legal, key=lambda a: (a != best_action, -history.get(a, 0)))
+        alpha0, beta0 = alpha, beta
+        best_value = -INF if maximizing else INF
+        proven = True
+        for action in ordered:
+            value, child_proven = self._action_value(data, action, depth - 1, alpha, beta)
+            proven = proven and child_proven
+            if (value > best_value) if maximizing else (value < best_value):
+                best_value = value
+                best_action = action
+            if maximizing:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                history[action] = history.get(action, 0) + depth * depth
+                break
+
+        if best_value <= alpha0:
+            bound = UPPER
+        elif best_value >= beta0:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table[data] = (depth, best_value, bound, best_action, proven)
+        return best_value, proven
+
+    def _action_value(self, data, action, depth, alpha, beta):
+        outcomes = self._outcomes(data, action)
+        if len(outcomes) == 1:
+            return self._search(outcomes[0][1], outcomes[0][2], depth, alpha, beta)
+        # Chance node: exact expectation (children searched with a full window)
+        value = 0.0
+        proven = True
+        for prob, child, child_data in outcomes:
+            child_value, child_proven = self._search(child, child_data, depth, -INF, INF)
+            value += prob * child_value
+            proven = proven and child_proven
+        return value, proven
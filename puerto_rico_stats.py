@@ -0,0 +1,95 @@
+# puerto_rico_stats.py
+"""
+Streaming game statistics with constant memory.
+
+A GameStatsAggregator holds fixed-size numpy counters that the environment
+updates through hooks in its step handlers (set `env.stats = aggregator`).
+Nothing per game is kept once the game ends, so memory does not grow with the
+number of games. Aggregators from different workers are combined with merge().
+
+Use one aggregator per environment (the current game's end triggers are kept
+on the aggregator until the game ends), then merge them.
+"""
+import numpy as np
+import puerto_rico_constants as c
+
+MAX_ROUNDS = 32  # Later rounds are counted in the last bin
+
+# Indexed by c.END_TRIGGER_*
+END_TRIGGER_NAMES = ["vp_chips", "colonists", "buildings"]
+
+
+class GameStatsAggregator:
+    def __init__(self):
+        self.games = 0
+        # Role picks per round
+        self.role_picks = np.zeros((MAX_ROUNDS, c.NUM_ROLES), dtype=np.int64)
+        # Building purchases per round
+        self.building_purchases = np.zeros((MAX_ROUNDS, c.NUM_BUILDINGS), dtype=np.int64)
+        # VP totals per player: shipping (chips) and buildings (incl. large building bonus)
+        self.shipping_vp = np.zeros(c.NUM_PLAYERS, dtype=np.int64)
+        self.building_vp = np.zeros(c.NUM_PLAYERS, dtype=np.int64)
+        # Games in which each trigger fired (several can fire in one game)
+        self.end_triggers = np.zeros(c.NUM_END_TRIGGERS, dtype=np.int64)
+        # Game length in rounds
+        self.rounds = np.zeros(MAX_ROUNDS + 1, dtype=np.int64)
+        # Score margin (player 0 - player 1), index = margin + MAX_VP_OBS, clipped
+        self.margins = np.zeros(2 * c.MAX_VP_OBS + 1, dtype=np.int64)
+        self._triggers = np.zeros(c.NUM_END_TRIGGERS, dtype=bool)
+
+    # --- Hooks called by PuertoRicoEnv2P ---
+
+    def on_game_start(self):
+        self._triggers[:] = False
+
+    def on_role_pick(self, round_idx, role_id):
+        self.role_picks[min(round_idx, MAX_ROUNDS - 1), role_id] += 1
+
+    def on_build(self, round_idx, building_id):
+        self.building_purchases[min(round_idx, MAX_ROUNDS - 1), building_id] += 1
+
+    def on_ship(self, player_idx, vp):
+        self.shipping_vp[player_idx] += vp
+
+    def on_end_trigger(self, trigger):
+        self._triggers[trigger] = True
+
+    def on_game_end(self, n_rounds, scores, vp_chips):
+        self.games += 1
+        self.end_triggers += self._triggers
+        self.rounds[min(n_rounds, MAX_ROUNDS)] += 1
+        for p_idx in range(c.NUM_PLAYERS):
+            self.building_vp[p_idx] += scores[p_idx] - vp_chips[p_idx]
+        margin = int(np.clip(scores[0] - scores[1], -c.MAX_VP_OBS, c.MAX_VP_OBS))
+        self.margins[margin + c.MAX_VP_OBS] += 1
+        self._triggers[:] = False
+
+    # --- Combining and reporting ---
+
+    def merge(self, other):
+        """Add the counters of `other` (e.g. another worker's aggregator) into this one."""
+        self.games += other.games
+        for name in ("role_picks", "building_purchases", "shipping_vp", "building_vp",
+                     "end_triggers", "rounds", "margins"):
+            getattr(self, name)[...] += getattr(other, name)
+        return self
+
+    def summary(self):
+        """Per-game rates and distributions as plain Python values."""
+        games = max(self.games, 1)
+        margin_values = np.arange(-c.MAX_VP_OBS, c.MAX_VP_OBS + 1)
+        picks = self.role_picks.sum(axis=0)
+        purchases = self.building_purchases.sum(axis=0)
+        purchase_rounds = np.arange(MAX_ROUNDS) @ self.building_purchases
+        total_vp = self.shipping_vp.sum() + self.building_vp.sum()
+        return {
+            "games": self.games,
+            "role_pick_rate": (picks / games).tolist(),
+            "building_purchase_rate": (purchases / games).tolist(),
+            "building_mean_round": (purchase_rounds / np.maximum(purchases, 1)).tolist(),
+            "shipping_vp_share": float(self.shipping_vp.sum() / max(total_vp, 1)),
+            "end_trigger_rate": dict(zip(END_TRIGGER_NAMES, (self.end_triggers / games).tolist())),
+            "mean_rounds": float(np.arange(MAX_ROUNDS + 1) @ self.rounds / games),
+            "mean_margin": float(margin_values @ self.margins / games),
+            "mean_abs_margin": float(np.abs(margin_values) @ self.margins / games),
+        }
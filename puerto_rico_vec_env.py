@@ -0,0 +1,75 @@
+# puerto_rico_vec_env.py
+"""
+Action masks for SB3 vector envs without extra worker round-trips.
+
+MaskablePPO reads masks with `env_method("action_masks")`: on SubprocVecEnv
+that is a second pipe round-trip per worker and step, after `step`. Built
+with `info_action_mask=True`, PuertoRicoEnv2P already returns the mask of
+the next observation in info["action_mask"], so it arrives in the step
+reply. VecActionMaskWrapper keeps those masks and answers the mask requests
+locally:
+
+    env = VecActionMaskWrapper(SubprocVecEnv([make_env] * 8))
+    env.action_masks()               # (n_envs, n_actions), no IPC
+    env.env_method("action_masks")   # Same rows, no IPC (MaskablePPO path)
+
+After an autoreset the mask is taken from the reset info (venv.reset_infos),
+so it matches the returned observation of the new episode. Works with any
+SB3 VecEnv (SubprocVecEnv, DummyVecEnv); other env_method/get_attr calls go
+to the wrapped env.
+"""
+from functools import partial
+
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnvWrapper
+
+MASK_METHOD = "action_masks"
+MASK_KEY = "action_mask"
+
+
+class VecActionMaskWrapper(VecEnvWrapper):
+    """Serves `action_masks` from the masks returned in the reset/step infos."""
+    def __init__(self, venv):
+        super().__init__(venv)
+        self._masks = None
+
+    def _collect(self, infos):
+        try:
+            self._masks = np.stack([info[MASK_KEY] for info in infos])
+        except KeyError:
+            raise ValueError("Sub-envs must return info['action_mask'] "
+                             "(build them with PuertoRicoEnv2P(info_action_mask=True))") from None
+
+    def reset(self):
+        obs = self.venv.reset()
+        self._collect(self.venv.reset_infos)
+        return obs
+
+    def step_wait(self):
+        obs, rewards, dones, infos = self.venv.step_wait()
+        # A done env was reset by the worker: its obs (and mask) belong to the new episode
+        reset_infos = self.venv.reset_infos
+        self._collect([reset_infos[i] if done else info for i, (done, info) in enumerate(zip(dones, infos))])
+        return obs, rewards, dones, infos
+
+    def action_masks(self):
+        if self._masks is None:
+            raise RuntimeError("Call reset() before action_masks()")
+        return self._masks
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        if method_name == MASK_METHOD:
+            masks = self.action_masks()
+            return [masks[i] for i in self._get_indices(indices)]
+        return self.venv.env_method(method_name, *method_args, indices=indices, **method_kwargs)
+
+    def get_attr(self, attr_name, indices=None):
+        if attr_name == MASK_METHOD:
+            return [partial(self._env_mask, i) for i in self._get_indices(indices)]
+        return self.venv.get_attr(attr_name, indices=indices)
+
+    def has_attr(self, attr_name):
+        return attr_name == MASK_METHOD or self.venv.has_attr(attr_name)
+
+    def _env_mask(self, index):
+        return self.action_masks()[index]
@@ -0,0 +1,74 @@
+# puerto_rico_vector.py
+"""
+Gymnasium vector entry point for PuertoRicoEnv2P.
+
+    envs = gym.make_vec("PuertoRico2P-v0", num_envs=8)                    # async, shared memory
+    envs = gym.make_vec("PuertoRico2P-v0", num_envs=8, vectorization="sync", mayor_mode="allocation")
+
+Remaining keyword arguments go to PuertoRicoEnv2P. The sub-envs return their
+action mask in info["action_mask"], so masks travel with the step results
+(batched by the vector env, no extra round-trip to the workers) and
+`envs.action_masks()` returns the (num_envs, NUM_ACTIONS) masks of the
+current observations.
+
+Autoreset is SAME_STEP: a finished sub-env is reset inside the same step()
+call. The returned obs and mask belong to the new game; the last observation
+and info of the finished game are in info["final_obs"][i] / info["final_info"]
+(rows flagged by info["_final_obs"]). Policies therefore never see the terminal
+state, whose mask is all zeros.
+"""
+from functools import partial
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector import AsyncVectorEnv, SyncVectorEnv, AutoresetMode
+
+from puerto_rico_env import PuertoRicoEnv2P
+
+
+class MaskedVectorEnv(gym.vector.VectorWrapper):
+    """Keeps the batched info["action_mask"] of the last reset()/step() for `action_masks()`."""
+    def __init__(self, env):
+        super().__init__(env)
+        self._masks = None
+
+    def reset(self, **kwargs):
+        obs, info = self.env.reset(**kwargs)
+        self._masks = info["action_mask"]
+        return obs, info
+
+    def step(self, actions):
+        obs, rewards, terminations, truncations, info = self.env.step(actions)
+        self._masks = info["action_mask"]
+        return obs, rewards, terminations, truncations, info
+
+    def action_masks(self):
+        if self._masks is None:
+            raise RuntimeError("Call reset() before action_masks()")
+        return self._masks
+
+
+def make_vector_env(num_envs=1, vectorization="async", shared_memory=True, context=None, **env_kwargs):
+    """
+    Vector env of `num_envs` PuertoRicoEnv2P instances.
+
+    vectorization: "async" (one worker process per env; observations written to
+                   shared memory when `shared_memory`) or "sync" (in-process loop).
+    context: multiprocessing start method for "async" (default: platform default).
+    """
+    env_kwargs["info_action_mask"] = True
+    env_fns = [partial(PuertoRicoEnv2P, **env_kwargs) for _ in range(num_envs)]
+    if vectorization == "async":
+        envs = AsyncVectorEnv(env_fns, shared_memory=shared_memory, context=context,
+                              autoreset_mode=AutoresetMode.SAME_STEP)
+    elif vectorization == "sync":
+        envs = SyncVectorEnv(env_fns, autoreset_mode=AutoresetMode.SAME_STEP)
+    else:
+        raise ValueError(f"Unknown vectorization '{vectorization}' (expected 'async' or 'sync')")
+    return MaskedVectorEnv(envs)
+
+
+def sample_masked_actions(masks, rng):
+    """One uniformly random legal action per row of `masks`."""
+    scores = np.where(np.asarray(masks) > 0, rng.random(np.shape(masks)), -1.0)
+    return np.argmax(scores, axis=1)
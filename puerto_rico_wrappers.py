@@ -1,8 +1,38 @@
 
+import time
 import gymnasium as gym
 import numpy as np
 import puerto_rico_constants as c
-from sb3_contrib.common.wrappers import ActionMasker
+from puerto_rico_encoding import canonicalize_obs
+from puerto_rico_env import determine_winner
+
+# Shaping reward per VP gained by the acting player
+VP_REWARD = 0.01
+
+
+def outcome_reward(winner, player_idx):
+    """+1 if `player_idx` won, -1 if it lost, 0 for a tie (winner -1); also works on arrays."""
+    return np.where(winner == -1, 0.0, np.where(winner == player_idx, 1.0, -1.0))
+
+
+def self_play_reward(env, actor, prev_scores, terminated, info):
+    """
+    Reward of `actor` for the step it just took: VP_REWARD per VP gained since
+    its previous step (updates prev_scores[actor]), plus outcome_reward() at
+    the end of the game (also sets info['winner'] and info['scores']).
+    Score changes of the other player during this step (e.g. their forced moves
+    resolved by env auto_advance) are credited to them on their next step.
+    """
+    scores, tie_breakers = env._calculate_score()
+    reward = (scores[actor] - prev_scores[actor]) * VP_REWARD
+    prev_scores[actor] = scores[actor]
+    if terminated:
+        # Tie Breaker: Doubloons + Goods, -1 = True Tie
+        winner = determine_winner(scores, tie_breakers)
+        reward += float(outcome_reward(winner, actor))
+        info['winner'] = winner
+        info['scores'] = scores
+    return reward
 
 class PuertoRicoSelfPlayWrapper(gym.Wrapper):
     """
@@ -40,55 +70,10 @@ class PuertoRicoSelfPlayWrapper(gym.Wrapper):
         # Execute
         obs, reward, terminated, truncated, info = self.env.step(action)
         
-        # Calculate Reward
-        # 1. Intermediate Reward (VP Delta)
-        # We need to calculate ANY score change for the ACTING player.
-        # Note: step() might have advanced the queue, so env.game_state.current_player_idx 
-        # might now be different (Next Player).
-        # We need to reward the player who JUST ACTED (`current_p_idx`).
-        
-        scores, tie_breakers = self.env._calculate_score()
-        
-        # Delta for the actor
-        current_score = scores[current_p_idx]
-        delta = current_score - self.prev_scores[current_p_idx]
-        
-        # Update prev scores
-        self.prev_scores = scores
-        
-        # Shaping Reward (e.g., 0.01 per VP point gain to guide learning)
-        reward += delta * 0.01 
-        
-        # 2. Terminal Reward (Win/Loss)
-        if terminated:
-            # Determine Winner
-            p0_score = scores[0]
-            p1_score = scores[1]
-            
-            winner = -1
-            if p0_score > p1_score:
-                winner = 0
-            elif p1_score > p0_score:
-                winner = 1
-            else:
-                # Tie Breaker
-                if tie_breakers[0] > tie_breakers[1]:
-                    winner = 0
-                elif tie_breakers[1] > tie_breakers[0]:
-                    winner = 1
-                else:
-                    winner = -1 # True Tie
-            
-            # Assign Reward to the ACTOR
-            if winner == current_p_idx:
-                reward += 1.0
-            elif winner == -1:
-                reward += 0.0 # Tie
-            else:
-                reward -= 1.0 # Lost
-                
-            info['winner'] = winner
-            info['scores'] = scores
+        # Calculate Reward for the player who JUST ACTED (`current_p_idx`):
+        # step() might have advanced the queue to the next player.
+        # VP delta shaping plus Win/Loss at the end (self_play_reward).
+        reward += self_play_reward(self.env, current_p_idx, self.prev_scores, terminated, info)
         
         # Canonicalize Observation for the NEXT player (who is about to act)
         next_p_idx = self.env.game_state.current_player_idx
@@ -100,38 +85,7 @@ class PuertoRicoSelfPlayWrapper(gym.Wrapper):
         """
         Transform observation so `player_idx` (Current Player) is always at index 0 of `players_vec`.
         """
-        if player_idx == 0:
-            return obs
-            
-        # If Player 1 is current, Swap P0 and P1 in 'players'
-        # obs structure: 'global', 'players', 'market_plantations'
-        
-        new_obs = obs.copy()
-        p_vec = new_obs['players'].copy()
-        
-        # Swap rows 0 and 1
-        # P0 -> P1 slot, P1 -> P0 slot
-        new_obs['players'] = np.flip(p_vec, axis=0)
-        
-        # Update Global Vector Details if they depend on absolute index
-        # global[32] = Governor Index
-        # global[33] = Current Player Index
-        # global[34] = Colonist Ship
-        
-        g_vec = new_obs['global'].copy()
-        
-        # Governor Index: If it was 0, and I am 1. Relative?
-        # Let's make it Relative Governor: 1 if Me, 0 if Opponent.
-        gov_idx = g_vec[32]
-        relative_gov = 1 if gov_idx == player_idx else 0
-        g_vec[32] = relative_gov
-        
-        # Current Player Index: Always 0 in canonical view
-        g_vec[33] = 0 
-        
-        new_obs['global'] = g_vec
-        
-        return new_obs
+        return canonicalize_obs(obs, player_idx)
 
     def action_masks(self):
         # MaskablePPO uses this.
@@ -140,3 +94,57 @@ class PuertoRicoSelfPlayWrapper(gym.Wrapper):
         # Since `game_state` is the ground truth, we can just call env.get_action_mask().
         return self.env.get_action_mask()
 
+
+
+class ActionMaskWrapper(gym.Wrapper):
+    """
+    Picklable replacement for `ActionMasker(env, lambda env: env.action_masks())`:
+    exposes the mask of the underlying PuertoRicoEnv2P (the current player's
+    legal actions, which is what the canonical observation shows).
+    """
+    def action_masks(self):
+        return self.env.unwrapped.get_action_mask()
+
+
+class PuertoRicoTrainingWrapper(gym.Wrapper):
+    """
+    The training stack `Monitor(ActionMasker(PuertoRicoSelfPlayWrapper(env), ...))`
+    as one picklable layer over PuertoRicoEnv2P:
+
+    1. Canonical observation of the player about to act.
+    2. Rewards of PuertoRicoSelfPlayWrapper (self_play_reward): VP_REWARD per VP
+       gained by the actor, +1 / -1 / 0 for the actor on win / loss / tie
+       (info["winner"], info["scores"]).
+    3. `action_masks()` for MaskablePPO (or info["action_mask"] with VecActionMaskWrapper).
+    4. Monitor-style episode statistics: info["episode"] = {"r", "l", "t"} on the
+       last step, which SB3 collects into ep_info_buffer.
+    """
+    def __init__(self, env):
+        super().__init__(env)
+        self.prev_scores = [0, 0]
+        self.t_start = time.time()
+        self.episode_return = 0.0
+        self.episode_length = 0
+
+    def reset(self, **kwargs):
+        obs, info = self.env.reset(**kwargs)
+        self.prev_scores = [0, 0]
+        self.episode_return = 0.0
+        self.episode_length = 0
+        return canonicalize_obs(obs, self.env.unwrapped.game_state.current_player_idx), info
+
+    def step(self, action):
+        base = self.env.unwrapped
+        actor = base.game_state.current_player_idx
+        obs, reward, terminated, truncated, info = self.env.step(action)
+
+        reward += self_play_reward(base, actor, self.prev_scores, terminated, info)
+        self.episode_return += reward
+        self.episode_length += 1
+        if terminated or truncated:
+            info['episode'] = {"r": round(self.episode_return, 6), "l": self.episode_length,
+                               "t": round(time.time() - self.t_start, 6)}
+        return canonicalize_obs(obs, base.game_state.current_player_idx), reward, terminated, truncated, info
+
+    def action_masks(self):
+        return self.env.unwrapped.get_action_mask()
@@ -0,0 +1,170 @@
+"""
+Mass game simulation across a process pool.
+
+    python -m run_simulations --games 100000 --workers 8 --policies random greedy --out results.jsonl
+
+Games are split into fixed-size chunks; chunk k plays seeds
+[seed + k * chunk_size, ...) with its policy RNG seeded the same way, so results
+are identical for any worker count. Results stream to JSONL (one game per line)
+or are written as a columnar .npz (one array per column).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_sim import simulate, make_policy
+from puerto_rico_stats import GameStatsAggregator
+from puerto_rico_records import GameRecordWriter
+
+COLUMNS = ["seeds", "scores", "tie_breakers", "winner", "lengths", "decisions"]
+
+
+def _run_chunk(task):
+    chunk_idx, seed, n_games, policy_specs, env_kwargs, collect_stats, records_prefix = task
+    start = time.perf_counter()
+    policies = tuple(make_policy(spec) for spec in policy_specs)
+    stats = GameStatsAggregator() if collect_stats else None
+    recorder = GameRecordWriter(f"{records_prefix}-c{chunk_idx:05d}") if records_prefix else None
+    result = simulate(policies, n_games, seed=seed, env_kwargs=env_kwargs, stats=stats, recorder=recorder)
+    if recorder is not None:
+        recorder.close()
+    busy = time.perf_counter() - start
+    return chunk_idx, policy_specs, result, stats, os.getpid(), busy
+
+
+def make_tasks(n_games, chunk_size, seed, policy_specs, env_kwargs, swap_seats=False, collect_stats=False,
+               records_prefix=None):
+    tasks = []
+    for chunk_idx, start in enumerate(range(0, n_games, chunk_size)):
+        specs = tuple(policy_specs)
+        if swap_seats and chunk_idx % 2 == 1:
+            specs = specs[::-1]
+        tasks.append((chunk_idx, seed + start, min(chunk_size, n_games - start), specs, env_kwargs,
+                      collect_stats, records_prefix))
+    return tasks
+
+
+class JsonlWriter:
+    """Streams one JSON object per game."""
+    def __init__(self, path):
+        self.file = open(path, "w", buffering=1 << 20)
+
+    def write_chunk(self, policy_specs, result):
+        for i in range(len(result["seeds"])):
+            row = {
+                "seed": int(result["seeds"][i]),
+                "policies": list(policy_specs),
+                "scores": result["scores"][i].tolist(),
+                "tie_breakers": result["tie_breakers"][i].tolist(),
+                "winner": int(result["winner"][i]),
+                "length": int(result["lengths"][i]),
+                "decisions": int(result["decisions"][i]),
+            }
+            self.file.write(json.dumps(row) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class NpzWriter:
+    """Collects result columns per chunk and writes one array per column on close."""
+    def __init__(self, path):
+        self.path = path
+        self.chunks = {key: [] for key in COLUMNS}
+        self.policies = []
+
+    def write_chunk(self, policy_specs, result):
+        for key in COLUMNS:
+            self.chunks[key].append(result[key])
+        self.policies.append(np.array([policy_specs] * len(result["seeds"]), dtype=str))
+
+    def close(self):
+        columns = {key: np.concatenate(arrays) for key, arrays in self.chunks.items() if arrays}
+        if self.policies:
+            columns["policies"] = np.concatenate(self.policies)
+        np.savez(self.path, **columns)
+
+
+def run(args):
+    env_kwargs = {"mayor_mode": args.mayor_mode, "deck_mode": args.deck_mode}
+    tasks = make_tasks(args.games, args.chunk_size, args.seed, args.policies, env_kwargs,
+                       args.swap_seats, args.stats is not None, args.records)
+    if args.records:
+        os.makedirs(os.path.dirname(args.records) or ".", exist_ok=True)
+    writer = None
+    if args.out:
+        writer = NpzWriter(args.out) if args.out.endswith(".npz") else JsonlWriter(args.out)
+
+    stats = GameStatsAggregator()
+    busy_by_worker = {}
+    wins = np.zeros(3, dtype=np.int64)  # Seat 0, seat 1, tie
+    done = 0
+    start = time.perf_counter()
+    last_report = start
+
+    with Pool(args.workers) as pool:
+        for chunk_idx, specs, result, chunk_stats, pid, busy in pool.imap_unordered(_run_chunk, tasks):
+            done += len(result["seeds"])
+            if chunk_stats is not None:
+                stats.merge(chunk_stats)
+            busy_by_worker[pid] = busy_by_worker.get(pid, 0.0) + busy
+            wins += np.bincount(result["winner"] + 1, minlength=3)[[1, 2, 0]]
+            if writer is not None:
+                writer.write_chunk(specs, result)
+
+            now = time.perf_counter()
+            if now - last_report >= args.progress_every or done == args.games:
+                rate = done / (now - start)
+                eta = (args.games - done) / rate if rate > 0 else 0.0
+                print(f"[{done}/{args.games}] {rate:.1f} games/s, ETA {eta:.0f}s", flush=True)
+                last_report = now
+
+    elapsed = time.perf_counter() - start
+    if writer is not None:
+        writer.close()
+    if args.stats is not None:
+        with open(args.stats, "w") as f:
+            json.dump(stats.summary(), f, indent=2)
+
+    print(f"\n{args.games} games in {elapsed:.1f}s: {args.games / elapsed:.1f} games/s "
+          f"({args.games / elapsed * 3600:,.0f} games/hour)")
+    print(f"Seat 0 wins: {wins[0]}, Seat 1 wins: {wins[1]}, Ties: {wins[2]}")
+    print("Worker utilization:")
+    for pid, busy in sorted(busy_by_worker.items()):
+        print(f"  pid {pid}: {busy:.1f}s busy ({busy / elapsed:.0%})")
+    return elapsed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run many Puerto Rico games across a process pool")
+    parser.add_argument("--games", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--policies", nargs="+", default=["random"],
+                        help="One policy for both seats or one per seat: random, greedy, checkpoint:PATH")
+    parser.add_argument("--swap-seats", action="store_true", help="Swap seat order on every other chunk")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--mayor-mode", choices=["slot", "allocation"], default="slot")
+    parser.add_argument("--deck-mode", choices=["list", "counts"], default="list")
+    parser.add_argument("--out", default=None, help="Output file (.jsonl or .npz)")
+    parser.add_argument("--records", default=None,
+                        help="Write binary game records to PREFIX-cCHUNK-PART.prgr (replayable from the seed)")
+    parser.add_argument("--stats", default=None, help="Write aggregated game statistics (JSON) to this file")
+    parser.add_argument("--progress-every", type=float, default=5.0, help="Seconds between progress lines")
+    args = parser.parse_args(argv)
+    if len(args.policies) == 1:
+        args.policies = args.policies * 2
+    if len(args.policies) != 2:
+        parser.error("--policies takes one or two policies")
+    return args
+
+
+if __name__ == "__main__":
+    run(parse_args())
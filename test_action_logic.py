@@ -12,7 +12,7 @@ import puerto_rico_constants as c
 
 def test_action_logic():
     print("Initialize Environment...")
-    env = PuertoRicoEnv2P()
+    env = PuertoRicoEnv2P(validation="strict")
     obs, info = env.reset(seed=42)
     
     gs = env.game_state
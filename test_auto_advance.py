@@ -0,0 +1,71 @@
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+import puerto_rico_constants as c
+
+def test_auto_advance():
+    print("Initialize Environments...")
+    env_auto = PuertoRicoEnv2P(auto_advance=True, validation="strict")
+    env_plain = PuertoRicoEnv2P(validation="strict")
+
+    total_decisions = 0
+    total_skipped = 0
+    for seed in range(5):
+        rng = np.random.default_rng(seed)
+        _, info = env_auto.reset(seed=seed)
+        env_plain.reset(seed=seed)
+        skipped = info["auto_advanced"]
+        decisions = []
+
+        terminated = False
+        while not terminated:
+            legal = np.flatnonzero(env_auto.get_action_mask())
+            # Policy only ever sees real decisions
+            assert len(legal) > 1, f"Forced state exposed in phase {env_auto.game_state.phase}"
+            action = int(rng.choice(legal))
+            decisions.append(action)
+            _, _, terminated, _, info = env_auto.step(action)
+            assert info["auto_advanced"] == sum(info["auto_advanced_by_player"])
+            skipped += info["auto_advanced"]
+
+        # Replay decisions in the plain env, resolving forced moves by hand
+        plain_steps = 0
+        for action in decisions:
+            while True:
+                legal = np.flatnonzero(env_plain.get_action_mask())
+                if len(legal) != 1:
+                    break
+                env_plain.step(int(legal[0]))
+                plain_steps += 1
+            env_plain.step(action)
+            plain_steps += 1
+        while env_plain.game_state.phase != c.PHASE_GAME_END:
+            legal = np.flatnonzero(env_plain.get_action_mask())
+            assert len(legal) == 1
+            env_plain.step(int(legal[0]))
+            plain_steps += 1
+
+        print(f"Seed {seed}: {len(decisions)} decisions + {skipped} forced = {plain_steps} plain steps")
+        assert len(decisions) + skipped == plain_steps
+        assert env_auto._calculate_score() == env_plain._calculate_score()
+        total_decisions += len(decisions)
+        total_skipped += skipped
+
+    print(f"\nForced moves removed: {total_skipped / (total_decisions + total_skipped):.1%} of steps")
+
+    print("\nAll auto-advance tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_auto_advance()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,138 @@
+import copy
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+from puerto_rico_sim import random_policy
+from puerto_rico_batch import stack_states, calculate_scores_batch, action_masks_batch, get_action_masks, production_batch
+import puerto_rico_constants as c
+
+def collect_states(n_games, seed, every=7, mayor_mode="slot"):
+    """Snapshots of random-play games (every `every`-th ply and the final state)."""
+    env = PuertoRicoEnv2P(mayor_mode=mayor_mode)
+    rng = np.random.default_rng(seed)
+    states = []
+    for i in range(n_games):
+        env._new_game(seed + i)
+        ply = 0
+        while env.game_state.phase != c.PHASE_GAME_END:
+            if ply % every == 0:
+                states.append(copy.deepcopy(env.game_state))
+            env._apply_action(random_policy(env, env.legal_actions(), rng))
+            ply += 1
+        states.append(copy.deepcopy(env.game_state))
+    return states
+
+def randomize_tableaus(states, rng):
+    """Fill cities/islands at random so every large building bonus is exercised."""
+    for gs in states:
+        for p in gs.players:
+            for slot, b_id in zip(p.city, rng.permutation(c.NUM_BUILDINGS)[:rng.integers(13)]):
+                slot['building'] = int(b_id)
+                slot['workers'] = int(rng.integers(c.BUILDING_INFO[int(b_id)][2] + 1))
+            for slot in p.island[:rng.integers(13)]:
+                slot['tile'] = int(rng.integers(c.NUM_PLANTATION_TYPES))
+                slot['workers'] = int(rng.integers(2))
+            p.vp_chips = int(rng.integers(30))
+            p.san_juan_workers = int(rng.integers(5))
+    return states
+
+def assert_scores_match(states):
+    env = PuertoRicoEnv2P()
+    scores, tie_breakers = calculate_scores_batch(stack_states(states))
+    for i, gs in enumerate(states):
+        env.game_state = gs
+        expected_scores, expected_tie_breakers = env._calculate_score()
+        assert scores[i].tolist() == [expected_scores[0], expected_scores[1]], f"State {i}: scores differ"
+        assert tie_breakers[i].tolist() == [expected_tie_breakers[0], expected_tie_breakers[1]]
+
+def test_batch():
+    print("=== Test 1: Score parity on random-play states ===")
+    states = collect_states(4, seed=100)
+    assert_scores_match(states)
+    print(f"{len(states)} states match")
+
+    print("\n=== Test 2: Score parity with every large building occupied at random ===")
+    rng = np.random.default_rng(101)
+    states = randomize_tableaus(collect_states(2, seed=102, every=3), rng)
+    assert_scores_match(states)
+    batch = stack_states(states)
+    for b_id in range(c.BUILDING_GUILD_HALL, c.NUM_BUILDINGS):
+        occupied = ((batch["city_building"] == b_id) & (batch["city_workers"] > 0)).any(axis=-1)
+        assert occupied.any(), f"Building {b_id} never occupied in test states"
+    print(f"{len(states)} states match")
+
+    print("\n=== Test 3: Mask parity on every position of random games ===")
+    env = PuertoRicoEnv2P()
+    states = collect_states(6, seed=103, every=1)
+    masks = action_masks_batch(stack_states(states))
+    phases = set()
+    for i, gs in enumerate(states):
+        env.game_state = gs
+        assert np.array_equal(masks[i], env.get_action_mask()), f"State {i} (phase {gs.phase}): masks differ"
+        phases.add(gs.phase)
+    assert {c.PHASE_SETTLER, c.PHASE_MAYOR, c.PHASE_BUILDER, c.PHASE_TRADER,
+            c.PHASE_CAPTAIN, c.PHASE_ROTTING, c.PHASE_CRAFTSMAN} <= phases
+    print(f"{len(states)} states match")
+
+    print("\n=== Test 4: Mask parity with randomized tableaus (wharf, office, hut, hacienda) ===")
+    rng = np.random.default_rng(104)
+    states = randomize_tableaus(collect_states(3, seed=105, every=1), rng)
+    for gs in states:
+        for p in gs.players:
+            p.goods = [int(g) for g in rng.integers(3, size=c.NUM_GOODS)]
+            p.doubloons = int(rng.integers(12))
+    masks = action_masks_batch(stack_states(states))
+    for i, gs in enumerate(states):
+        env.game_state = gs
+        assert np.array_equal(masks[i], env.get_action_mask()), f"State {i} (phase {gs.phase}): masks differ"
+    print(f"{len(states)} states match")
+
+    print("\n=== Test 5: get_action_masks over allocation-mode envs ===")
+    states = collect_states(2, seed=106, every=1, mayor_mode="allocation")
+    envs = []
+    for gs in states:
+        env = PuertoRicoEnv2P(mayor_mode="allocation")
+        env.game_state = gs
+        envs.append(env)
+    masks = get_action_masks(envs)
+    assert masks.shape == (len(envs), c.NUM_ACTIONS + c.MAX_MAYOR_ALLOCATIONS)
+    for i, env in enumerate(envs):
+        assert np.array_equal(masks[i], env.get_action_mask())
+
+    print("\n=== Test 6: Scalar env vs batch production parity (incl. short supply and Factory) ===")
+    rng = np.random.default_rng(107)
+    states = randomize_tableaus(collect_states(4, seed=108, every=5)
+                                + collect_states(2, seed=109, every=5, mayor_mode="allocation"), rng)
+    for gs in states:
+        gs.supply_goods = [int(g) for g in rng.integers(5, size=c.NUM_GOODS)]
+    batch = stack_states(states)
+    produced, supply, bonus = production_batch(batch)
+    for i, gs in enumerate(states):
+        env.game_state = copy.deepcopy(gs)
+        env._execute_production()
+        after = env.game_state
+        assert supply[i].tolist() == after.supply_goods, f"State {i}: supply differs"
+        for p_idx, p in enumerate(after.players):
+            assert produced[i, p_idx].tolist() == p.last_produced_goods
+            assert (batch["goods"][i, p_idx] + produced[i, p_idx]).tolist() == p.goods
+            assert batch["doubloons"][i, p_idx] + bonus[i, p_idx] == p.doubloons
+    assert (supply == 0).any()
+    assert set(np.unique(bonus)) >= {0, 1, 2, 3}, "Factory bonus levels not exercised"
+    print(f"{len(states)} states match")
+
+    print("\nAll batch tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_batch()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
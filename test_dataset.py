@@ -0,0 +1,60 @@
+import numpy as np
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_sim import simulate, random_policy
+from puerto_rico_dataset import OfflineDataset, write_shard, main, _RecordList
+
+def test_dataset():
+    out_dir = tempfile.mkdtemp()
+
+    print("=== Test 1: Shard rows match played decisions ===")
+    recorder = _RecordList()
+    result = simulate(random_policy, 3, seed=90, recorder=recorder)
+    n_rows = write_shard(os.path.join(out_dir, "shard-00000"), recorder.records)
+    print(f"Rows: {n_rows}, decisions: {result['decisions'].sum()}")
+    assert n_rows == result["decisions"].sum()
+
+    dataset = OfflineDataset(out_dir)
+    assert len(dataset) == n_rows
+    assert isinstance(dataset.shards[0]["mask"], np.memmap)
+    rows = dataset.get(np.arange(n_rows))
+    assert (rows["mask"][np.arange(n_rows), rows["action"]] == 1).all(), "Stored action not legal"
+    assert (rows["mask"].sum(axis=1) > 1).all(), "Forced moves should be skipped"
+    assert (rows["obs"]["global"][:, 33] == 0).all(), "Observations must be canonical"
+    assert rows["obs"]["players"].dtype == np.int8
+    # Margin is from the acting player's point of view
+    scores = result["scores"][np.repeat(np.arange(3), result["decisions"])]
+    player = rows["player"]
+    assert np.array_equal(rows["margin"], scores[np.arange(n_rows), player] - scores[np.arange(n_rows), 1 - player])
+
+    print("\n=== Test 2: Parallel export and random access ===")
+    parallel_dir = os.path.join(out_dir, "parallel")
+    main(["--out", parallel_dir, "--games", "4", "--games-per-shard", "2", "--workers", "2", "--seed", "90"])
+    dataset = OfflineDataset(parallel_dir)
+    assert len(dataset.shards) == 2
+    everything = dataset.get(np.arange(len(dataset)))
+    indices = np.random.default_rng(91).integers(len(dataset), size=64)
+    batch = dataset.get(indices)
+    for name in ("mask", "action", "player", "winner", "margin"):
+        assert np.array_equal(batch[name], everything[name][indices]), f"Column {name} differs"
+    for key in batch["obs"]:
+        assert np.array_equal(batch["obs"][key], everything["obs"][key][indices])
+    sample = dataset.sample(32, np.random.default_rng(92))
+    assert sample["action"].shape == (32,)
+
+    print("\nAll dataset tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_dataset()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,91 @@
+import numpy as np
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+from puerto_rico_sim import simulate, random_policy
+from puerto_rico_records import GameRecordWriter, read_records, replay
+import puerto_rico_constants as c
+
+def plantation_totals(gs, deck_mode):
+    """Plantation tiles per type across deck, discards, market and islands."""
+    totals = np.zeros(c.NUM_PLANTATION_TYPES, dtype=int)
+    if deck_mode == "counts":
+        totals += gs.deck_counts
+        totals += gs.discard_counts
+    else:
+        for tile in gs.plantation_deck + gs.discarded_plantations:
+            totals[tile] += 1
+    for tile in gs.market_plantations:
+        totals[tile] += 1
+    for p in gs.players:
+        for slot in p.island:
+            if slot['tile'] != -1:
+                totals[slot['tile']] += 1
+    return totals[:c.PLANTATION_QUARRY]
+
+def test_deck_mode():
+    expected = np.zeros(c.PLANTATION_QUARRY, dtype=int)
+    for p_id, count in c.PLANTATION_COUNTS.items():
+        expected[p_id] = count
+
+    print("=== Test 1: Tiles are conserved through full games ===")
+    env = PuertoRicoEnv2P(validation="strict", deck_mode="counts")
+    rng = np.random.default_rng(120)
+    for seed in range(120, 124):
+        env.reset(seed=seed)
+        terminated = False
+        while not terminated:
+            gs = env.game_state
+            assert np.array_equal(plantation_totals(gs, "counts"), expected), "Plantation tiles not conserved"
+            assert gs.plantation_deck == [] and gs.discarded_plantations == []
+            _, _, terminated, _, _ = env.step(random_policy(env, env.legal_actions(), rng))
+    print("Conservation holds")
+
+    print("\n=== Test 2: Opening market has the same distribution as the shuffled deck ===")
+    n_games = 3000
+    freq = {}
+    for deck_mode in ("list", "counts"):
+        env = PuertoRicoEnv2P(deck_mode=deck_mode)
+        counts = np.zeros(c.PLANTATION_QUARRY)
+        for seed in range(n_games):
+            env._new_game(seed)
+            for tile in env.game_state.market_plantations:
+                counts[tile] += 1
+        freq[deck_mode] = counts / counts.sum()
+        print(f"{deck_mode}: {np.round(freq[deck_mode], 3)}")
+    # 9000 draws per mode: standard error per type is below 0.005
+    assert np.abs(freq["list"] - freq["counts"]).max() < 0.025, "Draw distributions differ"
+
+    print("\n=== Test 3: Records replay counts-mode games ===")
+    prefix = os.path.join(tempfile.mkdtemp(), "games")
+    with GameRecordWriter(prefix) as writer:
+        result = simulate(random_policy, 3, seed=130, env_kwargs={"deck_mode": "counts"}, recorder=writer)
+    for game_idx, record in enumerate(read_records(writer.paths)):
+        env = replay(record)
+        assert env.deck_mode == "counts"
+        final, _ = env._calculate_score()
+        assert [final[0], final[1]] == list(record.scores) == list(result["scores"][game_idx])
+
+    print("\n=== Test 4: Unknown deck_mode is rejected ===")
+    try:
+        PuertoRicoEnv2P(deck_mode="stack")
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+    print("\nAll deck mode tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_deck_mode()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
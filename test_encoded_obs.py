@@ -0,0 +1,80 @@
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+from puerto_rico_encoding import encode_observation
+import puerto_rico_constants as c
+
+def reference_encoding(gs):
+    # Slow per-slot encoding straight from the GameState
+    island = np.zeros((c.NUM_PLAYERS, 12, c.NUM_PLANTATION_TYPES), dtype=np.int8)
+    city = np.zeros((c.NUM_PLAYERS, 12, c.NUM_BUILDINGS), dtype=np.int8)
+    for p_idx, p in enumerate(gs.players):
+        for i, slot in enumerate(p.island):
+            if slot['tile'] != -1:
+                island[p_idx, i, slot['tile']] = 1
+        for i, slot in enumerate(p.city):
+            if slot['building'] != -1:
+                city[p_idx, i, slot['building']] = 1
+    ship_goods = np.zeros((2, c.NUM_GOODS), dtype=np.int8)
+    for s_idx, ship in enumerate(gs.ships):
+        if ship['good'] != -1:
+            ship_goods[s_idx, ship['good']] = 1
+    trading_house = np.zeros(c.NUM_GOODS, dtype=np.int8)
+    for g in gs.trading_house:
+        if g != -1:
+            trading_house[g] += 1
+    market = np.zeros((3, c.NUM_PLANTATION_TYPES), dtype=np.int8)
+    for i, tile in enumerate(gs.market_plantations):
+        market[i, tile] = 1
+    return island, city, ship_goods, trading_house, market
+
+def test_encoded_obs():
+    print("Initialize Encoded Environment...")
+    env = PuertoRicoEnv2P(obs_mode="encoded", validation="strict")
+    obs, _ = env.reset(seed=11)
+    assert env.observation_space.contains(obs)
+
+    print("\n=== Test 1: Planes match per-slot reference ===")
+    rng = np.random.default_rng(11)
+    history = []
+    terminated = False
+    while not terminated:
+        island, city, ship_goods, trading_house, market = reference_encoding(env.game_state)
+        assert np.array_equal(obs["island"], island)
+        assert np.array_equal(obs["city"], city)
+        assert np.array_equal(obs["buildings_owned"], city.sum(axis=1))
+        assert np.array_equal(obs["ship_goods"], ship_goods)
+        assert np.array_equal(obs["trading_house"], trading_house)
+        assert np.array_equal(obs["market"], market)
+        history.append(obs)
+
+        action = int(rng.choice(np.flatnonzero(env.get_action_mask())))
+        obs, _, terminated, _, _ = env.step(action)
+    print(f"Checked {len(history)} observations.")
+
+    print("\n=== Test 2: Batched encoding ===")
+    raw_keys = ["global", "players", "market_plantations"]
+    batch = {key: np.stack([o[key] for o in history]) for key in raw_keys}
+    encoded = encode_observation(batch)
+    for key in encoded:
+        expected = np.stack([o[key] for o in history])
+        assert np.array_equal(encoded[key], expected), f"Batch mismatch in '{key}'"
+    print(f"Batch island shape: {encoded['island'].shape}")
+    assert encoded["island"].shape == (len(history), c.NUM_PLAYERS, 12, c.NUM_PLANTATION_TYPES)
+
+    print("\nAll encoded observation tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_encoded_obs()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,71 @@
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+import puerto_rico_constants as c
+
+def test_engine_fixes():
+    print("=== Test 1: Settler advances the queue, Mayor is its own step ===")
+    env = PuertoRicoEnv2P(validation="strict")
+    env.reset(seed=400)
+    gs = env.game_state
+    selector = gs.current_player_idx
+    env.step(c.ACTION_CHOOSE_ROLE_SETTLER)
+    assert gs.phase == c.PHASE_SETTLER and gs.current_player_idx == selector
+    env.step(c.ACTION_SETTLER_TAKE_PLANTATION_0)
+    assert gs.phase == c.PHASE_SETTLER, "Settler ended after the selector"
+    assert gs.current_player_idx == 1 - selector, "Settler did not pass to the next player"
+    env.step(c.ACTION_SETTLER_TAKE_PLANTATION_0)
+    assert gs.phase == c.PHASE_ROLE_SELECTION
+    assert gs.current_player_idx == 1 - selector
+    env.step(c.ACTION_CHOOSE_ROLE_MAYOR)
+    assert gs.phase == c.PHASE_MAYOR
+    for _ in range(100):
+        if gs.phase != c.PHASE_MAYOR:
+            break
+        env.step(env.legal_actions()[0])
+    assert gs.phase == c.PHASE_ROLE_SELECTION, "Mayor phase never finished"
+
+    print("\n=== Test 2: Craftsman bonus with an exhausted supply allows PASS ===")
+    env.reset(seed=401)
+    gs = env.game_state
+    env.step(c.ACTION_CHOOSE_ROLE_CRAFTSMAN)
+    if gs.phase != c.PHASE_CRAFTSMAN:
+        # Nothing produced; force the bonus decision
+        gs.phase = c.PHASE_CRAFTSMAN
+    gs.players[gs.current_player_idx].last_produced_goods[c.CORN] = 1
+    gs.supply_goods = [0] * c.NUM_GOODS
+    assert env.legal_actions() == (c.ACTION_PASS,)
+    assert env.get_action_mask().sum() == 1
+    env.step(c.ACTION_PASS)
+    assert gs.phase == c.PHASE_ROLE_SELECTION
+
+    print("\n=== Test 3: step() reports terminated on the final transition ===")
+    rng = np.random.default_rng(402)
+    for seed in (402, 403):
+        env.reset(seed=seed)
+        terminated = False
+        steps = 0
+        while not terminated:
+            assert env.game_state.phase != c.PHASE_GAME_END, "Game ended without terminated"
+            legal = env.legal_actions()
+            _, _, terminated, _, _ = env.step(legal[rng.integers(len(legal))])
+            steps += 1
+        assert env.game_state.phase == c.PHASE_GAME_END
+        print(f"seed {seed}: terminated after {steps} steps")
+
+    print("\nAll engine fix tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_engine_fixes()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
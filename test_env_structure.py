@@ -12,7 +12,7 @@ import puerto_rico_constants as c
 
 def test_env():
     print("Initialize Environment...")
-    env = PuertoRicoEnv2P()
+    env = PuertoRicoEnv2P(validation="strict")
     
     print("Resetting Environment...")
     obs, info = env.reset()
@@ -0,0 +1,80 @@
+import numpy as np
+import sys
+import os
+import copy
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+from puerto_rico_sim import random_policy
+from puerto_rico_stats import GameStatsAggregator
+import puerto_rico_constants as c
+
+def test_expand():
+    print("=== Test 1: expand() matches stepping copies ===")
+    rng = np.random.default_rng(210)
+    checked = 0
+    for deck_mode in ("list", "counts"):
+        env = PuertoRicoEnv2P(validation="strict", deck_mode=deck_mode)
+        env.stats = GameStatsAggregator()
+        twin = PuertoRicoEnv2P(deck_mode=deck_mode)
+        for seed in range(210, 212):
+            env.reset(seed=seed)
+            terminated = False
+            while not terminated:
+                gs = env.game_state
+                legal = env.legal_actions()
+                before = gs.to_bytes()
+                role_picks = env.stats.role_picks.copy()
+                result = env.expand()
+                assert env.game_state is gs and gs.to_bytes() == before, "expand() changed the state"
+                assert np.array_equal(env.stats.role_picks, role_picks), "expand() reached the stats hooks"
+                assert list(result["actions"]) == list(legal)
+                base, _ = env._calculate_score()
+                for i, action in enumerate(legal):
+                    twin.game_state = copy.deepcopy(gs)
+                    obs, _, twin_terminated, _, _ = twin.step(action)
+                    for key in obs:
+                        assert np.array_equal(result["obs"][key][i], obs[key]), f"obs['{key}'] differs"
+                    assert np.array_equal(result["masks"][i], twin.get_action_mask())
+                    scores, _ = twin._calculate_score()
+                    assert list(result["score_delta"][i]) == [scores[0] - base[0], scores[1] - base[1]]
+                    assert result["terminated"][i] == twin_terminated
+                    assert result["next_player"][i] == twin.game_state.current_player_idx
+                checked += len(legal)
+                _, _, terminated, _, _ = env.step(random_policy(env, legal, rng))
+    print(f"Checked {checked} expanded actions")
+
+    print("\n=== Test 2: Pooled copies are reused ===")
+    env = PuertoRicoEnv2P()
+    env.reset(seed=220)
+    env.expand()
+    pool = list(env._expand_pool)
+    env.expand()
+    assert all(a is b for a, b in zip(env._expand_pool, pool))
+    assert len(env._expand_pool) == len(env.legal_actions())
+
+    print("\n=== Test 3: Children are resolved to decisions with auto_advance ===")
+    env = PuertoRicoEnv2P(auto_advance=True, mayor_mode="allocation")
+    env.reset(seed=230)
+    for _ in range(50):
+        result = env.expand(with_obs=False)
+        assert "obs" not in result
+        for mask, done in zip(result["masks"], result["terminated"]):
+            assert done or mask.sum() > 1
+        _, _, terminated, _, _ = env.step(random_policy(env, env.legal_actions(), rng))
+        if terminated:
+            break
+
+    print("\nAll expand tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_expand()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
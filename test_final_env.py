@@ -11,7 +11,7 @@ import puerto_rico_constants as c
 
 def test_final_env():
     print("Initialize Environment...")
-    env = PuertoRicoEnv2P()
+    env = PuertoRicoEnv2P(validation="strict")
     env.reset(seed=500) 
     gs = env.game_state
     
@@ -0,0 +1,51 @@
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P, legal_actions_batch
+import puerto_rico_constants as c
+
+def test_legal_actions():
+    print("Initialize Environments...")
+    for mayor_mode in ["slot", "allocation"]:
+        env = PuertoRicoEnv2P(mayor_mode=mayor_mode, validation="strict")
+        steps = 0
+        for seed in range(5):
+            rng = np.random.default_rng(seed)
+            env.reset(seed=seed)
+            terminated = False
+            while not terminated:
+                legal = env.legal_actions()
+                assert isinstance(legal, tuple)
+                assert legal == tuple(np.flatnonzero(env.get_action_mask())), f"Mismatch in phase {env.game_state.phase}"
+                _, _, terminated, _, _ = env.step(legal[rng.integers(len(legal))])
+                steps += 1
+        print(f"Mayor mode '{mayor_mode}': legal_actions matches mask over {steps} steps")
+
+    print("\n=== Batched Legal Actions ===")
+    envs = [PuertoRicoEnv2P() for _ in range(4)]
+    for i, env in enumerate(envs):
+        env.reset(seed=i)
+    # Move env 1 into the Settler phase
+    envs[1].step(c.ACTION_CHOOSE_ROLE_SETTLER)
+
+    actions, offsets = legal_actions_batch(envs)
+    print(f"Offsets: {offsets}")
+    assert len(offsets) == len(envs) + 1
+    for i, env in enumerate(envs):
+        assert tuple(actions[offsets[i]:offsets[i + 1]]) == env.legal_actions()
+
+    print("\nAll legal action tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_legal_actions()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
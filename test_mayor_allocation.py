@@ -0,0 +1,75 @@
+import copy
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+import puerto_rico_constants as c
+
+def test_mayor_allocation():
+    print("Initialize Allocation-Mode Environment...")
+    env = PuertoRicoEnv2P(mayor_mode="allocation", validation="strict")
+    slot_env = PuertoRicoEnv2P(validation="strict")
+    print(f"Action Space: {env.action_space.n} (Expected {c.NUM_ACTIONS + c.MAX_MAYOR_ALLOCATIONS})")
+    assert env.action_space.n == c.NUM_ACTIONS + c.MAX_MAYOR_ALLOCATIONS
+
+    checked = 0
+    for seed in range(3):
+        rng = np.random.default_rng(seed)
+        env.reset(seed=seed)
+        slot_env.reset(seed=seed)
+        terminated = False
+        while not terminated:
+            gs = env.game_state
+            mask = env.get_action_mask()
+            legal = np.flatnonzero(mask)
+
+            if gs.phase == c.PHASE_MAYOR:
+                # Only allocation actions in allocation mode
+                assert legal.min() >= c.ACTION_MAYOR_ALLOCATION_START
+                p_idx = gs.current_player_idx
+                before = copy.deepcopy(gs)
+                action = int(rng.choice(legal))
+                _, _, terminated, _, _ = env.step(action)
+                p_after = gs.players[p_idx]
+
+                # Same allocation must be reachable one slot at a time
+                slot_env.game_state = before
+                p_slot = before.players[p_idx]
+                placements = [c.ACTION_MAYOR_PLACE_PLANTATION_0 + i
+                              for i, s in enumerate(p_after.island) if s['workers'] > 0]
+                for i, s in enumerate(p_after.city):
+                    placements += [c.ACTION_MAYOR_PLACE_BUILDING_0 + i] * s['workers']
+                for placement in placements:
+                    assert slot_env.get_action_mask()[placement] == 1, "Allocation not reachable in slot mode"
+                    slot_env.step(placement)
+                # Nothing left to place: Pass is the only option
+                assert np.flatnonzero(slot_env.get_action_mask()).tolist() == [c.ACTION_PASS]
+                assert p_slot.island == p_after.island and p_slot.city == p_after.city
+                checked += 1
+            else:
+                action = int(rng.choice(legal))
+                _, _, terminated, _, _ = env.step(action)
+    print(f"Verified {checked} Mayor allocations against slot mode.")
+    assert checked > 0
+
+    print("\n=== Allocation Deduplication ===")
+    p = env.game_state.players[0]
+    allocations = env._mayor_allocations(p)
+    assert len(allocations) == len(set(allocations))
+    assert len(allocations) <= c.MAX_MAYOR_ALLOCATIONS
+
+    print("\nAll Mayor allocation tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_mayor_allocation()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,67 @@
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P, convert_obs_dtype
+import puerto_rico_constants as c
+
+def test_obs_dtype():
+    print("Initialize int32 and int8 Environments...")
+    env_full = PuertoRicoEnv2P()
+    env_compact = PuertoRicoEnv2P(obs_dtype=np.int8)
+
+    print(f"Compact Space dtype: {env_compact.observation_space['players'].dtype}")
+    assert env_compact.observation_space['players'].dtype == np.int8
+
+    print("\n=== Test 1: Random Game Parity ===")
+    rng = np.random.default_rng(7)
+    obs_full, _ = env_full.reset(seed=7)
+    obs_compact, _ = env_compact.reset(seed=7)
+    steps = 0
+    terminated = False
+    while not terminated:
+        for key in obs_full:
+            assert obs_compact[key].dtype == np.int8
+            assert np.array_equal(obs_compact[key], obs_full[key]), f"Mismatch in '{key}' at step {steps}"
+
+        mask = env_full.get_action_mask()
+        assert np.array_equal(mask, env_compact.get_action_mask())
+        action = int(rng.choice(np.flatnonzero(mask)))
+        obs_full, _, terminated, _, _ = env_full.step(action)
+        obs_compact, _, terminated_compact, _, _ = env_compact.step(action)
+        assert terminated == terminated_compact
+        steps += 1
+    print(f"Game finished in {steps} steps with identical observations.")
+
+    print("\n=== Test 2: Conversion Helper ===")
+    converted = convert_obs_dtype(obs_full, np.int16)
+    assert all(arr.dtype == np.int16 for arr in converted.values())
+
+    overflow = {"players": np.array([[c.OBS_HIGH, 300]], dtype=np.int32)}
+    try:
+        convert_obs_dtype(overflow, np.int8)
+        assert False, "Lossy conversion should raise"
+    except ValueError as e:
+        print(f"Lossy conversion rejected: {e}")
+
+    print("\n=== Test 3: Invalid dtype ===")
+    try:
+        PuertoRicoEnv2P(obs_dtype=np.uint8)
+        assert False, "uint8 cannot hold -1"
+    except ValueError as e:
+        print(f"Rejected: {e}")
+
+    print("\nAll obs dtype tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_obs_dtype()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
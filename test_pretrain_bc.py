@@ -0,0 +1,68 @@
+import numpy as np
+import sys
+import os
+import tempfile
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Needs the training stack (torch + sb3-contrib)
+pytest.importorskip("torch")
+pytest.importorskip("sb3_contrib")
+
+import torch as th
+from sb3_contrib import MaskablePPO
+from stable_baselines3.common.vec_env import DummyVecEnv
+from puerto_rico_sim import simulate, random_policy
+from puerto_rico_dataset import write_shard, _RecordList
+from pretrain_bc import BatchPrefetcher, pretrain, parse_args
+from train_ppo import make_env, make_model, PPO_KWARGS
+
+class FailingDataset:
+    def sample(self, batch_size, rng):
+        raise RuntimeError("broken shard")
+
+def test_pretrain_bc():
+    out_dir = tempfile.mkdtemp()
+    recorder = _RecordList()
+    simulate(random_policy, 2, seed=500, recorder=recorder)
+    write_shard(os.path.join(out_dir, "data", "shard-00000"), recorder.records)
+
+    print("=== Test 1: Pretraining runs and saves the training hyperparameters ===")
+    out = os.path.join(out_dir, "pretrained")
+    pretrain(parse_args(["--data", os.path.join(out_dir, "data"), "--out", out,
+                         "--steps", "4", "--batch-size", "16", "--log-every", "2"]))
+    saved = MaskablePPO.load(out)
+    for key in ("n_steps", "batch_size", "gamma", "gae_lambda", "ent_coef"):
+        assert getattr(saved, key) == PPO_KWARGS[key], f"{key} differs from PPO_KWARGS"
+
+    print("\n=== Test 2: Warm start keeps PPO_KWARGS and loads the parameters ===")
+    env = DummyVecEnv([make_env])
+    model = make_model(env, out + ".zip", n_steps=64, batch_size=32)
+    assert model.ent_coef == PPO_KWARGS["ent_coef"] and model.n_steps == 64
+    for (name, value), expected in zip(model.policy.state_dict().items(), saved.policy.state_dict().values()):
+        assert th.equal(value.cpu(), expected.cpu()), f"{name} was not loaded"
+    model.learn(total_timesteps=64)
+
+    print("\n=== Test 3: Prefetcher errors reach get() ===")
+    prefetcher = BatchPrefetcher(FailingDataset(), 16)
+    try:
+        prefetcher.get()
+        assert False, "Expected RuntimeError"
+    except RuntimeError as e:
+        assert "broken shard" in str(e)
+    finally:
+        prefetcher.close()
+
+    print("\nAll pretraining tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_pretrain_bc()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,92 @@
+import glob
+import numpy as np
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P, determine_winner
+from puerto_rico_sim import simulate, random_policy
+from puerto_rico_records import GameRecordWriter, read_records, replay, record_checkpoints, env_flags, MAGIC
+import puerto_rico_constants as c
+
+def test_records():
+    tmp_dir = tempfile.mkdtemp()
+
+    print("=== Test 1: Simulated games replay from their records ===")
+    for mayor_mode in ("slot", "allocation"):
+        prefix = os.path.join(tmp_dir, mayor_mode)
+        with GameRecordWriter(prefix) as writer:
+            result = simulate(random_policy, 4, seed=60, env_kwargs={"mayor_mode": mayor_mode}, recorder=writer)
+        records = list(read_records(writer.paths))
+        size = os.path.getsize(writer.paths[0])
+        print(f"{mayor_mode}: {len(records)} records, {size} bytes ({size / len(records):.0f} B/game)")
+        assert len(records) == 4
+        for i, record in enumerate(records):
+            assert record.seed == result["seeds"][i]
+            assert len(record.actions) == result["lengths"][i]
+            assert list(record.scores) == result["scores"][i].tolist()
+            assert record.winner == result["winner"][i]
+            env = replay(record)
+            assert env.mayor_mode == mayor_mode
+            assert env.game_state.phase == c.PHASE_GAME_END
+            scores, tie_breakers = env._calculate_score()
+            assert (scores[0], scores[1]) == record.scores
+            assert (tie_breakers[0], tie_breakers[1]) == record.tie_breakers
+
+    print("\n=== Test 2: Interleaved games in one process ===")
+    envs = [PuertoRicoEnv2P(validation="strict") for _ in range(3)]
+    rng = np.random.default_rng(61)
+    prefix = os.path.join(tmp_dir, "interleaved")
+    with GameRecordWriter(prefix, checkpoint_every=40) as writer:
+        for key, env in enumerate(envs):
+            env.reset(seed=1000 + key)
+            writer.start(key, 1000 + key, env_flags(env))
+        active = list(range(len(envs)))
+        while active:
+            key = active[rng.integers(len(active))]
+            env = envs[key]
+            action = random_policy(env, env.legal_actions(), rng)
+            _, _, terminated, _, _ = env.step(action)
+            writer.record(key, action, env.game_state)
+            if terminated:
+                scores, tie_breakers = env._calculate_score()
+                writer.finish(key, scores, tie_breakers, determine_winner(scores, tie_breakers))
+                active.remove(key)
+    records = sorted(read_records(writer.paths), key=lambda r: r.seed)
+    for key, record in enumerate(records):
+        final = replay(record).game_state
+        expected = envs[key].game_state
+        assert record.seed == 1000 + key
+        assert [p.vp_chips for p in final.players] == [p.vp_chips for p in expected.players]
+        assert [p.city for p in final.players] == [p.city for p in expected.players]
+        assert [p.island for p in final.players] == [p.island for p in expected.players]
+        # Checkpoints taken from record(state=...) match a replay of the record
+        assert record.checkpoint_every == 40 and len(record.checkpoints) == len(record.actions) // 40
+        assert list(record.checkpoints) == record_checkpoints(record.seed, record.flags, record.actions, 40)
+
+    print("\n=== Test 3: Size-based rotation ===")
+    prefix = os.path.join(tmp_dir, "rotated")
+    with GameRecordWriter(prefix, max_bytes=600, buffer_size=1) as writer:
+        simulate(random_policy, 6, seed=70, recorder=writer)
+    paths = sorted(glob.glob(prefix + "-*.prgr"))
+    print(f"Parts: {len(paths)}")
+    assert paths == writer.paths and len(paths) > 1
+    for path in paths:
+        with open(path, "rb") as f:
+            assert f.read(len(MAGIC)) == MAGIC
+    assert [r.seed for r in read_records(paths)] == list(range(70, 76))
+
+    print("\nAll record tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_records()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
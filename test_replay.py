@@ -0,0 +1,119 @@
+import numpy as np
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+from puerto_rico_sim import simulate, random_policy
+from puerto_rico_records import GameRecordWriter, GameReplay, read_records, record_checkpoints
+
+def assert_same_position(env, expected_env):
+    obs, expected = env._get_obs(), expected_env._get_obs()
+    for key in expected:
+        assert np.array_equal(obs[key], expected[key]), f"obs['{key}'] differs"
+    assert np.array_equal(env.get_action_mask(), expected_env.get_action_mask())
+    assert env.game_state.plantation_deck == expected_env.game_state.plantation_deck
+
+def counting_env(record):
+    """Env whose _apply_action calls are appended to env.applied."""
+    env = PuertoRicoEnv2P()
+    env.applied = []
+    apply_action = env._apply_action
+    env._apply_action = lambda action: env.applied.append(action) or apply_action(action)
+    return env
+
+def test_replay():
+    tmp_dir = tempfile.mkdtemp()
+    prefix = os.path.join(tmp_dir, "games")
+    with GameRecordWriter(prefix) as writer:
+        simulate(random_policy, 2, seed=80, recorder=writer)
+    record = next(read_records(writer.paths))
+    prefix = os.path.join(tmp_dir, "checkpointed")
+    with GameRecordWriter(prefix, checkpoint_every=32) as writer:
+        simulate(random_policy, 2, seed=80, recorder=writer)
+    stored = next(read_records(writer.paths))
+    assert stored[:6] == record[:6] and stored.checkpoint_every == 32
+    assert list(stored.checkpoints) == record_checkpoints(record.seed, record.flags, record.actions, 32)
+
+    print("=== Test 1: positions() matches stepping a fresh env ===")
+    replay = GameReplay(record, checkpoint_every=16)
+    env = PuertoRicoEnv2P(validation="strict")
+    env.reset(seed=record.seed)
+    n = 0
+    for position in replay.positions():
+        assert position["ply"] == n
+        assert position["player"] == env.game_state.current_player_idx
+        scores, _ = env._calculate_score()
+        assert position["scores"] == [scores[0], scores[1]]
+        assert np.array_equal(position["mask"], env.get_action_mask())
+        assert np.array_equal(position["obs"]["players"], env._get_obs()["players"])
+        if position["action"] != -1:
+            assert position["mask"][position["action"]] == 1
+            env.step(position["action"])
+        n += 1
+    assert n == len(replay) == len(record.actions) + 1
+    print(f"{n} positions, {len(replay._checkpoints)} checkpoints")
+
+    print("\n=== Test 2: Random seeks (forward and backward) ===")
+    replay = GameReplay(record, checkpoint_every=16)
+    rng = np.random.default_rng(81)
+    for ply in list(rng.integers(len(replay), size=20)) + [len(replay) - 1, 0, 5]:
+        ply = int(ply)
+        expected_env = PuertoRicoEnv2P()
+        expected_env._new_game(record.seed)
+        for action in record.actions[:ply]:
+            expected_env._apply_action(action)
+        assert_same_position(replay.seek(ply), expected_env)
+        assert replay.ply == ply
+
+    print("\n=== Test 3: Stored checkpoints: construction + cold seek apply < checkpoint_every actions ===")
+    for ply in (len(replay) - 1, len(replay) // 2, 31, 32):
+        env = counting_env(stored)
+        cold = GameReplay(stored, env=env)
+        assert len(cold._checkpoints) == (len(cold) + 31) // 32
+        assert_same_position(cold.seek(ply), replay.seek(ply))
+        assert len(env.applied) == ply % 32, f"Construction + seek({ply}) applied {len(env.applied)} actions"
+        # Seeking back past the current position restores a checkpoint too
+        env.applied.clear()
+        cold.seek(max(ply - 40, 0))
+        assert len(env.applied) < 32
+    try:
+        GameReplay(stored, checkpoint_every=16)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+    print("\n=== Test 4: Without stored checkpoints they are taken on the first pass ===")
+    env = counting_env(record)
+    lazy = GameReplay(record, checkpoint_every=32, env=env)
+    assert len(env.applied) == 0
+    lazy.seek(len(lazy) - 1)
+    assert len(env.applied) == len(record.actions)
+    assert lazy._checkpoints[1:] == list(stored.checkpoints)
+    env.applied.clear()
+    lazy.seek(len(lazy) // 2)
+    assert len(env.applied) == (len(lazy) // 2) % 32
+
+    print("\n=== Test 5: Partial ranges and bounds ===")
+    plies = [p["ply"] for p in replay.positions(100, 110)]
+    assert plies == list(range(100, 110))
+    try:
+        replay.seek(len(replay))
+        assert False, "Expected IndexError"
+    except IndexError:
+        pass
+
+    print("\nAll replay tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_replay()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
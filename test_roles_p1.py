@@ -11,7 +11,7 @@ import puerto_rico_constants as c
 
 def test_roles():
     print("Initialize Environment...")
-    env = PuertoRicoEnv2P()
+    env = PuertoRicoEnv2P(validation="strict")
     env.reset(seed=100) # Seed 100 for predictable logic
     gs = env.game_state
     
@@ -0,0 +1,73 @@
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P, ship_targets
+from puerto_rico_sim import random_policy
+import puerto_rico_constants as c
+
+def can_ship(ships, g_id):
+    """Reference rule: a ship carrying the good with room, or an empty ship if no ship carries it."""
+    for ship in ships:
+        if ship['good'] == g_id and ship['count'] < ship['capacity']:
+            return True
+    return (not any(ship['good'] == g_id for ship in ships)
+            and any(ship['count'] == 0 for ship in ships))
+
+def test_ship_targets():
+    print("=== Test 1: Table stays in sync during play ===")
+    env = PuertoRicoEnv2P(validation="strict")
+    rng = np.random.default_rng(110)
+    captain_states = 0
+    for seed in range(110, 114):
+        env.reset(seed=seed)
+        terminated = False
+        while not terminated:
+            gs = env.game_state
+            assert gs.ship_targets == ship_targets(gs.ships), "Stale shipping table"
+            if gs.phase == c.PHASE_CAPTAIN:
+                captain_states += 1
+                legal = env.legal_actions()
+                p = gs.players[gs.current_player_idx]
+                for g_id in range(c.NUM_GOODS):
+                    expected = p.goods[g_id] > 0 and can_ship(gs.ships, g_id)
+                    assert (c.ACTION_SHIP_CORN + g_id in legal) == expected
+            _, _, terminated, _, _ = env.step(random_policy(env, env.legal_actions(), rng))
+    print(f"Checked {captain_states} captain states")
+    assert captain_states > 0
+
+    print("\n=== Test 2: Every ship configuration ===")
+    configs = 0
+    for good0 in range(-1, c.NUM_GOODS):
+        for good1 in range(-1, c.NUM_GOODS):
+            if good0 == good1 != -1:
+                continue
+            for count0 in ([0] if good0 == -1 else range(1, 5)):
+                for count1 in ([0] if good1 == -1 else range(1, 7)):
+                    ships = [{'good': good0, 'count': count0, 'capacity': 4},
+                             {'good': good1, 'count': count1, 'capacity': 6}]
+                    table = ship_targets(ships)
+                    for g_id in range(c.NUM_GOODS):
+                        s_idx, space = table[g_id]
+                        assert (s_idx != -1) == can_ship(ships, g_id)
+                        if s_idx != -1:
+                            ship = ships[s_idx]
+                            assert ship['good'] in (-1, g_id)
+                            assert space == ship['capacity'] - ship['count'] > 0
+                    configs += 1
+    print(f"Checked {configs} configurations")
+
+    print("\nAll ship table tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_ship_targets()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
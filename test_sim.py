@@ -0,0 +1,76 @@
+import numpy as np
+import sys
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P, determine_winner
+from puerto_rico_sim import simulate, random_policy, make_policy, greedy_policy
+import run_simulations
+import puerto_rico_constants as c
+
+def test_sim():
+    print("=== Test 1: Headless results match env.step play ===")
+    n_games = 5
+    result = simulate(random_policy, n_games, seed=30)
+    print(f"Scores: {result['scores'].tolist()}")
+    print(f"Lengths: {result['lengths'].tolist()}")
+
+    env = PuertoRicoEnv2P(validation="strict")
+    rng = np.random.default_rng(30)
+    for i in range(n_games):
+        env.reset(seed=30 + i)
+        length = 0
+        terminated = False
+        while not terminated:
+            legal = env.legal_actions()
+            action = legal[0] if len(legal) == 1 else random_policy(env, legal, rng)
+            _, _, terminated, _, _ = env.step(action)
+            length += 1
+        scores, tie_breakers = env._calculate_score()
+        assert result["lengths"][i] == length
+        assert result["scores"][i].tolist() == [scores[0], scores[1]]
+        assert result["tie_breakers"][i].tolist() == [tie_breakers[0], tie_breakers[1]]
+        assert result["winner"][i] == determine_winner(scores, tie_breakers)
+    assert (result["decisions"] < result["lengths"]).all()
+
+    print("\n=== Test 2: Process pool ===")
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(simulate, random_policy, 2, seed=30 + 2 * k) for k in range(2)]
+        pooled = [f.result() for f in futures]
+    for k, r in enumerate(pooled):
+        local = simulate(random_policy, 2, seed=30 + 2 * k)
+        assert np.array_equal(r["scores"], local["scores"])
+        assert np.array_equal(r["lengths"], local["lengths"])
+    print("Pooled results match single-process results.")
+
+    print("\n=== Test 3: Runner results do not depend on worker count ===")
+    tmp_dir = tempfile.mkdtemp()
+    columns = []
+    for workers in (1, 2):
+        out = os.path.join(tmp_dir, f"w{workers}.npz")
+        args = run_simulations.parse_args(["--games", "6", "--workers", str(workers), "--chunk-size", "2",
+                                           "--swap-seats", "--out", out])
+        run_simulations.run(args)
+        data = np.load(out)
+        order = np.argsort(data["seeds"])
+        columns.append({key: data[key][order] for key in data.files})
+    for key in columns[0]:
+        assert np.array_equal(columns[0][key], columns[1][key]), f"Column {key} differs"
+    assert make_policy("greedy") is greedy_policy
+    print("Runner output is identical for 1 and 2 workers.")
+
+    print("\nAll simulator tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_sim()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,105 @@
+import numpy as np
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+from puerto_rico_sim import random_policy
+from puerto_rico_solver import EndgameSolver, search_state
+import puerto_rico_constants as c
+
+def play_until(env, rng, condition):
+    """Random play until `condition(gs)` holds at a decision; False if the game ended first."""
+    gs = env.game_state
+    while gs.phase != c.PHASE_GAME_END:
+        legal = env.legal_actions()
+        if len(legal) > 1 and condition(gs):
+            return True
+        env._apply_action(random_policy(env, legal, rng))
+    return False
+
+def expectimax(solver, gs, data):
+    """Reference value: full tree, no pruning, no table."""
+    if gs.phase == c.PHASE_GAME_END:
+        return solver._margin(gs)
+    solver._env.game_state = gs
+    values = []
+    for action in solver._env.legal_actions():
+        values.append(sum(prob * expectimax(solver, child, child_data)
+                          for prob, child, child_data in solver._outcomes(data, action)))
+    solver._env.game_state = gs
+    return max(values) if gs.current_player_idx == solver.root_player else min(values)
+
+def test_solver():
+    rng = np.random.default_rng(170)
+
+    print("=== Test 1: Proven values match full expectimax ===")
+    env = PuertoRicoEnv2P()
+    solver = EndgameSolver(time_budget=10.0)
+    checked = 0
+    for seed in range(170, 177):
+        env.reset(seed=seed)
+        if not play_until(env, rng, lambda gs: gs.game_end_triggered and gs.roles_taken_count == 5):
+            continue
+        before = env.game_state.to_bytes()
+        result = solver.solve(env)
+        assert env.game_state.to_bytes() == before, "solve() modified the env"
+        assert result.proven, "Last role of the final round should be solved"
+        assert result.action in env.legal_actions()
+        root = search_state(env)
+        expected = expectimax(solver, root, root.to_bytes())
+        assert abs(result.value - expected) < 1e-9, f"Solver {result.value} != expectimax {expected}"
+        # The reported move achieves the value
+        outcomes = solver._outcomes(root.to_bytes(), result.action)
+        move_value = sum(prob * expectimax(solver, child, child_data) for prob, child, child_data in outcomes)
+        assert abs(move_value - expected) < 1e-9
+        print(f"seed {seed}: value {result.value:+.2f}, action {result.action}, {result.nodes} nodes")
+        checked += 1
+    assert checked >= 3
+
+    print("\n=== Test 2: Plantation draws are chance nodes ===")
+    env = PuertoRicoEnv2P(deck_mode="counts")
+    env.reset(seed=190)
+    solver = EndgameSolver()
+    solver.solve(env, time_budget=0.0)  # Sets up the search env
+    found = False
+    while not found and env.game_state.phase != c.PHASE_GAME_END:
+        legal = env.legal_actions()
+        root = search_state(env)
+        for action in legal:
+            outcomes = solver._outcomes(root.to_bytes(), action)
+            if len(outcomes) > 1:
+                assert abs(sum(prob for prob, _, _ in outcomes) - 1.0) < 1e-9
+                markets = {tuple(child.market_plantations) for _, child, _ in outcomes}
+                assert len(markets) == len(outcomes), "Each outcome is a different draw"
+                print(f"{len(outcomes)} outcomes after action {action}")
+                found = True
+                break
+        env._apply_action(random_policy(env, legal, rng))
+    assert found
+
+    print("\n=== Test 3: Time budget on an early position ===")
+    env = PuertoRicoEnv2P()
+    env.reset(seed=200)
+    start = time.perf_counter()
+    result = EndgameSolver(time_budget=0.2).solve(env)
+    elapsed = time.perf_counter() - start
+    print(f"depth {result.depth}, {result.nodes} nodes in {elapsed:.2f}s")
+    assert not result.proven
+    assert result.action in env.legal_actions()
+    assert elapsed < 2.0
+
+    print("\nAll solver tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_solver()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
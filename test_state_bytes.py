@@ -0,0 +1,90 @@
+import numpy as np
+import sys
+import os
+import copy
+import pickle
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P, GameState
+from puerto_rico_sim import random_policy
+
+def state_fields(gs):
+    """Comparable view of a GameState (players and RNG position included)."""
+    fields = {k: v for k, v in vars(gs).items() if k not in ('players', '_rng', '_packed_rng')}
+    fields['players'] = [vars(p) for p in gs.players]
+    fields['rng'] = gs.rng.bit_generator.state if gs.rng is not None else None
+    return fields
+
+def test_state_bytes():
+    print("=== Test 1: Initial state round-trips ===")
+    env = PuertoRicoEnv2P()
+    env.reset(seed=130)
+    gs = env.game_state
+    data = gs.to_bytes()
+    packed_size = len(data)
+    assert state_fields(GameState.from_bytes(data)) == state_fields(gs)
+    print(f"Packed size: {packed_size} bytes (pickled attributes: {len(pickle.dumps(vars(gs)))} bytes)")
+    assert packed_size < 256
+    try:
+        GameState().to_bytes()
+        assert False, "Expected ValueError for a state without players"
+    except ValueError:
+        pass
+
+    print("\n=== Test 2: Round-trip fuzz over random games ===")
+    rng = np.random.default_rng(140)
+    checked = 0
+    for deck_mode in ("list", "counts"):
+        env = PuertoRicoEnv2P(validation="strict", deck_mode=deck_mode)
+        for seed in range(140, 146):
+            env.reset(seed=seed)
+            terminated = False
+            while not terminated:
+                gs = env.game_state
+                data = gs.to_bytes()
+                assert len(data) == packed_size, "Packed size is not fixed"
+                restored = GameState.from_bytes(data)
+                assert restored.to_bytes() == data
+                assert state_fields(restored) == state_fields(gs), "Round-trip changed the state"
+                checked += 1
+                _, _, terminated, _, _ = env.step(random_policy(env, env.legal_actions(), rng))
+    print(f"Checked {checked} states")
+
+    print("\n=== Test 3: Restored states continue the same game ===")
+    for deck_mode in ("list", "counts"):
+        env = PuertoRicoEnv2P(validation="strict", deck_mode=deck_mode)
+        twin = PuertoRicoEnv2P(validation="strict", deck_mode=deck_mode)
+        env.reset(seed=150)
+        terminated = False
+        while not terminated:
+            # Hand the twin a pickled copy every step; draws must match (RNG position travels too)
+            twin.game_state = pickle.loads(pickle.dumps(env.game_state))
+            action = random_policy(env, env.legal_actions(), rng)
+            obs, _, terminated, _, _ = env.step(action)
+            twin_obs, _, twin_terminated, _, _ = twin.step(action)
+            for key in obs:
+                assert np.array_equal(obs[key], twin_obs[key]), f"obs['{key}'] diverged"
+            assert terminated == twin_terminated
+
+    print("\n=== Test 4: deepcopy is independent of the original ===")
+    env = PuertoRicoEnv2P()
+    env.reset(seed=160)
+    copied = copy.deepcopy(env.game_state)
+    copied.players[0].goods[0] += 1
+    copied.rng.integers(10)
+    assert env.game_state.players[0].goods[0] == copied.players[0].goods[0] - 1
+    assert env.game_state.rng.bit_generator.state != copied.rng.bit_generator.state
+
+    print("\nAll state packing tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_state_bytes()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
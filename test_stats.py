@@ -0,0 +1,67 @@
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+from puerto_rico_sim import simulate, random_policy
+from puerto_rico_stats import GameStatsAggregator
+import puerto_rico_constants as c
+
+def test_stats():
+    print("=== Test 1: Counters agree with game results ===")
+    stats = GameStatsAggregator()
+    result = simulate(random_policy, 10, seed=50, stats=stats)
+    summary = stats.summary()
+    print(f"Summary: {summary}")
+    assert stats.games == 10
+    assert stats.rounds.sum() == 10
+    # Every VP comes from shipping or buildings
+    assert np.array_equal(stats.shipping_vp + stats.building_vp, result["scores"].sum(axis=0))
+    # 6 roles per completed round
+    n_rounds = np.arange(stats.rounds.size) @ stats.rounds
+    assert stats.role_picks.sum() == 6 * n_rounds
+    # Every game ended through at least one trigger
+    assert stats.end_triggers.sum() >= 10
+    margins = result["scores"][:, 0] - result["scores"][:, 1]
+    assert np.isclose(summary["mean_margin"], margins.mean())
+
+    print("\n=== Test 2: Merge equals single pass ===")
+    first, second, both = GameStatsAggregator(), GameStatsAggregator(), GameStatsAggregator()
+    simulate(random_policy, 5, seed=50, stats=first)
+    simulate(random_policy, 5, seed=55, stats=second)
+    simulate(random_policy, 5, seed=50, stats=both)
+    simulate(random_policy, 5, seed=55, stats=both)
+    merged = first.merge(second)
+    assert merged.games == 10
+    assert merged.summary() == both.summary()
+
+    print("\n=== Test 3: Hooks through env.step ===")
+    env = PuertoRicoEnv2P(validation="strict")
+    env.stats = GameStatsAggregator()
+    env.reset(seed=50)
+    rng = np.random.default_rng(50)
+    terminated = False
+    while not terminated:
+        legal = env.legal_actions()
+        action = legal[0] if len(legal) == 1 else random_policy(env, legal, rng)
+        _, _, terminated, _, _ = env.step(action)
+    assert env.stats.games == 1
+    assert env.stats.shipping_vp.tolist() == [p.vp_chips for p in env.game_state.players]
+    built = sum(1 for p in env.game_state.players for s in p.city if s['building'] != -1)
+    assert env.stats.building_purchases.sum() == built
+    assert env.game_state.phase == c.PHASE_GAME_END
+
+    print("\nAll stats tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_stats()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,62 @@
+import numpy as np
+import sys
+import os
+import pickle
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+from puerto_rico_wrappers import PuertoRicoSelfPlayWrapper, ActionMaskWrapper, PuertoRicoTrainingWrapper, outcome_reward
+from puerto_rico_vector import sample_masked_actions
+
+def test_training_wrapper():
+    print("=== Test 1: Fused wrapper matches the wrapper stack ===")
+    for env_kwargs in ({}, {"auto_advance": True, "mayor_mode": "allocation"}):
+        stack = ActionMaskWrapper(PuertoRicoSelfPlayWrapper(PuertoRicoEnv2P(**env_kwargs)))
+        fused = PuertoRicoTrainingWrapper(PuertoRicoEnv2P(**env_kwargs))
+        rng = np.random.default_rng(320)
+        for seed in (320, 321):
+            obs_a, _ = stack.reset(seed=seed)
+            obs_b, _ = fused.reset(seed=seed)
+            terminated = False
+            total, length = 0.0, 0
+            while not terminated:
+                for key in obs_a:
+                    assert np.array_equal(obs_a[key], obs_b[key]), f"obs['{key}'] differs"
+                mask = stack.action_masks()
+                assert np.array_equal(mask, fused.action_masks())
+                action = int(sample_masked_actions(mask[None], rng)[0])
+                obs_a, reward_a, terminated, _, info_a = stack.step(action)
+                obs_b, reward_b, terminated_b, _, info_b = fused.step(action)
+                assert reward_a == reward_b and terminated == terminated_b
+                total += reward_b
+                length += 1
+                assert ("episode" in info_b) == terminated
+            assert info_a["winner"] == info_b["winner"] and info_a["scores"] == info_b["scores"]
+            assert info_b["episode"]["l"] == length
+            assert abs(info_b["episode"]["r"] - total) < 1e-6
+            print(f"{env_kwargs} seed {seed}: {length} steps, return {total:+.2f}")
+
+    print("\n=== Test 2: Picklable ===")
+    fused = PuertoRicoTrainingWrapper(PuertoRicoEnv2P())
+    fused.reset(seed=330)
+    copy = pickle.loads(pickle.dumps(fused))
+    assert np.array_equal(copy.action_masks(), fused.action_masks())
+    assert copy.unwrapped.game_state.to_bytes() == fused.unwrapped.game_state.to_bytes()
+
+    print("\n=== Test 3: Terminal rewards (shared with pretrain_bc) ===")
+    assert list(outcome_reward(np.array([0, 1, -1]), 0)) == [1.0, -1.0, 0.0]
+    assert list(outcome_reward(np.array([0, 1, -1]), np.array([1, 1, 1]))) == [-1.0, 1.0, 0.0]
+
+    print("\nAll training wrapper tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_training_wrapper()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,64 @@
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from puerto_rico_env import PuertoRicoEnv2P
+import puerto_rico_constants as c
+
+def test_validation():
+    print("=== Test 1: Strict mode raises with context ===")
+    env = PuertoRicoEnv2P(validation="strict")
+    env.reset(seed=1)
+    # Role selection: Pass is not a legal action
+    try:
+        env.step(c.ACTION_PASS)
+        assert False, "Illegal action should raise"
+    except ValueError as e:
+        print(f"Raised: {e}")
+        assert f"phase {c.PHASE_ROLE_SELECTION}" in str(e)
+        assert "player 0" in str(e)
+    # State untouched by rejected action
+    assert env.game_state.phase == c.PHASE_ROLE_SELECTION
+    assert env.game_state.roles_taken_count == 0
+
+    print("\n=== Test 2: Fast mode skips validation ===")
+    env = PuertoRicoEnv2P(validation="fast")
+    env.reset(seed=1)
+    env.step(c.ACTION_CHOOSE_ROLE_PROSPECTOR)
+    # Prospector already taken: applied without a check
+    env.step(c.ACTION_CHOOSE_ROLE_PROSPECTOR)
+    print("Illegal action accepted in fast mode.")
+
+    print("\n=== Test 3: Sampled mode checks every Nth step ===")
+    env = PuertoRicoEnv2P(validation="sampled", validation_interval=2)
+    env.reset(seed=1)
+    env.step(c.ACTION_CHOOSE_ROLE_PROSPECTOR)   # Step 0: checked, legal
+    env.step(c.ACTION_CHOOSE_ROLE_PROSPECTOR)   # Step 1: not checked
+    try:
+        env.step(c.ACTION_CHOOSE_ROLE_PROSPECTOR)  # Step 2: checked, illegal
+        assert False, "Sampled step should raise"
+    except ValueError as e:
+        print(f"Raised on sampled step: {e}")
+
+    print("\n=== Test 4: Invalid configuration ===")
+    for kwargs in [dict(validation="paranoid"), dict(validation="sampled", validation_interval=0)]:
+        try:
+            PuertoRicoEnv2P(**kwargs)
+            assert False, f"{kwargs} should be rejected"
+        except ValueError as e:
+            print(f"Rejected: {e}")
+
+    print("\nAll validation tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_validation()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,73 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Needs stable-baselines3 / sb3-contrib
+pytest.importorskip("sb3_contrib")
+
+from sb3_contrib import MaskablePPO
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+from puerto_rico_env import PuertoRicoEnv2P
+from puerto_rico_wrappers import PuertoRicoTrainingWrapper
+from puerto_rico_vec_env import VecActionMaskWrapper
+from puerto_rico_vector import sample_masked_actions
+
+def make_masked_env():
+    return PuertoRicoTrainingWrapper(PuertoRicoEnv2P(info_action_mask=True))
+
+def make_env():
+    return PuertoRicoTrainingWrapper(PuertoRicoEnv2P())
+
+def test_vec_env_masks():
+    print("=== Test 1: Masks match the workers after steps and autoresets ===")
+    env = VecActionMaskWrapper(SubprocVecEnv([make_masked_env] * 2))
+    try:
+        env.seed(510)
+        env.reset()
+        rng = np.random.default_rng(510)
+        resets = 0
+        for _ in range(1500):
+            masks = env.action_masks()
+            # get_action_mask goes to the workers; action_masks is served locally
+            assert np.array_equal(masks, np.stack(env.env_method("get_action_mask")))
+            assert np.array_equal(np.stack(env.env_method("action_masks")), masks)
+            assert (masks.sum(axis=1) > 0).all(), "Terminal mask returned after autoreset"
+            _, _, dones, infos = env.step(sample_masked_actions(masks, rng))
+            resets += dones.sum()
+            if resets >= 2 and not dones.any():
+                break
+        print(f"{resets} autoresets")
+        assert resets >= 2
+        assert env.has_attr("action_masks")
+        assert np.array_equal(env.get_attr("action_masks", indices=[1])[0](), env.action_masks()[1])
+    finally:
+        env.close()
+
+    print("\n=== Test 2: Missing info masks are reported ===")
+    env = VecActionMaskWrapper(DummyVecEnv([make_env]))
+    try:
+        env.reset()
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+    print("\n=== Test 3: MaskablePPO trains on the wrapper ===")
+    env = VecActionMaskWrapper(DummyVecEnv([make_masked_env] * 2))
+    model = MaskablePPO("MultiInputPolicy", env, n_steps=32, batch_size=32, verbose=0)
+    model.learn(total_timesteps=64)
+
+    print("\nAll vec env mask tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_vec_env_masks()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,81 @@
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import gymnasium as gym
+from puerto_rico_env import PuertoRicoEnv2P, ENV_ID
+from puerto_rico_vector import MaskedVectorEnv, sample_masked_actions
+
+def run(envs, n_steps, seed):
+    """Step with random legal actions; (obs, masks, rewards, terminations) per step."""
+    rng = np.random.default_rng(seed)
+    obs, _ = envs.reset(seed=seed)
+    history = []
+    finished = 0
+    for _ in range(n_steps):
+        masks = envs.action_masks()
+        assert (masks.sum(axis=1) > 0).all(), "All-zero mask returned to the policy"
+        obs, rewards, terminations, _, info = envs.step(sample_masked_actions(masks, rng))
+        for i in np.flatnonzero(terminations):
+            # SAME_STEP autoreset: final_obs[i] is the finished game, obs[i] the new one
+            assert info["_final_obs"][i]
+            assert not np.array_equal(info["final_obs"][i]["players"], obs["players"][i])
+            assert info["final_info"]["action_mask"][i].sum() == 0, "Terminal state has no legal actions"
+            finished += 1
+        history.append((obs, envs.action_masks().copy(), rewards, terminations))
+    return history, finished
+
+def test_vector_env():
+    print("=== Test 1: Registered env id ===")
+    env = gym.make(ENV_ID, mayor_mode="allocation")
+    assert isinstance(env.unwrapped, PuertoRicoEnv2P) and env.unwrapped.mayor_mode == "allocation"
+    obs, _ = env.reset(seed=300)
+    rng = np.random.default_rng(300)
+    terminated = False
+    while not terminated:
+        assert env.observation_space.contains(obs), "Observation outside observation_space"
+        obs, _, terminated, _, _ = env.step(int(sample_masked_actions(env.unwrapped.action_masks()[None], rng)[0]))
+    env.close()
+
+    print("\n=== Test 2: Async shared-memory stepping matches sync ===")
+    sync = gym.make_vec(ENV_ID, num_envs=2, vectorization="sync")
+    shm = gym.make_vec(ENV_ID, num_envs=2, vectorization="async", shared_memory=True)
+    assert isinstance(sync, MaskedVectorEnv) and isinstance(shm, MaskedVectorEnv)
+    try:
+        expected, finished = run(sync, 600, 310)
+        actual, _ = run(shm, 600, 310)
+        for (obs_a, masks_a, rewards_a, done_a), (obs_b, masks_b, rewards_b, done_b) in zip(expected, actual):
+            for key in obs_a:
+                assert np.array_equal(obs_a[key], obs_b[key]), f"obs['{key}'] differs"
+            assert np.array_equal(masks_a, masks_b)
+            assert np.array_equal(rewards_a, rewards_b) and np.array_equal(done_a, done_b)
+        print(f"{len(expected)} steps, {finished} finished games")
+        assert finished > 0, "No episode ended, autoreset untested"
+
+        print("\n=== Test 3: Masks match the sub-envs ===")
+        masks = shm.action_masks()
+        assert np.array_equal(np.stack(shm.env.call("action_masks")), masks)
+    finally:
+        sync.close()
+        shm.close()
+
+    try:
+        gym.make_vec(ENV_ID, num_envs=2, vectorization="threads")
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+    print("\nAll vector env tests passed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_vector_env()
+    except AssertionError as e:
+        print(f"Assertion Failed: {e}")
+        sys.exit(1)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
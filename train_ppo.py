@@ -3,50 +3,52 @@ import os
 import sys
 import numpy as np
 from sb3_contrib import MaskablePPO
-from sb3_contrib.common.wrappers import ActionMasker
 from stable_baselines3.common.callbacks import CheckpointCallback
-from stable_baselines3.common.monitor import Monitor
 from stable_baselines3.common.vec_env import DummyVecEnv
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from puerto_rico_env import PuertoRicoEnv2P
-from puerto_rico_wrappers import PuertoRicoSelfPlayWrapper
+from puerto_rico_wrappers import PuertoRicoTrainingWrapper
+
+# pretrain_bc.py가 동일한 네트워크 구조를 사용합니다.
+POLICY_KWARGS = dict(net_arch=[256, 256, 256])
+
+# 학습 하이퍼파라미터. 처음부터 학습할 때와 사전학습 모델로 시작할 때 모두 이 값을 사용합니다.
+PPO_KWARGS = dict(
+    learning_rate=3e-4,
+    n_steps=2048,
+    batch_size=64,
+    gamma=0.99,
+    gae_lambda=0.95,
+    clip_range=0.2,
+    ent_coef=0.01,
+    policy_kwargs=POLICY_KWARGS,
+)
 
 def make_env():
-    env = PuertoRicoEnv2P()
-    # 1. 먼저 SelfPlayWrapper로 감쌉니다.
-    env = PuertoRicoSelfPlayWrapper(env)
-    
-    # 2. ActionMasker를 Monitor보다 먼저 적용하여 action_masks 메서드에 접근 가능하게 합니다.
-    # env 객체가 여전히 action_masks를 가지고 있는 상태에서 감싸야 합니다.
-    env = ActionMasker(env, lambda env: env.action_masks())
-    
-    # 3. 마지막으로 Monitor를 적용합니다.
-    env = Monitor(env) 
-    return env
+    env = PuertoRicoEnv2P(validation="fast") # 마스크 기반 정책이므로 검증 생략
+    # 관측 정규화(Self-Play), 보상, action_masks, Monitor 에피소드 통계를
+    # 하나의 래퍼에서 처리합니다. (람다가 없어 서브프로세스 워커로 피클링 가능)
+    return PuertoRicoTrainingWrapper(env)
+
+def make_model(env, pretrained=None, **kwargs):
+    model = MaskablePPO("MultiInputPolicy", env, **{**PPO_KWARGS, **kwargs})
+    if pretrained:
+        # 체크포인트에서는 정책/옵티마이저 파라미터만 불러옵니다.
+        # (MaskablePPO.load는 저장된 하이퍼파라미터까지 복원하므로 사용하지 않습니다.)
+        model.set_parameters(pretrained)
+    return model
 
-def train():
+def train(pretrained=None):
     log_dir = "./logs/"
     os.makedirs(log_dir, exist_ok=True)
     
     # 가급적 시드(seed)를 고정하여 재현성을 확보합니다.
     env = DummyVecEnv([make_env])
     
-    model = MaskablePPO(
-        "MultiInputPolicy",
-        env,
-        verbose=1,
-        learning_rate=3e-4,
-        n_steps=2048,
-        batch_size=64,
-        gamma=0.99,
-        gae_lambda=0.95,
-        clip_range=0.2,
-        ent_coef=0.01,
-        policy_kwargs=dict(net_arch=[256, 256, 256]),
-        tensorboard_log=log_dir
-    )
+    # pretrain_bc.py로 사전학습한 체크포인트가 있으면 그 정책에서 시작합니다.
+    model = make_model(env, pretrained, verbose=1, tensorboard_log=log_dir)
     
     checkpoint_callback = CheckpointCallback(
         save_freq=50000,
@@ -68,4 +70,4 @@ def train():
         print("Model saved.")
 
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    train(sys.argv[1] if len(sys.argv) > 1 else None)
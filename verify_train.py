@@ -4,19 +4,16 @@ import os
 import sys
 import shutil
 from sb3_contrib import MaskablePPO
-from sb3_contrib.common.wrappers import ActionMasker
 from stable_baselines3.common.vec_env import DummyVecEnv
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from puerto_rico_env import PuertoRicoEnv2P
-from puerto_rico_wrappers import PuertoRicoSelfPlayWrapper
+from puerto_rico_wrappers import PuertoRicoTrainingWrapper
 
 def make_env():
     env = PuertoRicoEnv2P()
-    env = PuertoRicoSelfPlayWrapper(env)
-    env = ActionMasker(env, lambda env: env.action_masks())
-    return env
+    return PuertoRicoTrainingWrapper(env)
 
 def verify_train():
     print("Verifying Training Pipeline...")